@@ -1,13 +1,21 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
+from sqlalchemy.orm import Session
 import os
 
 from app.api.routes import auth, audio
-from app.api.routes.db import candidates, users, job_sessions, interviews, analysis, training
+from app.api.routes.db import candidates, users, job_sessions, interviews, analysis, training, dashboard
 from app.config import settings
-from app.db.database import Base, engine
+from app.core.model_registry import preload_models, registry
+from app.core.telemetry import configure_tracing, render_prometheus
+from app.db.database import dispose_async_engine, engine, get_db
+from app.utils.query_count import QueryCountMiddleware
+from app.utils.upload import MaxBodySizeMiddleware
 
 
 # Ensure storage directories exist
@@ -15,15 +23,37 @@ os.makedirs(settings.AUDIO_UPLOAD_PATH, exist_ok=True)
 os.makedirs(os.path.join(settings.AUDIO_UPLOAD_PATH, "training"), exist_ok=True)
 os.makedirs(os.path.join(settings.AUDIO_UPLOAD_PATH, "interviews"), exist_ok=True)
 
-# Create tables for MVP/demo usage
-Base.metadata.create_all(bind=engine)
+# The schema is managed by Alembic migrations (backend/migrations), not
+# created at import: run `alembic upgrade head` from backend/ before
+# starting the API or the workers.
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_tracing("vocahire-api")
+    if settings.PRELOAD_MODELS:
+        preload_models()
+    yield
+    await dispose_async_engine()
+
 
 app = FastAPI(
     title="VocaHire API",
     description="API for VocaHire - Voice Analysis for Hiring",
     version=settings.VERSION,
+    lifespan=lifespan,
+)
+
+# SQL statements per request, to catch N+1 loading (see app.db.loading)
+app.add_middleware(
+    QueryCountMiddleware,
+    header=settings.QUERY_COUNT_HEADER,
+    warn_above=settings.QUERY_COUNT_WARN,
 )
 
+# Reject oversize bodies before they are spooled (1MB slack for multipart framing)
+app.add_middleware(MaxBodySizeMiddleware, max_size=settings.MAX_UPLOAD_SIZE + 1024 * 1024)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -33,6 +63,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Keyset pagination of the list endpoints (app.utils.pagination)
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 app.mount("/uploads", StaticFiles(directory=settings.AUDIO_UPLOAD_PATH), name="uploads")
@@ -45,6 +77,7 @@ app.include_router(candidates.router, prefix=api_prefix)
 app.include_router(interviews.router, prefix=api_prefix)
 app.include_router(analysis.router, prefix=api_prefix)
 app.include_router(training.router, prefix=api_prefix)
+app.include_router(dashboard.router, prefix=api_prefix)
 app.include_router(audio.router, prefix=api_prefix)
 
 
@@ -62,6 +95,7 @@ def root():
             "interviews": f"{api_prefix}/interviews",
             "analysis": f"{api_prefix}/analysis",
             "training": f"{api_prefix}/training",
+            "dashboard": f"{api_prefix}/dashboard",
             "audio": f"{api_prefix}/audio",
         },
     }
@@ -79,10 +113,21 @@ def health_check():
     return {
         "status": "healthy",
         "database": db_status,
+        "database_pool": engine.pool.status(),
         "audio_upload_path": settings.AUDIO_UPLOAD_PATH,
+        "models": registry.stats(),
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics(db: Session = Depends(get_db)):
+    # Prometheus text format 0.0.4
+    return PlainTextResponse(
+        render_prometheus(db),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
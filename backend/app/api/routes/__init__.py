@@ -5,4 +5,5 @@ from .auth import router as auth_router
 from .db.job_sessions import router as job_sessions_router
 from .db.interviews import router as interviews_router
 from .db.analysis import router as analysis_router
-from .db.training import router as training_router
\ No newline at end of file
+from .db.training import router as training_router
+from .db.dashboard import router as dashboard_router
@@ -1,17 +1,28 @@
 from __future__ import annotations
 
 from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+import json
+import mimetypes
 import os
-import shutil
+import uuid
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Request, UploadFile
+from fastapi.responses import FileResponse, Response
+from sqlalchemy import text
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
-from app.core.analysis_worker import run_analysis_pipeline
+from app.core import job_queue
+from app.core import progress as analysis_progress
+from app.core.checkpoints import clear_checkpoints
+from app.core.result_cache import file_sha256
 from app.db.database import get_db
 from app.db.models import AnalysisResult, Interview, SpeakerSegment, TrainingSession, TranscriptionSegment
+from app.schemas.upload import ResumableUploadCreate
+from app.utils.audio import compressed_preview, probe_duration, remove_derived_audio
+from app.utils.upload import append_request_body, save_upload_file
 
 router = APIRouter(prefix="/audio", tags=["audio"])
 
@@ -28,8 +39,70 @@ def _validate_audio_file(file: UploadFile):
     return extension
 
 
+AUDIO_MEDIA_TYPES = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".webm": "audio/webm",
+    ".ogg": "audio/ogg",
+    ".flac": "audio/flac",
+}
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since.timestamp()
+
+    return False
+
+
+def _audio_file_response(request: Request, audio_path: str, preview: bool = False):
+    """
+    Serves a recording with byte ranges (206, handled by FileResponse),
+    ETag / Last-Modified validators and 304 answers to conditional requests.
+    With preview, a cached Opus rendition is served instead of the original.
+    """
+    if preview:
+        try:
+            audio_path = compressed_preview(audio_path, settings.AUDIO_PREVIEW_BITRATE)
+        except RuntimeError as exc:
+            print(f"[AUDIO] {exc}, serving the original file")
+
+    stat = os.stat(audio_path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    extension = os.path.splitext(audio_path)[1].lower()
+    media_type = AUDIO_MEDIA_TYPES.get(extension) or mimetypes.guess_type(audio_path)[0] or "application/octet-stream"
+
+    return FileResponse(audio_path, media_type=media_type, headers=headers, stat_result=stat)
+
+
 @router.get("/training/{session_id}")
-def get_training_audio(session_id: int, db: Session = Depends(get_db)):
+def get_training_audio(
+    session_id: int,
+    request: Request,
+    preview: bool = False,
+    db: Session = Depends(get_db),
+):
     session = db.query(TrainingSession).filter(TrainingSession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Training session not found")
@@ -37,11 +110,16 @@ def get_training_audio(session_id: int, db: Session = Depends(get_db)):
     if not session.audio_path or not os.path.exists(session.audio_path):
         raise HTTPException(status_code=404, detail="Audio file not found")
 
-    return FileResponse(session.audio_path, media_type="audio/mpeg")
+    return _audio_file_response(request, session.audio_path, preview=preview)
 
 
 @router.get("/interview/{interview_id}")
-def get_interview_audio(interview_id: int, db: Session = Depends(get_db)):
+def get_interview_audio(
+    interview_id: int,
+    request: Request,
+    preview: bool = False,
+    db: Session = Depends(get_db),
+):
     interview = db.query(Interview).filter(Interview.id == interview_id).first()
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
@@ -49,7 +127,7 @@ def get_interview_audio(interview_id: int, db: Session = Depends(get_db)):
     if not interview.audio_path or not os.path.exists(interview.audio_path):
         raise HTTPException(status_code=404, detail="Audio file not found")
 
-    return FileResponse(interview.audio_path, media_type="audio/mpeg")
+    return _audio_file_response(request, interview.audio_path, preview=preview)
 
 
 @router.post("/upload/test")
@@ -63,47 +141,207 @@ async def upload_test_audio(file: UploadFile = File(...)):
     }
 
 
+def _attach_interview_audio(db: Session, interview: Interview, file_path: str, audio_hash: str):
+    """
+    Swaps the interview recording for file_path, clears results computed
+    from the previous one and queues the analysis.
+    """
+    if interview.audio_path and interview.audio_path != file_path and os.path.exists(interview.audio_path):
+        try:
+            os.remove(interview.audio_path)
+        except OSError:
+            pass
+        remove_derived_audio(interview.audio_path)
+
+    db.query(AnalysisResult).filter(AnalysisResult.interview_id == interview.id).delete(synchronize_session=False)
+    db.query(TranscriptionSegment).filter(TranscriptionSegment.interview_id == interview.id).delete(synchronize_session=False)
+    db.query(SpeakerSegment).filter(SpeakerSegment.interview_id == interview.id).delete(synchronize_session=False)
+    clear_checkpoints(db, interview.id)
+
+    interview.audio_path = file_path
+    interview.audio_hash = audio_hash
+    interview.audio_seconds = probe_duration(file_path)
+    interview.candidate_speaker = None
+    interview.speaker_embeddings = None
+    interview.status = "uploaded"
+
+    # Analysis runs in the worker pool (python -m app.worker), not in the API process
+    job_queue.cancel_pending(db, interview.id, kind="analyze")
+    job = job_queue.enqueue(db, "analyze", interview_id=interview.id, audio_path=file_path)
+    db.flush()
+    analysis_progress.publish(interview.id, stage="queued", percent=0.0, db=db)
+    db.commit()
+
+    return {
+        "message": "Audio uploaded successfully. Analysis queued.",
+        "interview_id": interview.id,
+        "audio_path": file_path,
+        "status": "uploaded",
+        "job_id": job.id,
+    }
+
+
+def _interview_file_path(interview_id: int, extension: str) -> str:
+    interview_dir = os.path.join(settings.AUDIO_UPLOAD_PATH, "interviews")
+    os.makedirs(interview_dir, exist_ok=True)
+
+    safe_filename = f"interview_{interview_id}_{int(datetime.now().timestamp())}{extension}"
+    return os.path.join(interview_dir, safe_filename)
+
+
 @router.post("/interview/{interview_id}/upload")
 async def upload_audio(
     interview_id: int,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
 ):
-    interview = db.query(Interview).filter(Interview.id == interview_id).first()
+    interview = await run_in_threadpool(_get_interview, db, interview_id)
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
 
     extension = _validate_audio_file(file)
+    file_path = _interview_file_path(interview_id, extension)
 
-    interview_dir = os.path.join(settings.AUDIO_UPLOAD_PATH, "interviews")
-    os.makedirs(interview_dir, exist_ok=True)
+    _, audio_hash = await save_upload_file(file, file_path, settings.MAX_UPLOAD_SIZE)
 
-    safe_filename = f"interview_{interview_id}_{int(datetime.now().timestamp())}{extension}"
-    file_path = os.path.join(interview_dir, safe_filename)
+    return await run_in_threadpool(_attach_interview_audio, db, interview, file_path, audio_hash)
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
 
-    if interview.audio_path and os.path.exists(interview.audio_path):
-        try:
-            os.remove(interview.audio_path)
-        except OSError:
-            pass
+def _get_interview(db: Session, interview_id: int):
+    return db.query(Interview).filter(Interview.id == interview_id).first()
 
-    db.query(AnalysisResult).filter(AnalysisResult.interview_id == interview_id).delete(synchronize_session=False)
-    db.query(TranscriptionSegment).filter(TranscriptionSegment.interview_id == interview_id).delete(synchronize_session=False)
-    db.query(SpeakerSegment).filter(SpeakerSegment.interview_id == interview_id).delete(synchronize_session=False)
 
-    interview.audio_path = file_path
-    interview.status = "uploaded"
-    db.commit()
+# ---------- Resumable uploads for long recordings ----------
+#
+#   POST  /audio/uploads                      -> {upload_id, offset: 0}
+#   PATCH /audio/uploads/{id}  (Upload-Offset) -> append raw bytes at offset
+#   GET   /audio/uploads/{id}                 -> current offset, to resume
+#   POST  /audio/uploads/{id}/complete?interview_id=  -> attach + analyse
+
+def _partial_dir() -> str:
+    path = os.path.join(settings.AUDIO_UPLOAD_PATH, "partial")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _partial_paths(upload_id: str):
+    try:
+        upload_id = uuid.UUID(upload_id).hex
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    base = os.path.join(_partial_dir(), upload_id)
+    return f"{base}.part", f"{base}.json"
+
+
+def _read_upload_meta(upload_id: str):
+    part_path, meta_path = _partial_paths(upload_id)
+    if not os.path.exists(meta_path):
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    with open(meta_path, "r", encoding="utf-8") as handle:
+        meta = json.load(handle)
+    meta["offset"] = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    return part_path, meta_path, meta
+
+
+def _lock_upload(db: Session, upload_id: str):
+    """
+    Takes a transaction-level Postgres advisory lock on the upload, so a
+    chunk is appended, or the upload completed, by one request at a time
+    across API processes; released by the session's commit or rollback.
+    Raises 409 when another request holds it. Returns the upload read
+    under the lock.
+    """
+    part_path, _ = _partial_paths(upload_id)
+    acquired = db.execute(
+        text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"),
+        {"key": f"upload:{os.path.basename(part_path)}"},
+    ).scalar()
+    if not acquired:
+        raise HTTPException(status_code=409, detail="Another request is writing this upload, retry shortly")
+
+    # Completed (part file moved) while we waited: the metadata is gone too
+    return _read_upload_meta(upload_id)
+
+
+@router.post("/uploads", status_code=201)
+def create_resumable_upload(upload: ResumableUploadCreate):
+    extension = os.path.splitext(upload.filename)[1].lower()
+    if extension not in ALLOWED_AUDIO_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported audio format. Allowed: {', '.join(sorted(ALLOWED_AUDIO_EXTENSIONS))}",
+        )
+    if upload.size > settings.MAX_RESUMABLE_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
 
-    background_tasks.add_task(run_analysis_pipeline, interview_id)
+    upload_id = uuid.uuid4().hex
+    part_path, meta_path = _partial_paths(upload_id)
+    open(part_path, "wb").close()
+    with open(meta_path, "w", encoding="utf-8") as handle:
+        json.dump({"filename": upload.filename, "extension": extension, "size": upload.size}, handle)
 
     return {
-        "message": "Audio uploaded successfully. Analysis started.",
-        "interview_id": interview_id,
-        "audio_path": file_path,
-        "status": "uploaded",
+        "upload_id": upload_id,
+        "offset": 0,
+        "size": upload.size,
+        "chunk_size": settings.MAX_UPLOAD_SIZE,
     }
+
+
+@router.get("/uploads/{upload_id}")
+def get_resumable_upload(upload_id: str):
+    _, _, meta = _read_upload_meta(upload_id)
+    return {"upload_id": upload_id, **meta}
+
+
+@router.patch("/uploads/{upload_id}")
+async def append_resumable_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., alias="Upload-Offset"),
+    db: Session = Depends(get_db),
+):
+    try:
+        part_path, _, meta = await run_in_threadpool(_lock_upload, db, upload_id)
+        if upload_offset != meta["offset"]:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Offset mismatch, resume from the current offset", "offset": meta["offset"]},
+            )
+
+        written = await append_request_body(request, part_path, meta["offset"], meta["size"])
+    finally:
+        await run_in_threadpool(db.rollback)
+
+    return {"upload_id": upload_id, "offset": meta["offset"] + written, "size": meta["size"]}
+
+
+@router.post("/uploads/{upload_id}/complete")
+def complete_resumable_upload(
+    upload_id: str,
+    interview_id: int,
+    db: Session = Depends(get_db),
+):
+    # Held until _attach_interview_audio commits (or the session closes)
+    part_path, meta_path, meta = _lock_upload(db, upload_id)
+    if meta["offset"] != meta["size"]:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Upload incomplete", "offset": meta["offset"], "size": meta["size"]},
+        )
+
+    interview = _get_interview(db, interview_id)
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+
+    # Chunks can arrive in separate requests (or API processes), so the
+    # content hash is taken once over the assembled file
+    audio_hash = file_sha256(part_path)
+
+    file_path = _interview_file_path(interview_id, meta["extension"])
+    os.replace(part_path, file_path)
+    os.remove(meta_path)
+
+    return _attach_interview_audio(db, interview, file_path, audio_hash)
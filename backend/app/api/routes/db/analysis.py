@@ -1,10 +1,20 @@
 # backend/app/api/routes/db/analysis.py
 
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.db.database import get_db
-from app.db.models import Interview, AnalysisResult
+from app.config import settings
+from app.core import job_queue
+from app.core.progress import TERMINAL_STATUSES, broadcaster, format_sse
+from app.core.analysis_worker import ScoringUnavailable, TranscriptUnavailable, rescore_interview
+from app.db import loading
+from app.db.database import SessionLocal, get_db
+from app.db.models import Interview, JobSession
+from app.schemas.analysis import InterviewerEnrollment
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
@@ -18,7 +28,7 @@ def get_analysis_results(
     Retourne l'état et les résultats d'analyse d'un entretien.
     """
 
-    interview = db.query(Interview).filter(
+    interview = db.query(Interview).options(*loading.INTERVIEW_WITH_RESULT).filter(
         Interview.id == interview_id
     ).first()
 
@@ -28,6 +38,8 @@ def get_analysis_results(
     if interview.status in ["uploaded", "processing"]:
         return {
             "status": interview.status,
+            "stage": interview.progress_stage,
+            "percent": interview.progress_percent,
             "message": "Analysis is still running"
         }
 
@@ -37,9 +49,7 @@ def get_analysis_results(
             "message": "Analysis failed"
         }
 
-    analysis = db.query(AnalysisResult).filter(
-        AnalysisResult.interview_id == interview_id
-    ).first()
+    analysis = interview.analysis_result
 
     if not analysis:
         return {
@@ -55,4 +65,281 @@ def get_analysis_results(
         "fluency": float(analysis.fluency or 0),
         "final_score": float(analysis.final_score or 0),
         "feedback": analysis.feedback or ""
-    }
\ No newline at end of file
+    }
+
+@router.post("/interview/{interview_id}/rescore")
+def rescore_interview_analysis(
+    interview_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Re-score an interview against the current job qualities, reusing the
+    stored transcript instead of re-running diarization and transcription.
+    """
+
+    interview = db.query(Interview).filter(
+        Interview.id == interview_id
+    ).first()
+
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+
+    if interview.status in ["uploaded", "processing"]:
+        raise HTTPException(status_code=409, detail="Analysis is still running")
+
+    try:
+        result = rescore_interview(interview_id, db=db)
+    except TranscriptUnavailable:
+        raise HTTPException(
+            status_code=409,
+            detail="No stored transcript for this interview, re-upload the audio to analyse it"
+        )
+    except ScoringUnavailable:
+        raise HTTPException(
+            status_code=503,
+            detail="The scoring service is unavailable, the previous scores were kept. Try again later"
+        )
+
+    return {
+        "status": "completed",
+        "content_relevance": float(result["content_relevance"]),
+        "vocal_confidence": float(result["vocal_confidence"]),
+        "clarity_of_speech": float(result["clarity_of_speech"]),
+        "fluency": float(result["fluency"]),
+        "final_score": float(result["final_score"]),
+        "feedback": result["feedback"]
+    }
+
+
+@router.post("/job-session/{job_session_id}/rescore", status_code=202)
+def rescore_job_session(
+    job_session_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Queue a re-score of every analysed interview of a job session, e.g.
+    after its qualities were edited. Runs in the worker pool.
+    """
+
+    job_session = db.query(JobSession).filter(
+        JobSession.id == job_session_id
+    ).first()
+
+    if not job_session:
+        raise HTTPException(status_code=404, detail="Job session not found")
+
+    interview_ids = [
+        interview_id for (interview_id,) in db.query(Interview.id).filter(
+            Interview.job_session_id == job_session_id,
+            Interview.status.in_(["completed", "ready", "reviewed"])
+        ).all()
+    ]
+
+    job_ids = []
+    for interview_id in interview_ids:
+        job_queue.cancel_pending(db, interview_id, kind="rescore")
+        job = job_queue.enqueue(
+            db,
+            "rescore",
+            interview_id=interview_id,
+            priority=settings.RESCORE_JOB_PRIORITY
+        )
+        job_ids.append(job.id)
+
+    db.commit()
+
+    return {
+        "job_session_id": job_session_id,
+        "queued": len(job_ids),
+        "job_ids": job_ids
+    }
+
+
+@router.put("/job-session/{job_session_id}/interviewer")
+def enroll_interviewer(
+    job_session_id: int,
+    enrollment: InterviewerEnrollment,
+    db: Session = Depends(get_db)
+):
+    """
+    Enregistre la voix de l'intervieweur pour une session : l'empreinte
+    vocale du locuteur indiqué dans un entretien déjà analysé est réutilisée
+    pour écarter ce locuteur dans tous les entretiens de la session.
+    """
+
+    job_session = db.query(JobSession).filter(
+        JobSession.id == job_session_id
+    ).first()
+
+    if not job_session:
+        raise HTTPException(status_code=404, detail="Job session not found")
+
+    interview = db.query(Interview).filter(
+        Interview.id == enrollment.interview_id,
+        Interview.job_session_id == job_session_id
+    ).first()
+
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found in this job session")
+
+    embedding = (interview.speaker_embeddings or {}).get(enrollment.speaker_label)
+    if not embedding:
+        raise HTTPException(
+            status_code=409,
+            detail="No voice embedding for this speaker, the interview must be analysed first"
+        )
+
+    job_session.interviewer_embedding = embedding
+    db.commit()
+
+    return {
+        "job_session_id": job_session_id,
+        "interview_id": interview.id,
+        "speaker_label": enrollment.speaker_label,
+        "enrolled": True
+    }
+
+
+@router.delete("/job-session/{job_session_id}/interviewer")
+def remove_interviewer_enrollment(
+    job_session_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Supprime la voix enregistrée de l'intervieweur ; les entretiens suivants
+    reviennent à l'identification heuristique du candidat.
+    """
+
+    job_session = db.query(JobSession).filter(
+        JobSession.id == job_session_id
+    ).first()
+
+    if not job_session:
+        raise HTTPException(status_code=404, detail="Job session not found")
+
+    job_session.interviewer_embedding = None
+    db.commit()
+
+    return {"job_session_id": job_session_id, "enrolled": False}
+
+
+# ---------- Progression en direct (Server-Sent Events) ----------
+
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def _progress_snapshot(interview_id: int = None, job_session_id: int = None):
+    # Short-lived session: an open stream must not pin a pooled connection
+    db = SessionLocal()
+    try:
+        query = db.query(
+            Interview.id,
+            Interview.job_session_id,
+            Interview.status,
+            Interview.progress_stage,
+            Interview.progress_percent,
+        )
+        if interview_id is not None:
+            query = query.filter(Interview.id == interview_id)
+        if job_session_id is not None:
+            query = query.filter(Interview.job_session_id == job_session_id)
+
+        return [
+            {
+                "interview_id": row.id,
+                "job_session_id": row.job_session_id,
+                "status": row.status,
+                "stage": row.progress_stage,
+                "percent": row.progress_percent,
+            }
+            for row in query.order_by(Interview.id).all()
+        ]
+    finally:
+        db.close()
+
+
+def _job_session_exists(job_session_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        return db.query(JobSession.id).filter(JobSession.id == job_session_id).first() is not None
+    finally:
+        db.close()
+
+
+async def _progress_events(request: Request, queue, snapshot, matches, close_when_done: bool):
+    try:
+        yield "retry: 3000\n\n"
+        for item in snapshot:
+            yield format_sse(item)
+
+        if close_when_done and snapshot and snapshot[0]["status"] in TERMINAL_STATUSES:
+            return
+
+        while not await request.is_disconnected():
+            try:
+                payload = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if not matches(payload):
+                continue
+
+            yield format_sse(payload)
+            if close_when_done and payload.get("status") in TERMINAL_STATUSES:
+                return
+    finally:
+        broadcaster.unsubscribe(queue)
+
+
+def _sse_response(events):
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/interview/{interview_id}/events")
+async def stream_interview_progress(interview_id: int, request: Request):
+    """
+    Flux SSE de la progression d'un entretien (étape, pourcentage, statut).
+    Le flux se ferme une fois l'analyse terminée ou en échec.
+    """
+
+    # Subscribe before reading the snapshot so no update falls in between
+    queue = broadcaster.subscribe()
+    snapshot = await run_in_threadpool(_progress_snapshot, interview_id=interview_id)
+    if not snapshot:
+        broadcaster.unsubscribe(queue)
+        raise HTTPException(status_code=404, detail="Interview not found")
+
+    return _sse_response(_progress_events(
+        request,
+        queue,
+        snapshot,
+        lambda payload: payload.get("interview_id") == interview_id,
+        close_when_done=True,
+    ))
+
+
+@router.get("/job-session/{job_session_id}/events")
+async def stream_job_session_progress(job_session_id: int, request: Request):
+    """
+    Flux SSE de la progression de tous les entretiens d'une session : l'état
+    courant de chaque entretien, puis chaque mise à jour publiée.
+    """
+
+    if not await run_in_threadpool(_job_session_exists, job_session_id):
+        raise HTTPException(status_code=404, detail="Job session not found")
+
+    queue = broadcaster.subscribe()
+    snapshot = await run_in_threadpool(_progress_snapshot, job_session_id=job_session_id)
+
+    return _sse_response(_progress_events(
+        request,
+        queue,
+        snapshot,
+        lambda payload: payload.get("job_session_id") == job_session_id,
+        close_when_done=False,
+    ))
@@ -1,9 +1,12 @@
 # path: backend/app/api/routes/db/candidates.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.db.database import get_db
-from app.db.models import Candidate, CandidateListItem, JobSession
+from typing import List, Literal, Optional
+from app.db import loading
+from app.db.database import get_async_db, get_db
+from app.db.models import LIST_ORDER_LAST, SCORE_MISSING, Candidate, CandidateListItem, JobSession
 from app.schemas.candidate import (
     Candidate as CandidateSchema,
     CandidateCreate,
@@ -14,17 +17,78 @@ from app.schemas.candidate import (
     CandidateWithListItemCreate
 )
 
+from app.utils.pagination import Keyset, count_statement, page_size, set_total
+
 router = APIRouter(prefix="/candidates", tags=["candidates"])
 
+PERSON_KEYSET = Keyset("id", [Candidate.id], lambda c: (c.id,))
+
+# Mêmes expressions que les index ix_candidate_list_items_session_*
+_LIST_ORDER = func.coalesce(CandidateListItem.list_order, LIST_ORDER_LAST)
+_SCORE = func.coalesce(CandidateListItem.score, SCORE_MISSING)
+
+LIST_ITEM_SORTS = {
+    "order": Keyset(
+        "order", [_LIST_ORDER, CandidateListItem.id],
+        lambda i: (LIST_ORDER_LAST if i.list_order is None else i.list_order, i.id),
+    ),
+    "score": Keyset(
+        "score", [_SCORE, CandidateListItem.id],
+        lambda i: (SCORE_MISSING if i.score is None else i.score, i.id),
+        descending=True,
+    ),
+}
+
+
+async def _list_items_page(
+    db: AsyncSession,
+    response: Response,
+    query,
+    status: Optional[str],
+    min_score: Optional[float],
+    max_score: Optional[float],
+    sort: str,
+    cursor: Optional[str],
+    limit: int,
+    skip: int,
+    include_total: bool,
+):
+    """Filtres, total à la demande et page par curseur des éléments de liste"""
+    if status:
+        query = query.where(CandidateListItem.status == status)
+    if min_score is not None:
+        query = query.where(CandidateListItem.score >= min_score)
+    if max_score is not None:
+        query = query.where(CandidateListItem.score <= max_score)
+
+    if include_total:
+        set_total(response, await db.scalar(count_statement(query)))
+
+    keyset = LIST_ITEM_SORTS[sort]
+    limit = page_size(limit)
+    # Candidats chargés en une requête (pas de chargement paresseux en async)
+    query = keyset.apply(query.options(*loading.LIST_ITEMS), cursor, limit, skip)
+    items = await db.scalars(query)
+    return keyset.page(items.all(), limit, response)
+
 # ---------- Endpoints pour les données personnelles (table "candidates") ----------
 @router.get("/persons/", response_model=List[CandidateSchema])
-def read_candidates_persons(
+async def read_candidates_persons(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Récupère tous les candidats (données personnelles)"""
-    return db.query(Candidate).offset(skip).limit(limit).all()
+    """Récupère les candidats (données personnelles) page par page (X-Next-Cursor)"""
+    query = select(Candidate)
+    if include_total:
+        set_total(response, await db.scalar(count_statement(query)))
+
+    limit = page_size(limit)
+    candidates = await db.scalars(PERSON_KEYSET.apply(query.options(*loading.PLAIN), cursor, limit, skip))
+    return PERSON_KEYSET.page(candidates.all(), limit, response)
 
 @router.post("/persons/", response_model=CandidateSchema, status_code=status.HTTP_201_CREATED)
 def create_candidate_person(
@@ -44,7 +108,7 @@ def read_candidate_person(
     db: Session = Depends(get_db)
 ):
     """Récupère un candidat par son ID"""
-    candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+    candidate = db.query(Candidate).options(*loading.PLAIN).filter(Candidate.id == candidate_id).first()
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidat non trouvé")
     return candidate
@@ -84,34 +148,51 @@ def delete_candidate_person(
 
 # ---------- Endpoints pour les éléments de liste (table "candidate_list_items") ----------
 @router.get("/", response_model=List[CandidateListItemSchema])
-def read_candidate_list_items(
+async def read_candidate_list_items(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     job_session_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    status: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    sort: Literal["order", "score"] = "order",
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Récupère tous les éléments de liste, filtrés éventuellement par session"""
-    query = db.query(CandidateListItem)
+    """Récupère les éléments de liste page par page, filtrés par session, statut ou score"""
+    query = select(CandidateListItem)
     if job_session_id:
-        query = query.filter(CandidateListItem.job_session_id == job_session_id)
-    return query.offset(skip).limit(limit).all()
+        query = query.where(CandidateListItem.job_session_id == job_session_id)
+    return await _list_items_page(
+        db, response, query, status, min_score, max_score, sort, cursor, limit, skip, include_total
+    )
 
 @router.get("/job-session/{job_session_id}", response_model=List[CandidateListItemSchema])
-def read_candidates_by_session(
+async def read_candidates_by_session(
     job_session_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    status: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    sort: Literal["order", "score"] = "order",
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Récupère tous les candidats d'une session spécifique"""
+    """Récupère les candidats d'une session spécifique, page par page"""
     # Vérifier que la session existe
-    job_session = db.query(JobSession).filter(JobSession.id == job_session_id).first()
+    job_session = await db.scalar(select(JobSession.id).where(JobSession.id == job_session_id))
     if not job_session:
         raise HTTPException(status_code=404, detail="Session non trouvée")
     
-    return db.query(CandidateListItem).filter(
-        CandidateListItem.job_session_id == job_session_id
-    ).offset(skip).limit(limit).all()
+    query = select(CandidateListItem).where(CandidateListItem.job_session_id == job_session_id)
+    return await _list_items_page(
+        db, response, query, status, min_score, max_score, sort, cursor, limit, skip, include_total
+    )
 
 @router.post("/", response_model=CandidateListItemSchema, status_code=status.HTTP_201_CREATED)
 def create_candidate_list_item(
@@ -172,7 +253,7 @@ def read_candidate_list_item(
     db: Session = Depends(get_db)
 ):
     """Récupère un élément de liste par son ID"""
-    item = db.query(CandidateListItem).filter(CandidateListItem.id == item_id).first()
+    item = db.query(CandidateListItem).options(*loading.LIST_ITEM).filter(CandidateListItem.id == item_id).first()
     if not item:
         raise HTTPException(status_code=404, detail="Élément de liste non trouvé")
     return item
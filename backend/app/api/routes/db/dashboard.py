@@ -0,0 +1,156 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_async_db
+from app.db.models import Candidate, CandidateListItem, Interview, JobSession
+from app.schemas.dashboard import DashboardSummary
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+# Same rules as the dashboard used to apply per candidate in the browser
+ANALYZED = or_(
+    CandidateListItem.status == "analyzed",
+    Interview.status == "completed",
+    CandidateListItem.score.isnot(None),
+)
+PROCESSING = or_(
+    Interview.status.in_(["uploaded", "processing"]),
+    CandidateListItem.status == "pending",
+)
+
+
+@router.get("/summary", response_model=DashboardSummary)
+async def read_dashboard_summary(
+    owner_id: int,
+    top: int = Query(5, ge=0, le=50),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Sessions of an owner with their candidate counts, status histograms,
+    scores and latest activity, plus the best scored candidates: three
+    queries whatever the number of sessions.
+    """
+    sessions = (await db.execute(
+        select(
+            JobSession.id,
+            JobSession.title,
+            JobSession.job_title,
+            JobSession.session_type,
+            JobSession.qualities,
+            JobSession.scheduled_date,
+            JobSession.created_at,
+            JobSession.updated_at,
+        )
+        .where(JobSession.owner_user_id == owner_id)
+        .order_by(JobSession.created_at.desc(), JobSession.id.desc())
+    )).all()
+
+    # One row per (session, candidate status, interview status): a handful
+    # of rows per session, folded below
+    groups = (await db.execute(
+        select(
+            CandidateListItem.job_session_id,
+            CandidateListItem.status.label("item_status"),
+            Interview.status.label("interview_status"),
+            func.count(CandidateListItem.id).label("candidates"),
+            func.count(CandidateListItem.id).filter(ANALYZED).label("analyzed"),
+            func.count(CandidateListItem.id).filter(PROCESSING).label("processing"),
+            func.count(CandidateListItem.score).label("scored"),
+            func.sum(CandidateListItem.score).label("score_sum"),
+            func.max(CandidateListItem.score).label("top_score"),
+            func.max(Interview.updated_at).label("last_activity"),
+        )
+        .join(JobSession, JobSession.id == CandidateListItem.job_session_id)
+        .outerjoin(Interview, Interview.candidate_item_id == CandidateListItem.id)
+        .where(JobSession.owner_user_id == owner_id)
+        .group_by(CandidateListItem.job_session_id, CandidateListItem.status, Interview.status)
+    )).all()
+
+    top_candidates = (await db.execute(
+        select(
+            CandidateListItem.id,
+            CandidateListItem.job_session_id,
+            CandidateListItem.score,
+            CandidateListItem.status,
+            Candidate.first_name,
+            Candidate.last_name,
+            JobSession.job_title,
+            JobSession.title,
+        )
+        .join(JobSession, JobSession.id == CandidateListItem.job_session_id)
+        .outerjoin(Candidate, Candidate.id == CandidateListItem.candidate_id)
+        .where(JobSession.owner_user_id == owner_id, CandidateListItem.score.isnot(None))
+        .order_by(CandidateListItem.score.desc(), CandidateListItem.id)
+        .limit(top)
+    )).all() if top else []
+
+    summaries = {
+        session.id: {
+            "id": session.id,
+            "title": session.title,
+            "job_title": session.job_title,
+            "session_type": session.session_type,
+            "qualities": session.qualities,
+            "scheduled_date": session.scheduled_date,
+            "created_at": session.created_at,
+            "candidate_count": 0,
+            "analyzed_count": 0,
+            "processing_count": 0,
+            "candidate_statuses": {},
+            "interview_statuses": {},
+            "top_score": None,
+            "last_activity": session.updated_at,
+            "scored": 0,
+            "score_sum": 0.0,
+        }
+        for session in sessions
+    }
+
+    for group in groups:
+        # A session created between the two queries is left for the next load
+        summary = summaries.get(group.job_session_id)
+        if summary is None:
+            continue
+        summary["candidate_count"] += group.candidates
+        summary["analyzed_count"] += group.analyzed
+        summary["processing_count"] += group.processing
+        summary["scored"] += group.scored
+        summary["score_sum"] += group.score_sum or 0.0
+
+        item_status = group.item_status or "unknown"
+        summary["candidate_statuses"][item_status] = summary["candidate_statuses"].get(item_status, 0) + group.candidates
+        if group.interview_status:
+            summary["interview_statuses"][group.interview_status] = (
+                summary["interview_statuses"].get(group.interview_status, 0) + group.candidates
+            )
+
+        if group.top_score is not None and (summary["top_score"] is None or group.top_score > summary["top_score"]):
+            summary["top_score"] = group.top_score
+        if group.last_activity and group.last_activity > summary["last_activity"]:
+            summary["last_activity"] = group.last_activity
+
+    for summary in summaries.values():
+        scored = summary.pop("scored")
+        score_sum = summary.pop("score_sum")
+        summary["average_score"] = round(score_sum / scored, 2) if scored else None
+
+    return {
+        "sessions": list(summaries.values()),
+        "top_candidates": [
+            {
+                "id": row.id,
+                "job_session_id": row.job_session_id,
+                "name": f"{row.first_name or ''} {row.last_name or ''}".strip() or "Unnamed candidate",
+                "score": row.score,
+                "status": row.status,
+                "session_title": row.job_title or row.title or "Untitled Session",
+            }
+            for row in top_candidates
+        ],
+        "totals": {
+            "sessions": len(summaries),
+            "candidates": sum(summary["candidate_count"] for summary in summaries.values()),
+            "analyzed": sum(summary["analyzed_count"] for summary in summaries.values()),
+            "processing": sum(summary["processing_count"] for summary in summaries.values()),
+        },
+    }
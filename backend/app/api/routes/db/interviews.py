@@ -2,44 +2,70 @@ from __future__ import annotations
 
 from datetime import datetime
 import os
-import shutil
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Response, UploadFile, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.db.database import get_db
-from app.db.models import CandidateListItem, Interview, JobSession
+from app.db import loading
+from app.db.database import get_async_db, get_db
+from app.db.models import CandidateListItem, Interview, JobSession, SpeakerSegment, TranscriptionSegment
 from app.schemas.interview import Interview as InterviewSchema
 from app.schemas.interview import InterviewCreate, InterviewUpdate
+from app.schemas.speaker import SpeakerSegment as SpeakerSegmentSchema
+from app.schemas.transcription import TranscriptionSegment as TranscriptionSegmentSchema
+from app.utils.audio import remove_derived_audio
+from app.utils.pagination import Keyset, count_statement, page_size, set_total
+from app.utils.upload import copy_upload_file
 
 router = APIRouter(prefix="/interviews", tags=["interviews"])
 
+INTERVIEW_SORTS = {
+    "newest": Keyset("newest", [Interview.created_at, Interview.id], lambda i: (i.created_at, i.id), descending=True),
+    "oldest": Keyset("oldest", [Interview.created_at, Interview.id], lambda i: (i.created_at, i.id)),
+}
+
 
 @router.get("/", response_model=List[InterviewSchema])
-def read_interviews(
+async def read_interviews(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     job_session_id: Optional[int] = None,
     candidate_id: Optional[int] = None,
     candidate_item_id: Optional[int] = None,
-    db: Session = Depends(get_db),
+    status: Optional[str] = None,
+    sort: Literal["newest", "oldest"] = "newest",
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(Interview)
+    query = select(Interview)
+
+    if status is not None:
+        query = query.where(Interview.status == status)
 
     if job_session_id is not None:
-        query = query.filter(Interview.job_session_id == job_session_id)
+        query = query.where(Interview.job_session_id == job_session_id)
 
     resolved_candidate_item_id = candidate_item_id if candidate_item_id is not None else candidate_id
     if resolved_candidate_item_id is not None:
-        query = query.filter(Interview.candidate_item_id == resolved_candidate_item_id)
+        query = query.where(Interview.candidate_item_id == resolved_candidate_item_id)
 
-    return query.offset(skip).limit(limit).all()
+    if include_total:
+        set_total(response, await db.scalar(count_statement(query)))
+
+    keyset = INTERVIEW_SORTS[sort]
+    limit = page_size(limit)
+    interviews = await db.scalars(keyset.apply(query.options(*loading.PLAIN), cursor, limit, skip))
+    return keyset.page(interviews.all(), limit, response)
 
 
 @router.post("/", response_model=InterviewSchema, status_code=status.HTTP_201_CREATED)
-async def create_interview(
+def create_interview(
     job_session_id: int = Form(...),
     candidate_item_id: int = Form(...),
     audio_file: UploadFile = File(...),
@@ -69,8 +95,7 @@ async def create_interview(
     os.makedirs(interview_dir, exist_ok=True)
     file_path = os.path.join(interview_dir, file_name)
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(audio_file.file, buffer)
+    _, audio_hash = copy_upload_file(audio_file, file_path, settings.MAX_UPLOAD_SIZE)
 
     interview_data = InterviewCreate(
         job_session_id=job_session_id,
@@ -79,7 +104,7 @@ async def create_interview(
         status="uploaded",
     )
 
-    db_interview = Interview(**interview_data.model_dump())
+    db_interview = Interview(**interview_data.model_dump(), audio_hash=audio_hash)
     db.add(db_interview)
     db.commit()
     db.refresh(db_interview)
@@ -119,12 +144,54 @@ def create_interview_without_audio(interview: InterviewCreate, db: Session = Dep
 
 @router.get("/{interview_id}", response_model=InterviewSchema)
 def read_interview(interview_id: int, db: Session = Depends(get_db)):
+    interview = db.query(Interview).options(*loading.PLAIN).filter(Interview.id == interview_id).first()
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    return interview
+
+
+def _get_interview_or_404(db: Session, interview_id: int) -> Interview:
     interview = db.query(Interview).filter(Interview.id == interview_id).first()
     if not interview:
         raise HTTPException(status_code=404, detail="Interview not found")
     return interview
 
 
+@router.get("/{interview_id}/transcription-segments", response_model=List[TranscriptionSegmentSchema])
+def read_transcription_segments(
+    interview_id: int,
+    skip: int = 0,
+    limit: int = Query(500, le=5000),
+    db: Session = Depends(get_db),
+):
+    _get_interview_or_404(db, interview_id)
+
+    return db.query(TranscriptionSegment).options(*loading.PLAIN).filter(
+        TranscriptionSegment.interview_id == interview_id
+    ).order_by(
+        TranscriptionSegment.start_seconds, TranscriptionSegment.id
+    ).offset(skip).limit(limit).all()
+
+
+@router.get("/{interview_id}/speaker-segments", response_model=List[SpeakerSegmentSchema])
+def read_speaker_segments(
+    interview_id: int,
+    skip: int = 0,
+    limit: int = Query(500, le=5000),
+    speaker_label: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    _get_interview_or_404(db, interview_id)
+
+    query = db.query(SpeakerSegment).options(*loading.PLAIN).filter(SpeakerSegment.interview_id == interview_id)
+    if speaker_label is not None:
+        query = query.filter(SpeakerSegment.speaker_label == speaker_label)
+
+    return query.order_by(
+        SpeakerSegment.start_seconds, SpeakerSegment.id
+    ).offset(skip).limit(limit).all()
+
+
 @router.put("/{interview_id}", response_model=InterviewSchema)
 def update_interview(interview_id: int, interview_update: InterviewUpdate, db: Session = Depends(get_db)):
     interview = db.query(Interview).filter(Interview.id == interview_id).first()
@@ -151,6 +218,7 @@ def delete_interview(interview_id: int, db: Session = Depends(get_db)):
             os.remove(interview.audio_path)
         except OSError:
             pass
+        remove_derived_audio(interview.audio_path)
 
     db.delete(interview)
     db.commit()
@@ -1,26 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.database import get_db
+from typing import List, Literal, Optional
+from app.core import scheduler
+from app.db import loading
+from app.db.database import get_async_db, get_db
 from app.db.models import JobSession
-from app.schemas.job_session import JobSession as JobSessionSchema, JobSessionCreate, JobSessionUpdate
+from app.schemas.job_session import BatchAnalysisRequest, JobSession as JobSessionSchema, JobSessionCreate, JobSessionUpdate
+from app.utils.pagination import Keyset, count_statement, page_size, set_total
 
 router = APIRouter(prefix="/job-sessions", tags=["job-sessions"])
 
+JOB_SESSION_SORTS = {
+    "newest": Keyset("newest", [JobSession.created_at, JobSession.id], lambda s: (s.created_at, s.id), descending=True),
+    "oldest": Keyset("oldest", [JobSession.created_at, JobSession.id], lambda s: (s.created_at, s.id)),
+}
+
 @router.get("/", response_model=List[JobSessionSchema])
-def read_job_sessions(
+async def read_job_sessions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     owner_id: int = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    sort: Literal["newest", "oldest"] = "newest",
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all job sessions, optionally filtered by owner"""
-    query = db.query(JobSession)
+    """Get job sessions page by page (X-Next-Cursor), optionally filtered by owner"""
+    query = select(JobSession)
     if owner_id:
-        query = query.filter(JobSession.owner_user_id == owner_id)
-    
-    sessions = query.offset(skip).limit(limit).all()
-    return sessions
+        query = query.where(JobSession.owner_user_id == owner_id)
+
+    if include_total:
+        set_total(response, await db.scalar(count_statement(query)))
+
+    keyset = JOB_SESSION_SORTS[sort]
+    limit = page_size(limit)
+    sessions = await db.scalars(keyset.apply(query.options(*loading.PLAIN), cursor, limit, skip))
+    return keyset.page(sessions.all(), limit, response)
 
 @router.post("/", response_model=JobSessionSchema, status_code=status.HTTP_201_CREATED)
 def create_job_session(
@@ -40,7 +59,7 @@ def read_job_session(
     db: Session = Depends(get_db)
 ):
     """Get job session by ID"""
-    session = db.query(JobSession).filter(JobSession.id == session_id).first()
+    session = db.query(JobSession).options(*loading.PLAIN).filter(JobSession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Job session not found")
     return session
@@ -75,4 +94,36 @@ def delete_job_session(
     
     db.delete(session)
     db.commit()
-    return None
\ No newline at end of file
+    return None
+
+@router.post("/{session_id}/analyze", status_code=status.HTTP_202_ACCEPTED)
+def analyze_job_session(
+    session_id: int,
+    request: BatchAnalysisRequest = None,
+    db: Session = Depends(get_db)
+):
+    """Queue the analysis of every pending interview of a job session, scored in batches"""
+    request = request or BatchAnalysisRequest()
+    session = db.query(JobSession).filter(JobSession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Job session not found")
+
+    batch = scheduler.schedule_session(
+        db,
+        session_id,
+        order=request.order,
+        interview_ids=request.interview_ids,
+        reanalyze=request.reanalyze,
+        priority=request.priority,
+    )
+    return {**batch, "progress": scheduler.session_progress(db, session_id)}
+
+@router.get("/{session_id}/analysis-progress")
+def read_job_session_analysis_progress(
+    session_id: int,
+    db: Session = Depends(get_db)
+):
+    """Aggregate analysis progress and ETA of a job session"""
+    if not db.query(JobSession.id).filter(JobSession.id == session_id).first():
+        raise HTTPException(status_code=404, detail="Job session not found")
+    return scheduler.session_progress(db, session_id)
@@ -1,33 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File, Form
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 import os
-import shutil
 from datetime import datetime
+from app.db import loading
 from app.db.database import get_db
 from app.db.models import TrainingSession, User
 from app.schemas.training import TrainingSession as TrainingSchema, TrainingSessionCreate
 from app.config import settings
+from app.utils.pagination import Keyset, count_statement, page_size, set_total
+from app.utils.upload import copy_upload_file
 
 router = APIRouter(prefix="/training", tags=["training"])
 
+TRAINING_SORTS = {
+    "newest": Keyset("newest", [TrainingSession.created_at, TrainingSession.id], lambda t: (t.created_at, t.id), descending=True),
+    "oldest": Keyset("oldest", [TrainingSession.created_at, TrainingSession.id], lambda t: (t.created_at, t.id)),
+}
+
 @router.get("/", response_model=List[TrainingSchema])
 def read_training_sessions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     user_id: Optional[int] = None,
+    difficulty_level: Optional[str] = None,
+    sort: Literal["newest", "oldest"] = "newest",
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Get all training sessions, optionally filtered by user"""
-    query = db.query(TrainingSession)
+    """Get training sessions page by page (X-Next-Cursor), optionally filtered by user"""
+    query = select(TrainingSession)
     if user_id:
-        query = query.filter(TrainingSession.user_id == user_id)
-    
-    sessions = query.offset(skip).limit(limit).all()
-    return sessions
+        query = query.where(TrainingSession.user_id == user_id)
+    if difficulty_level:
+        query = query.where(TrainingSession.difficulty_level == difficulty_level)
+
+    if include_total:
+        set_total(response, db.scalar(count_statement(query)))
+
+    keyset = TRAINING_SORTS[sort]
+    limit = page_size(limit)
+    sessions = db.scalars(keyset.apply(query.options(*loading.PLAIN), cursor, limit, skip)).all()
+    return keyset.page(sessions, limit, response)
 
 @router.post("/", response_model=TrainingSchema, status_code=status.HTTP_201_CREATED)
-async def create_training_session(
+def create_training_session(
     user_id: int = Form(...),
     difficulty_level: Optional[str] = Form(None),
     audio_file: UploadFile = File(None),
@@ -49,9 +69,8 @@ async def create_training_session(
         # Ensure directory exists
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
         
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(audio_file.file, buffer)
+        # Save file (size-limited; the route runs in the threadpool)
+        copy_upload_file(audio_file, file_path, settings.MAX_UPLOAD_SIZE)
         
         audio_path = file_path
     
@@ -90,7 +109,7 @@ def read_training_session(
     db: Session = Depends(get_db)
 ):
     """Get training session by ID"""
-    session = db.query(TrainingSession).filter(TrainingSession.id == session_id).first()
+    session = db.query(TrainingSession).options(*loading.PLAIN).filter(TrainingSession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Training session not found")
     return session
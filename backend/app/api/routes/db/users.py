@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from app.db import loading
 from app.db.database import get_db
 from app.db.models import User
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate, Userlogin
@@ -9,9 +11,12 @@ from app.core.security import verify_password
 from datetime import datetime, timedelta
 from jose import jwt
 from app.config import settings
+from app.utils.pagination import Keyset, count_statement, page_size, set_total
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+USER_KEYSET = Keyset("id", [User.id], lambda u: (u.id,))
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -49,14 +54,30 @@ def login(
 
 @router.get("/", response_model=List[UserSchema])
 def read_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    role: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Get all users"""
+    """Get users page by page (X-Next-Cursor), optionally filtered by role / active flag"""
+    query = select(User)
+    if role:
+        query = query.where(User.role == role)
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+
+    limit = page_size(limit)
+    # Outside the try: an invalid cursor is a 400, not a 500
+    statement = USER_KEYSET.apply(query.options(*loading.PLAIN), cursor, limit, skip)
     try:
-        users = db.query(User).offset(skip).limit(limit).all()
-        return users
+        if include_total:
+            set_total(response, db.scalar(count_statement(query)))
+        users = db.scalars(statement).all()
+        return USER_KEYSET.page(users, limit, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error retrieving users")
 
@@ -87,7 +108,7 @@ def read_user(
     db: Session = Depends(get_db)
 ):
     """Get user by ID"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User).options(*loading.PLAIN).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
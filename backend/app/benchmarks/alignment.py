@@ -0,0 +1,107 @@
+# app/benchmarks/alignment.py
+
+# Compares the sweep aligner with the original turn x segment loop on
+# synthetic panel interviews:
+#
+#     python -m app.benchmarks.alignment --minutes 60 120 --speakers 3
+
+import argparse
+import random
+import time
+
+from app.core.alignement import extract_candidate_speech
+
+
+def pairwise_extract_candidate_speech(turns, segments):
+    """
+    The original nested-loop implementation, kept as the reference.
+    """
+    aligned = []
+
+    for turn_start, turn_end, speaker in turns:
+        for seg in segments:
+            if seg["end"] > turn_start and seg["start"] < turn_end:
+                aligned.append({
+                    "start": round(seg["start"], 2),
+                    "end": round(seg["end"], 2),
+                    "speaker": speaker,
+                    "text": seg["text"].strip()
+                })
+
+    seen = set()
+    unique = []
+    for item in aligned:
+        key = (item["start"], item["end"], item["speaker"], item["text"])
+        if key not in seen:
+            seen.add(key)
+            unique.append(item)
+
+    unique.sort(key=lambda x: x["start"])
+    return unique
+
+
+def synthetic_interview(minutes: float, speakers: int, seed: int = 0):
+    """
+    Builds diarization turns of 1-20 s with occasional overlap and Whisper
+    style segments of 2-8 s covering the same timeline.
+    """
+    rng = random.Random(seed)
+    duration = minutes * 60
+
+    turns = []
+    t = 0.0
+    while t < duration:
+        length = rng.uniform(1, 20)
+        overlap = rng.uniform(0, 0.8) if turns else 0.0
+        start = max(0.0, t - overlap)
+        turns.append((start, start + length, f"SPEAKER_{rng.randrange(speakers):02d}"))
+        t = start + length + rng.uniform(0, 1.5)
+
+    segments = []
+    t = 0.0
+    while t < duration:
+        length = rng.uniform(2, 8)
+        segments.append({"start": t, "end": t + length, "text": f" segment {len(segments)}"})
+        t += length
+
+    return turns, segments
+
+
+def _best_of(func, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Alignment benchmark")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60, 120])
+    parser.add_argument("--speakers", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'minutes':>8} {'turns':>7} {'segments':>9} {'pairwise s':>11} {'rows':>6} {'sweep s':>9} {'rows':>6} {'speedup':>8}")
+    for minutes in args.minutes:
+        turns, segments = synthetic_interview(minutes, args.speakers)
+
+        pairwise_seconds, pairwise_rows = _best_of(
+            lambda: pairwise_extract_candidate_speech(turns, segments), args.repeat
+        )
+        sweep_seconds, sweep_rows = _best_of(
+            lambda: extract_candidate_speech(turns, segments), args.repeat
+        )
+
+        print(
+            f"{minutes:>8.0f} {len(turns):>7} {len(segments):>9} "
+            f"{pairwise_seconds:>11.4f} {len(pairwise_rows):>6} "
+            f"{sweep_seconds:>9.4f} {len(sweep_rows):>6} "
+            f"{pairwise_seconds / max(sweep_seconds, 1e-9):>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
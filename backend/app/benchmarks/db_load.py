@@ -0,0 +1,133 @@
+# app/benchmarks/db_load.py
+
+# Load test of the list endpoints' queries through the sync Session (run
+# in a thread pool, as FastAPI does for `def` routes) and through the
+# async engine, with the pool settings from Settings:
+#
+#     python -m app.benchmarks.db_load --concurrency 10 50 100 --requests 2000
+#
+# With --url the same list endpoints are requested over HTTP from a
+# running API instead (e.g. --url http://localhost:5000/base-v1).
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.config import settings
+from app.db.database import AsyncSessionLocal, SessionLocal, dispose_async_engine, engine
+from app.db.models import Candidate, CandidateListItem, Interview, JobSession
+
+# FastAPI runs sync routes in anyio's default thread limiter
+FASTAPI_THREADPOOL_SIZE = 40
+
+LIST_QUERIES = {
+    "job-sessions": lambda: select(JobSession).limit(100),
+    "candidates": lambda: select(CandidateListItem).options(selectinload(CandidateListItem.candidate)).limit(100),
+    "persons": lambda: select(Candidate).limit(100),
+    "interviews": lambda: select(Interview).limit(100),
+}
+
+LIST_PATHS = {
+    "job-sessions": "/job-sessions/",
+    "candidates": "/candidates/",
+    "persons": "/candidates/persons/",
+    "interviews": "/interviews/",
+}
+
+
+def _summary(latencies, elapsed):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000, p95 * 1000
+
+
+def run_sync(name: str, concurrency: int, requests: int):
+    def one():
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            db.scalars(LIST_QUERIES[name]()).all()
+        finally:
+            db.close()
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, FASTAPI_THREADPOOL_SIZE)) as pool:
+        started = time.perf_counter()
+        latencies = list(pool.map(lambda _: one(), range(requests)))
+        return _summary(latencies, time.perf_counter() - started)
+
+
+async def run_async(name: str, concurrency: int, requests: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                (await db.scalars(LIST_QUERIES[name]())).all()
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    return _summary(latencies, time.perf_counter() - started)
+
+
+async def run_http(base_url: str, name: str, concurrency: int, requests: int):
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url.rstrip("/"), limits=limits, timeout=60.0) as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(LIST_PATHS[name])
+                response.raise_for_status()
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(one() for _ in range(requests)))
+        return _summary(latencies, time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List endpoint load benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--endpoints", nargs="+", default=list(LIST_QUERIES), choices=list(LIST_QUERIES))
+    parser.add_argument("--url", help="benchmark a running API over HTTP instead of the data layer")
+    args = parser.parse_args(argv)
+
+    print(
+        f"pool_size={settings.DB_POOL_SIZE} max_overflow={settings.DB_MAX_OVERFLOW} "
+        f"pre_ping={settings.DB_POOL_PRE_PING} recycle={settings.DB_POOL_RECYCLE}"
+    )
+    print(f"{'endpoint':>13} {'mode':>6} {'clients':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+
+    async def run_all_async():
+        for name in args.endpoints:
+            for concurrency in args.concurrency:
+                if args.url:
+                    modes = [("http", run_http(args.url, name, concurrency, args.requests))]
+                else:
+                    modes = [
+                        ("sync", asyncio.to_thread(run_sync, name, concurrency, args.requests)),
+                        ("async", run_async(name, concurrency, args.requests)),
+                    ]
+                for mode, runner in modes:
+                    rate, p50, p95 = await runner
+                    print(f"{name:>13} {mode:>6} {concurrency:>8} {rate:>9.1f} {p50:>8.2f} {p95:>8.2f}")
+        await dispose_async_engine()
+
+    asyncio.run(run_all_async())
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# app/benchmarks/explain_audit.py
+
+# Index audit of the list / filter routes: requests each route through
+# the ASGI app, records the SELECTs it sends (sync and async engine), and
+# runs EXPLAIN (FORMAT JSON) on each of them against DATABASE_URL:
+#
+#     alembic upgrade head
+#     python -m app.benchmarks.explain_audit
+#
+# The tables are ANALYZEd first. A route fails when any of its queries
+# plans a Seq Scan, or when none of them uses one of the indexes expected
+# for it (see migrations 0002).
+# Sequential scans are disabled for the EXPLAIN (enable_seqscan = off),
+# so a small development database answers whether an index *can* serve
+# the query; --real-planner shows the plans chosen on the actual data.
+# Exits with status 1 on failure, so it can gate a deploy.
+
+import argparse
+from typing import Dict, List, Optional
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+
+from app.config import settings
+from app.db.database import Base, engine, get_async_engine
+from app.db.models import CandidateListItem, Interview, JobSession, User
+
+# Route ids used by the cases, from existing rows
+IDS = {
+    "user_id": select(func.min(User.id)),
+    "job_session_id": select(func.min(JobSession.id)),
+    "interview_id": select(func.min(Interview.id)),
+    "candidate_item_id": select(func.min(CandidateListItem.id)),
+}
+
+SESSION_ORDER = "ix_candidate_list_items_session_order"
+SESSION_SCORE = "ix_candidate_list_items_session_score"
+SESSION_STATUS = "ix_candidate_list_items_session_status"
+
+# (label, path, query params, indexes of which one must be used)
+CASES = [
+    ("job sessions", "/job-sessions/", {}, ["ix_job_sessions_created"]),
+    ("job sessions oldest", "/job-sessions/", {"sort": "oldest"}, ["ix_job_sessions_created"]),
+    ("job sessions by owner", "/job-sessions/", {"owner_id": "{user_id}", "include_total": "true"}, ["ix_job_sessions_owner_created"]),
+    ("session candidates", "/candidates/job-session/{job_session_id}", {"include_total": "true"}, [SESSION_ORDER]),
+    ("session candidates by score", "/candidates/job-session/{job_session_id}", {"sort": "score"}, [SESSION_SCORE]),
+    ("session candidates by status", "/candidates/job-session/{job_session_id}", {"status": "pending"}, [SESSION_STATUS, SESSION_ORDER]),
+    ("session candidates min score", "/candidates/job-session/{job_session_id}", {"sort": "score", "min_score": "50"}, [SESSION_SCORE, SESSION_ORDER]),
+    ("list items by session", "/candidates/", {"job_session_id": "{job_session_id}", "include_total": "true"}, [SESSION_ORDER]),
+    ("persons", "/candidates/persons/", {"include_total": "true"}, ["candidates_pkey"]),
+    ("interviews by session", "/interviews/", {"job_session_id": "{job_session_id}", "include_total": "true"}, ["ix_interviews_session_created"]),
+    ("interviews by status", "/interviews/", {"status": "processing", "include_total": "true"}, ["ix_interviews_status_created"]),
+    ("interviews by session and status", "/interviews/", {"job_session_id": "{job_session_id}", "status": "completed"}, ["ix_interviews_session_created", "ix_interviews_status_created"]),
+    ("interviews by candidate item", "/interviews/", {"candidate_item_id": "{candidate_item_id}"}, ["interviews_candidate_item_id_key"]),
+    ("transcription segments", "/interviews/{interview_id}/transcription-segments", {}, ["ix_transcription_segments_interview_start"]),
+    ("speaker segments", "/interviews/{interview_id}/speaker-segments", {}, ["ix_speaker_segments_interview_start"]),
+    ("training by user", "/training/", {"user_id": "{user_id}", "include_total": "true"}, ["ix_training_sessions_user_created"]),
+    ("users by role", "/users/", {"role": "recruiter", "include_total": "true"}, ["ix_users_role_id"]),
+    ("dashboard summary", "/dashboard/summary", {"owner_id": "{user_id}"}, ["ix_job_sessions_owner_created"]),
+]
+
+
+class StatementRecorder:
+    """Records the SELECTs on the app's tables sent by both engines."""
+
+    def __init__(self):
+        self.statements: List = []
+        self.tables = set(Base.metadata.tables)
+        self.engines = [engine, get_async_engine().sync_engine]
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        words = statement.replace("\n", " ").split()
+        touched = {
+            words[i + 1].strip('"') for i, word in enumerate(words[:-1])
+            if word.upper() in ("FROM", "JOIN")
+        }
+        if statement.lstrip().upper().startswith("SELECT") and touched & self.tables:
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        for target in self.engines:
+            event.listen(target, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        for target in self.engines:
+            event.remove(target, "before_cursor_execute", self._record)
+
+
+def _walk(plan: Dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+def explain(connection, statement: str, parameters) -> Dict:
+    sql = "EXPLAIN (FORMAT JSON) " + statement
+    result = connection.exec_driver_sql(sql, parameters) if parameters else connection.exec_driver_sql(sql)
+    return result.scalar()[0]["Plan"]
+
+
+def _resolve_ids() -> Dict[str, Optional[int]]:
+    with engine.connect() as connection:
+        return {name: connection.scalar(statement) for name, statement in IDS.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EXPLAIN audit of the list / filter routes")
+    parser.add_argument("--real-planner", action="store_true", help="keep sequential scans enabled")
+    parser.add_argument("--verbose", action="store_true", help="print every plan node")
+    args = parser.parse_args(argv)
+
+    # The audit only needs the data layer
+    settings.PRELOAD_MODELS = False
+    from app.api.main import app
+
+    ids = _resolve_ids()
+    failures = 0
+
+    with TestClient(app) as client, engine.connect() as connection:
+        # Fresh statistics: on a just loaded database the planner otherwise
+        # works from defaults and picks the wrong index
+        connection.exec_driver_sql("ANALYZE " + ", ".join(table.name for table in Base.metadata.sorted_tables))
+        connection.commit()
+
+        if not args.real_planner:
+            connection.exec_driver_sql("SET enable_seqscan = off")
+
+        print(f"{'route':>34} {'queries':>8} {'result':>8}  indexes")
+        for label, path, params, expected in CASES:
+            missing = [name for name in IDS if "{" + name + "}" in path + str(params) and ids[name] is None]
+            if missing:
+                print(f"{label:>34} {'-':>8} {'skipped':>8}  no rows for {', '.join(missing)}")
+                continue
+
+            with StatementRecorder() as recorder:
+                response = client.get(
+                    settings.API_V1_STR + path.format(**ids),
+                    params={key: value.format(**ids) for key, value in params.items()},
+                )
+            if response.status_code != 200:
+                failures += 1
+                print(f"{label:>34} {'-':>8} {'FAIL':>8}  HTTP {response.status_code}")
+                continue
+
+            used, seq_scans = set(), []
+            for statement, parameters in recorder.statements:
+                for node in _walk(explain(connection, statement, parameters)):
+                    if node.get("Index Name"):
+                        used.add(node["Index Name"])
+                    if node["Node Type"] == "Seq Scan":
+                        seq_scans.append(node["Relation Name"])
+                    if args.verbose:
+                        print(f"{'':>44}{node['Node Type']} {node.get('Relation Name', '')} {node.get('Index Name', '')}")
+
+            ok = not seq_scans and used & set(expected)
+            failures += 0 if ok else 1
+            detail = ", ".join(sorted(used)) or "none"
+            if seq_scans:
+                detail += f"; Seq Scan on {', '.join(sorted(set(seq_scans)))}"
+            elif not ok:
+                detail += f"; expected one of {', '.join(expected)}"
+            print(f"{label:>34} {len(recorder.statements):>8} {'ok' if ok else 'FAIL':>8}  {detail}")
+
+    engine.dispose()
+    if failures:
+        raise SystemExit(f"{failures} route(s) not served by an index")
+
+
+if __name__ == "__main__":
+    main()
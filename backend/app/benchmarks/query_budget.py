@@ -0,0 +1,175 @@
+# app/benchmarks/query_budget.py
+
+# Query budget check of the read routes: creates a small fixture (an
+# owner with job sessions, candidates, analysed interviews, segments and
+# a training session) in DATABASE_URL, requests each route through the
+# ASGI app, reads the number of SQL statements it issued (X-Query-Count,
+# app.utils.query_count) and removes the fixture again:
+#
+#     python -m app.benchmarks.query_budget
+#
+# Every list holds several rows, so a relationship loaded per row (N+1)
+# shows up as a count above the route's budget. A budget only grows with
+# the number of relationships loaded, never with the number of rows (see
+# the profiles in app.db.loading). Exits with status 1 when a route is
+# over budget.
+
+import argparse
+import uuid
+from typing import Dict
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.db.database import SessionLocal, engine
+from app.db.models import (
+    AnalysisResult,
+    Candidate,
+    CandidateListItem,
+    Interview,
+    JobSession,
+    SpeakerSegment,
+    TrainingSession,
+    TranscriptionSegment,
+    User,
+)
+from app.utils.query_count import QUERY_COUNT_HEADER
+
+SESSIONS = 3
+CANDIDATES_PER_SESSION = 4
+
+# (path, query params, max SQL statements)
+CASES = [
+    ("/job-sessions/", {"owner_id": "{user_id}", "include_total": "true"}, 2),
+    ("/job-sessions/{job_session_id}", {}, 1),
+    ("/job-sessions/{job_session_id}/analysis-progress", {}, 3),
+    ("/candidates/job-session/{job_session_id}", {}, 3),
+    ("/candidates/", {"job_session_id": "{job_session_id}", "include_total": "true"}, 3),
+    ("/candidates/{candidate_item_id}", {}, 1),
+    ("/candidates/persons/", {}, 1),
+    ("/interviews/", {"job_session_id": "{job_session_id}", "include_total": "true"}, 2),
+    ("/interviews/{interview_id}", {}, 1),
+    ("/interviews/{interview_id}/transcription-segments", {}, 2),
+    ("/interviews/{interview_id}/speaker-segments", {}, 2),
+    ("/analysis/interview/{interview_id}", {}, 1),
+    ("/training/", {"user_id": "{user_id}"}, 1),
+    ("/users/", {"role": "recruiter"}, 1),
+    ("/users/{user_id}", {}, 1),
+    ("/dashboard/summary", {"owner_id": "{user_id}"}, 3),
+]
+
+
+def create_fixture(db) -> Dict[str, int]:
+    owner = User(
+        first_name="Query",
+        last_name="Budget",
+        email=f"query-budget-{uuid.uuid4().hex[:12]}@example.com",
+        password_hash="-",
+        role="recruiter",
+        is_active=True,
+    )
+    db.add(owner)
+    db.flush()
+
+    ids = {"user_id": owner.id, "candidate_ids": []}
+    for s in range(SESSIONS):
+        session = JobSession(owner_user_id=owner.id, title=f"Query budget {s}", job_title="Engineer")
+        db.add(session)
+        db.flush()
+        ids.setdefault("job_session_id", session.id)
+
+        for c in range(CANDIDATES_PER_SESSION):
+            person = Candidate(first_name=f"Candidate {c}", last_name="Budget")
+            db.add(person)
+            db.flush()
+            ids["candidate_ids"].append(person.id)
+
+            item = CandidateListItem(
+                job_session_id=session.id,
+                candidate_id=person.id,
+                list_order=c,
+                score=50.0 + c,
+                status="analyzed",
+            )
+            db.add(item)
+            db.flush()
+            ids.setdefault("candidate_item_id", item.id)
+
+            interview = Interview(
+                job_session_id=session.id,
+                candidate_item_id=item.id,
+                audio_path="query-budget.wav",
+                status="completed",
+                audio_seconds=60.0,
+            )
+            db.add(interview)
+            db.flush()
+            ids.setdefault("interview_id", interview.id)
+
+            db.add(AnalysisResult(interview_id=interview.id, final_score=50.0 + c, feedback="-"))
+            for n in range(3):
+                db.add(TranscriptionSegment(interview_id=interview.id, start_seconds=n, end_seconds=n + 1, transcript="-"))
+                db.add(SpeakerSegment(interview_id=interview.id, speaker_label="SPEAKER_00", start_seconds=n, end_seconds=n + 1, text="-"))
+
+    db.add(TrainingSession(user_id=owner.id, difficulty_level="easy"))
+    db.commit()
+    return ids
+
+
+def drop_fixture(db, ids: Dict) -> None:
+    # ON DELETE CASCADE removes the sessions, list items, interviews,
+    # results, segments and training sessions of the owner
+    db.query(User).filter(User.id == ids["user_id"]).delete(synchronize_session=False)
+    db.query(Candidate).filter(Candidate.id.in_(ids["candidate_ids"])).delete(synchronize_session=False)
+    db.commit()
+
+
+def _get(client, path: str, params: Dict, ids: Dict):
+    return client.get(
+        settings.API_V1_STR + path.format(**ids),
+        params={key: value.format(**ids) for key, value in params.items()},
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQL statements per request of the read routes")
+    parser.add_argument("--slack", type=int, default=0, help="statements allowed above each budget")
+    args = parser.parse_args(argv)
+
+    # Before the app is imported: the middleware reads them at startup
+    settings.QUERY_COUNT_HEADER = True
+    settings.PRELOAD_MODELS = False
+    from app.api.main import app
+
+    db = SessionLocal()
+    ids = create_fixture(db)
+    over_budget = 0
+
+    try:
+        with TestClient(app) as client:
+            # Unmeasured pass: the first connection of each engine also runs
+            # the dialect's initialization queries
+            for path, params, _ in CASES:
+                _get(client, path, params, ids)
+
+            print(f"{'route':>50} {'status':>7} {'queries':>8} {'budget':>7}")
+            for path, params, budget in CASES:
+                response = _get(client, path, params, ids)
+                count = int(response.headers.get(QUERY_COUNT_HEADER, -1))
+                failed = response.status_code != 200 or count > budget + args.slack
+                over_budget += failed
+                print(
+                    f"{path:>50} {response.status_code:>7} {count:>8} {budget:>7}"
+                    f"{'  OVER BUDGET' if count > budget + args.slack else ''}"
+                )
+    finally:
+        drop_fixture(db, ids)
+        db.close()
+        engine.dispose()
+
+    if over_budget:
+        raise SystemExit(f"{over_budget} route(s) failed or over their query budget")
+
+
+if __name__ == "__main__":
+    main()
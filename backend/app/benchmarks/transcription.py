@@ -0,0 +1,114 @@
+# app/benchmarks/transcription.py
+
+# Compares transcription engines and model sizes on fixture recordings
+# with a reference transcript (a .txt file next to each audio file):
+#
+#     python -m app.benchmarks.transcription fixtures/*.wav \
+#         --engines whisper whisper-int8 faster-whisper --sizes base small
+#
+# Reports the model load time, the real-time factor (transcription wall
+# time / audio duration, lower is faster) and the word error rate against
+# the reference, so throughput vs. accuracy can be chosen explicitly.
+
+import argparse
+import os
+import re
+import time
+import unicodedata
+
+from app.core.model_registry import registry
+from app.core.transcription_engines import TRANSCRIPTION_ENGINES, get_engine
+from app.utils.audio import audio_duration, load_decoded_audio
+
+
+def normalize_words(text: str):
+    """
+    Lowercase, accent- and punctuation-free words, so WER counts
+    recognition errors rather than formatting differences.
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return re.findall(r"[a-z0-9']+", text)
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    (substitutions + deletions + insertions) / reference words, by word
+    level edit distance.
+    """
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+
+    return previous[-1] / len(ref)
+
+
+def _reference_for(audio_path: str) -> str:
+    path = os.path.splitext(audio_path)[0] + ".txt"
+    if not os.path.exists(path):
+        raise SystemExit(f"Missing reference transcript {path}")
+    with open(path, encoding="utf-8") as handle:
+        return handle.read()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcription engine benchmark")
+    parser.add_argument("audio", nargs="+", help="fixture recordings, each with a <name>.txt reference")
+    parser.add_argument("--engines", nargs="+", default=list(TRANSCRIPTION_ENGINES), choices=list(TRANSCRIPTION_ENGINES))
+    parser.add_argument("--sizes", nargs="+", default=["base"])
+    args = parser.parse_args(argv)
+
+    fixtures = [(path, load_decoded_audio(path), _reference_for(path)) for path in args.audio]
+    total_audio = sum(audio_duration(audio) for _, audio, _ in fixtures)
+    print(f"{len(fixtures)} fixture(s), {total_audio:.1f}s of audio")
+
+    print(f"{'engine':>15} {'size':>9} {'load s':>8} {'wall s':>9} {'RTF':>7} {'WER':>7}")
+    for engine_name in args.engines:
+        engine = get_engine(engine_name)
+
+        for size in args.sizes:
+            try:
+                started = time.perf_counter()
+                engine.model(size)
+                load_seconds = time.perf_counter() - started
+            except Exception as exc:
+                print(f"{engine_name:>15} {size:>9} unavailable: {exc}")
+                continue
+
+            wall = 0.0
+            errors = 0.0
+            reference_words = 0
+            for _, audio, reference in fixtures:
+                started = time.perf_counter()
+                segments = engine.transcribe(audio, size)
+                wall += time.perf_counter() - started
+
+                # Weight each fixture's WER by its length in words
+                words = len(normalize_words(reference))
+                hypothesis = " ".join(seg["text"] for seg in segments)
+                errors += word_error_rate(reference, hypothesis) * words
+                reference_words += words
+
+            print(
+                f"{engine_name:>15} {size:>9} {load_seconds:>8.2f} {wall:>9.2f} "
+                f"{wall / max(total_audio, 1e-9):>7.3f} {errors / max(reference_words, 1):>7.3f}"
+            )
+
+            # One checkpoint in memory at a time
+            registry.evict(engine.model_key(size))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,233 @@
 # app/core/alignement.py
 
-def extract_candidate_speech(diarization, segments):
-    annotation = diarization.speaker_diarization
-    aligned = []
-
-    for turn, _, speaker in annotation.itertracks(yield_label=True):
-        for seg in segments:
-            if seg["end"] > turn.start and seg["start"] < turn.end:
-                aligned.append({
-                    "start": round(seg["start"], 2),
-                    "end": round(seg["end"], 2),
-                    "speaker": speaker,
-                    "text": seg["text"].strip()
-                })
-
-    # Remove duplicates
-    seen = set()
-    unique = []
-    for item in aligned:
-        key = (item["start"], item["end"], item["speaker"], item["text"])
-        if key not in seen:
-            seen.add(key)
-            unique.append(item)
-
-    # Sort by time
-    unique.sort(key=lambda x: x["start"])
-    return unique
+# Assigns every Whisper segment (or word) to the diarization speaker it
+# overlaps the most. Turns and segments are both sorted by start time and
+# swept once, so the cost is O((n + m) log n) instead of comparing every
+# turn against every segment.
+
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+Turn = Tuple[float, float, str]
+
+# Cosine similarity above which a diarized speaker is taken to be the
+# enrolled interviewer voice
+INTERVIEWER_MATCH_THRESHOLD = 0.5
+
+_QUESTION_START_RE = re.compile(
+    r"^(what|why|how|when|where|who|which|can|could|would|do|does|did|are|is|have|tell me|describe"
+    r"|qu'est-ce|quel|quelle|quels|quelles|pourquoi|comment|quand|où|combien|est-ce|pouvez-vous|parlez-moi)\b",
+    re.IGNORECASE,
+)
+
+
+def speaker_turns(diarization) -> List[Turn]:
+    """
+    Normalises a diarization result to a start-sorted list of
+    (start, end, speaker). Accepts the pyannote pipeline output, a bare
+    pyannote Annotation or an already extracted list of turns.
+    """
+    if isinstance(diarization, list):
+        turns = [(float(start), float(end), speaker) for start, end, speaker in diarization]
+    else:
+        annotation = getattr(diarization, "speaker_diarization", diarization)
+        turns = [
+            (float(turn.start), float(turn.end), speaker)
+            for turn, _, speaker in annotation.itertracks(yield_label=True)
+        ]
+
+    turns.sort(key=lambda turn: (turn[0], turn[1]))
+    return turns
+
+
+def _assign_speakers(intervals: List[Dict], turns: List[Turn]) -> Iterable[Tuple[Dict, Optional[str]]]:
+    """
+    Sweep over start-sorted intervals and turns, yielding each interval with
+    the speaker of maximal cumulative overlap (None when nothing overlaps).
+    """
+    active: List[Turn] = []
+    next_turn = 0
+
+    for interval in sorted(intervals, key=lambda item: item["start"]):
+        start, end = interval["start"], interval["end"]
+
+        # Turns starting before this interval ends become candidates
+        while next_turn < len(turns) and turns[next_turn][0] < end:
+            active.append(turns[next_turn])
+            next_turn += 1
+
+        # Turns ending before this interval starts can never overlap again
+        active = [turn for turn in active if turn[1] > start]
+
+        overlap_by_speaker: Dict[str, float] = {}
+        for turn_start, turn_end, speaker in active:
+            overlap = min(end, turn_end) - max(start, turn_start)
+            if overlap > 0:
+                overlap_by_speaker[speaker] = overlap_by_speaker.get(speaker, 0.0) + overlap
+
+        if not overlap_by_speaker:
+            yield interval, None
+            continue
+
+        yield interval, max(overlap_by_speaker, key=overlap_by_speaker.get)
+
+
+def _word_level_rows(segments: List[Dict], turns: List[Turn]) -> List[Dict]:
+    words = [
+        {"start": word["start"], "end": word["end"], "text": word["word"]}
+        for seg in segments
+        for word in seg.get("words") or []
+    ]
+
+    rows: List[Dict] = []
+    for word, speaker in _assign_speakers(words, turns):
+        if speaker is None:
+            continue
+
+        if rows and rows[-1]["speaker"] == speaker:
+            rows[-1]["end"] = word["end"]
+            rows[-1]["text"] += word["text"]
+        else:
+            rows.append({
+                "start": word["start"],
+                "end": word["end"],
+                "speaker": speaker,
+                "text": word["text"],
+            })
+
+    return rows
+
+
+def extract_candidate_speech(diarization, segments, word_level: bool = False):
+    """
+    Returns one row per transcript segment, labelled with the speaker who
+    talks the most during it. With word_level=True (segments transcribed
+    with word_timestamps) each word is assigned on its own and consecutive
+    words of the same speaker are merged, splitting segments that span a
+    speaker change.
+    """
+    turns = speaker_turns(diarization)
+
+    if word_level and any(seg.get("words") for seg in segments):
+        rows = _word_level_rows(segments, turns)
+    else:
+        rows = [
+            {**seg, "speaker": speaker}
+            for seg, speaker in _assign_speakers(segments, turns)
+            if speaker is not None
+        ]
+
+    return [
+        {
+            "start": round(row["start"], 2),
+            "end": round(row["end"], 2),
+            "speaker": row["speaker"],
+            "text": row["text"].strip(),
+        }
+        for row in rows
+    ]
+
+
+def speaker_embeddings(diarization) -> Dict[str, List[float]]:
+    """
+    Per-speaker voice embeddings of a pyannote pipeline output (pyannote 4
+    returns them as `speaker_embeddings`, one row per label in label
+    order). Empty for outputs without embeddings or already extracted turns.
+    """
+    embeddings = getattr(diarization, "speaker_embeddings", None)
+    annotation = getattr(diarization, "speaker_diarization", None)
+    if embeddings is None or annotation is None:
+        return {}
+
+    result = {}
+    for label, vector in zip(annotation.labels(), embeddings):
+        values = [float(x) for x in vector]
+        if not any(math.isnan(x) for x in values):
+            result[label] = values
+    return result
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def match_interviewer(
+    embeddings: Dict[str, List[float]],
+    interviewer_embedding: Optional[Sequence[float]],
+) -> Optional[str]:
+    """
+    Speaker whose voice matches the enrolled interviewer embedding, if any
+    is similar enough.
+    """
+    if not embeddings or not interviewer_embedding:
+        return None
+
+    similarity = {
+        label: _cosine(vector, interviewer_embedding)
+        for label, vector in embeddings.items()
+        if len(vector) == len(interviewer_embedding)
+    }
+    if not similarity:
+        return None
+
+    best = max(similarity, key=similarity.get)
+    return best if similarity[best] >= INTERVIEWER_MATCH_THRESHOLD else None
+
+
+def _is_question(text: str) -> bool:
+    text = text.strip()
+    return text.endswith("?") or bool(_QUESTION_START_RE.match(text))
+
+
+def identify_candidate_speaker(
+    rows: List[Dict],
+    interviewer: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Picks the candidate among the speakers of aligned rows.
+
+    With a known interviewer label (voice enrollment), the candidate is the
+    other speaker with the most talk time. Otherwise each speaker is scored
+    on talk-time share minus the share of their rows that are questions:
+    interviewers ask, candidates answer at length.
+    """
+    talk_time: Dict[str, float] = {}
+    rows_by_speaker: Dict[str, int] = {}
+    questions: Dict[str, int] = {}
+
+    for row in rows:
+        speaker = row.get("speaker")
+        if speaker is None:
+            continue
+        talk_time[speaker] = talk_time.get(speaker, 0.0) + max(0.0, float(row["end"]) - float(row["start"]))
+        rows_by_speaker[speaker] = rows_by_speaker.get(speaker, 0) + 1
+        if _is_question(row.get("text") or ""):
+            questions[speaker] = questions.get(speaker, 0) + 1
+
+    if interviewer is not None and len(talk_time) > 1:
+        talk_time.pop(interviewer, None)
+
+    if not talk_time:
+        return None
+
+    total = sum(talk_time.values()) or 1.0
+
+    def score(speaker):
+        question_share = questions.get(speaker, 0) / rows_by_speaker[speaker]
+        return talk_time[speaker] / total - 0.5 * question_share
+
+    return max(talk_time, key=score)
+
+
+def candidate_turns(rows: List[Dict], candidate: Optional[str]) -> List[Dict]:
+    """
+    Rows of the candidate only. Rows are returned unchanged when there is a
+    single speaker (or no decision could be made).
+    """
+    speakers = {row.get("speaker") for row in rows}
+    if candidate is None or len(speakers) < 2:
+        return list(rows)
+    return [row for row in rows if row.get("speaker") == candidate]
@@ -1,11 +1,181 @@
 import traceback
+from sqlalchemy import insert
+from app.db import loading
 from app.db.database import SessionLocal
-from app.db.models import Interview, AnalysisResult
-from app.core.pipeline import full_audio_evaluation
+from app.db.models import Interview, AnalysisResult, SpeakerSegment, TranscriptionSegment
+from app.core.alignement import identify_candidate_speaker, match_interviewer
+from app.core.pipeline import full_audio_evaluation, load_aligned_transcript, score_transcript, score_transcripts
+from app.core.transcription_engines import transcription_model_id
+from app.core import progress as analysis_progress
+from app.core.checkpoints import CheckpointStore, clear_checkpoints
+from app.core.telemetry import PipelineRun, record_stage_totals
 
-def run_analysis_pipeline(interview_id: int):
+
+class TranscriptUnavailable(Exception):
+    """The interview has no reusable transcript; the audio must be re-analysed."""
+
+
+class ScoringUnavailable(Exception):
+    """The scoring backend failed; the previous scores are kept."""
+
+
+def job_requirements(job_session):
+    job_title = getattr(job_session, "job_title", "") or ""
+    qualities_raw = getattr(job_session, "qualities", "") or ""
+
+    required_qualities = [
+        q.strip() for q in qualities_raw.split(",") if q.strip()
+    ] if isinstance(qualities_raw, str) else []
+
+    return job_title, required_qualities
+
+
+def store_analysis(db, interview, result):
+    # Already loaded when the interview was queried with
+    # loading.INTERVIEWS_TO_SCORE, lazy loaded otherwise
+    analysis = interview.analysis_result
+
+    if not analysis:
+        analysis = AnalysisResult(interview_id=interview.id)
+        interview.analysis_result = analysis
+        db.add(analysis)
+
+    analysis.content_relevance = float(result["content_relevance"])
+    analysis.vocal_confidence = float(result["vocal_confidence"])
+    analysis.clarity_of_speech = float(result["clarity_of_speech"])
+    analysis.fluency = float(result["fluency"])
+    analysis.final_score = float(result["final_score"])
+    analysis.feedback = result["feedback"]
+    return analysis
+
+
+def _valid_span(row):
+    # Mirrors the table check constraints (start >= 0, end > start)
+    start, end = round(float(row["start"]), 3), round(float(row["end"]), 3)
+    if start < 0 or end <= start:
+        return None
+    return start, end
+
+
+def _transcription_rows(interview_id, transcription_segments):
+    rows = []
+    for seg in transcription_segments or []:
+        span = _valid_span(seg)
+        if span:
+            rows.append({
+                "interview_id": interview_id,
+                "start_seconds": span[0],
+                "end_seconds": span[1],
+                "transcript": (seg.get("text") or "").strip(),
+            })
+    return rows
+
+
+def store_segments(db, interview_id, transcription_segments, speaker_segments):
+    """
+    Replaces the stored segments of an interview. Each table is written
+    with one bulk INSERT (executemany, batched into multi-row VALUES by
+    SQLAlchemy) instead of one ORM object per row.
+    """
+    db.query(TranscriptionSegment).filter(
+        TranscriptionSegment.interview_id == interview_id
+    ).delete(synchronize_session=False)
+    db.query(SpeakerSegment).filter(
+        SpeakerSegment.interview_id == interview_id
+    ).delete(synchronize_session=False)
+
+    transcription_rows = _transcription_rows(interview_id, transcription_segments)
+
+    speaker_rows = []
+    for seg in speaker_segments or []:
+        span = _valid_span(seg)
+        if span:
+            speaker_rows.append({
+                "interview_id": interview_id,
+                "speaker_label": seg.get("speaker"),
+                "start_seconds": span[0],
+                "end_seconds": span[1],
+                "text": seg.get("text") or "",
+            })
+
+    if transcription_rows:
+        db.execute(insert(TranscriptionSegment), transcription_rows)
+    if speaker_rows:
+        db.execute(insert(SpeakerSegment), speaker_rows)
+
+    return len(transcription_rows), len(speaker_rows)
+
+
+def partial_transcript_writer(interview_id):
+    """
+    Callback appending the segments of each transcribed window as soon as
+    it is done, so a long interview's transcript can be read while the
+    analysis runs. store_segments replaces them with the final rows.
+    """
+    state = {"cleared": False}
+
+    def write(segments):
+        db = SessionLocal()
+        try:
+            if not state["cleared"]:
+                db.query(TranscriptionSegment).filter(
+                    TranscriptionSegment.interview_id == interview_id
+                ).delete(synchronize_session=False)
+                state["cleared"] = True
+
+            rows = _transcription_rows(interview_id, segments)
+            if rows:
+                db.execute(insert(TranscriptionSegment), rows)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            print(f"[WORKER] Partial transcript write failed for interview {interview_id}: {exc}")
+        finally:
+            db.close()
+
+    return write
+
+
+def load_stored_transcript(db, interview_id):
+    rows = db.query(
+        SpeakerSegment.start_seconds,
+        SpeakerSegment.end_seconds,
+        SpeakerSegment.speaker_label,
+        SpeakerSegment.text,
+    ).filter(
+        SpeakerSegment.interview_id == interview_id
+    ).order_by(SpeakerSegment.start_seconds, SpeakerSegment.id).all()
+
+    return [
+        {"start": float(start), "end": float(end), "speaker": speaker, "text": text or ""}
+        for start, end, speaker, text in rows
+    ]
+
+
+def run_analysis_pipeline(
+    interview_id: int,
+    raise_errors: bool = False,
+    defer_scoring: bool = False,
+    force: bool = False,
+):
+    """
+    Analyses one interview and stores the scores. On error the interview
+    is marked failed, unless raise_errors: then the exception is propagated
+    with the interview left in "processing", so the job queue can record
+    the attempt and retry it (process_job reports the final failure).
+
+    With defer_scoring (batch analysis) the transcript is stored and the
+    interview left at the "awaiting_scoring" stage for score_interviews.
+
+    Idempotent: a job delivered again after the interview completed (the
+    worker died before acknowledging it) does nothing unless `force`, and
+    a retried analysis resumes from the stage checkpoints of the
+    previous attempt.
+    """
     db = SessionLocal()
     interview = None
+    run = None
+    result = {}
 
     try:
         print(f"[WORKER] Starting analysis for interview_id={interview_id}")
@@ -15,9 +185,15 @@ def run_analysis_pipeline(interview_id: int):
             print(f"[WORKER] Interview {interview_id} not found")
             return
 
+        if interview.status in ("completed", "ready", "reviewed") and not force:
+            print(f"[WORKER] Interview {interview_id} already analysed, skipping")
+            return
+
         interview.status = "processing"
         db.commit()
         db.refresh(interview)
+        reporter = analysis_progress.ProgressReporter(interview_id)
+        reporter.update("queued")
 
         print(f"[WORKER] audio_path={interview.audio_path}")
 
@@ -27,43 +203,71 @@ def run_analysis_pipeline(interview_id: int):
             db.commit()
             return
 
-        job_title = getattr(interview.job_session, "job_title", "") or ""
-        qualities_raw = getattr(interview.job_session, "qualities", "") or ""
-
-        required_qualities = [
-            q.strip() for q in qualities_raw.split(",") if q.strip()
-        ] if isinstance(qualities_raw, str) else []
+        job_title, required_qualities = job_requirements(interview.job_session)
 
         print(f"[WORKER] job_title={job_title}")
         print(f"[WORKER] required_qualities={required_qualities}")
 
+        run = PipelineRun("analysis", interview_id=interview_id)
         result = full_audio_evaluation(
             audio_path=interview.audio_path,
             job_title=job_title,
-            required_qualities=required_qualities
+            required_qualities=required_qualities,
+            audio_hash=interview.audio_hash,
+            scoring_backend=interview.job_session.scoring_backend,
+            transcription_engine=interview.job_session.transcription_engine,
+            model_size=interview.job_session.transcription_model_size,
+            interviewer_embedding=interview.job_session.interviewer_embedding,
+            run=run,
+            progress=reporter,
+            on_segments=partial_transcript_writer(interview_id),
+            score=not defer_scoring,
+            checkpoints=CheckpointStore(interview_id),
         )
 
-        print(f"[WORKER] Pipeline result={result}")
+        summary = {
+            key: value for key, value in result.items()
+            if key not in ("candidate_transcript", "transcription_segments", "speaker_embeddings")
+        }
+        print(f"[WORKER] Pipeline result={summary}")
 
-        analysis = db.query(AnalysisResult).filter(
-            AnalysisResult.interview_id == interview.id
-        ).first()
+        if not defer_scoring and not result["complete"]:
+            # Never publish the zero scores of a failed scoring call: the
+            # retry resumes from the stage checkpoints, the last attempt
+            # marks the interview failed
+            raise ScoringUnavailable(f"Scoring of interview {interview_id} failed: {result['feedback']}")
 
-        if not analysis:
-            analysis = AnalysisResult(interview_id=interview.id)
-            db.add(analysis)
+        # Published before the interview row is touched in this transaction
+        reporter.update("db_write")
+        with run.stage("db_write") as extra:
+            if not defer_scoring:
+                store_analysis(db, interview, result)
+            extra["transcription_rows"], extra["speaker_rows"] = store_segments(
+                db,
+                interview.id,
+                result.get("transcription_segments"),
+                result.get("candidate_transcript"),
+            )
 
-        analysis.content_relevance = float(result["content_relevance"])
-        analysis.vocal_confidence = float(result["vocal_confidence"])
-        analysis.clarity_of_speech = float(result["clarity_of_speech"])
-        analysis.fluency = float(result["fluency"])
-        analysis.final_score = float(result["final_score"])
-        analysis.feedback = result["feedback"]
+            interview.audio_hash = result.get("audio_hash") or interview.audio_hash
+            interview.candidate_speaker = result.get("candidate_speaker")
+            interview.speaker_embeddings = result.get("speaker_embeddings") or None
+            interview.audio_seconds = result.get("audio_seconds") or interview.audio_seconds
+            if not defer_scoring:
+                interview.status = "completed"
+                clear_checkpoints(db, interview.id)
+            db.commit()
 
-        interview.status = "completed"
+        metrics = run.finish(result.get("audio_seconds"))
+        interview.pipeline_metrics = metrics
+        record_stage_totals(db, metrics)
         db.commit()
+        if defer_scoring:
+            analysis_progress.publish(interview_id, stage="awaiting_scoring")
+        else:
+            analysis_progress.publish(interview_id, stage="completed", percent=100.0)
 
-        print(f"[WORKER] Completed interview_id={interview_id}")
+        print(f"[WORKER] Completed interview_id={interview_id} metrics={metrics}")
 
     except Exception as exc:
         print(f"[WORKER ERROR] {exc}")
@@ -71,10 +275,159 @@ def run_analysis_pipeline(interview_id: int):
 
         if interview:
             try:
-                interview.status = "failed"
+                db.rollback()
+                # With raise_errors the job queue may still retry: the worker
+                # marks the interview failed once no attempt is left
+                if not raise_errors:
+                    interview.status = "failed"
+                if run is not None:
+                    interview.pipeline_metrics = run.finish(
+                        result.get("audio_seconds"), status=f"{type(exc).__name__}: {exc}"
+                    )
                 db.commit()
+                if not raise_errors:
+                    analysis_progress.publish(interview_id, stage="failed")
             except Exception as db_exc:
                 print(f"[WORKER DB ERROR] {db_exc}")
 
+        if raise_errors:
+            raise
+
+    finally:
+        db.close()
+
+
+def score_interviews(interview_ids, db=None):
+    """
+    Scores interviews whose analysis ran with defer_scoring, all at once
+    (one Scorer.score_many batch per scoring backend). Interviews not at
+    the "awaiting_scoring" stage are skipped, and interviews whose scoring
+    call failed stay there for the next wave. Returns the scored ids.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+
+    try:
+        interviews = db.query(Interview).options(*loading.INTERVIEWS_TO_SCORE).filter(
+            Interview.id.in_(list(interview_ids)),
+            Interview.status == "processing",
+            Interview.progress_stage == "awaiting_scoring",
+        ).all()
+
+        by_backend = {}
+        for interview in interviews:
+            transcript = load_stored_transcript(db, interview.id)
+            if not transcript:
+                continue
+
+            job_title, required_qualities = job_requirements(interview.job_session)
+            session = interview.job_session
+            by_backend.setdefault(getattr(session, "scoring_backend", None), []).append((interview, {
+                "transcript": transcript,
+                "job_title": job_title,
+                "required_qualities": required_qualities,
+                "audio_hash": interview.audio_hash,
+                "candidate_speaker": interview.candidate_speaker,
+                "transcription_model": transcription_model_id(
+                    getattr(session, "transcription_engine", None),
+                    getattr(session, "transcription_model_size", None),
+                ),
+            }))
+
+        scored = []
+        for backend, pending in by_backend.items():
+            print(f"[WORKER] Batch scoring {len(pending)} interview(s) with backend={backend or 'default'}")
+            for interview, _ in pending:
+                analysis_progress.publish(interview.id, stage="scoring", db=db)
+            db.commit()
+
+            results = score_transcripts([request for _, request in pending], scoring_backend=backend)
+
+            completed = []
+            for (interview, _), result in zip(pending, results):
+                if not result["complete"]:
+                    # Scoring call failed: left for the next wave
+                    analysis_progress.publish(interview.id, stage="awaiting_scoring", db=db)
+                    continue
+                store_analysis(db, interview, result)
+                interview.status = "completed"
+                clear_checkpoints(db, interview.id)
+                completed.append(interview.id)
+            db.commit()
+
+            for interview_id in completed:
+                analysis_progress.publish(interview_id, stage="completed", percent=100.0)
+            scored.extend(completed)
+
+        return scored
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+
+
+def rescore_interview(interview_id: int, db=None):
+    """
+    Re-runs only scoring against the job session's current title and
+    qualities, reusing the aligned transcript of the previous analysis
+    (stored speaker segments, or the result cache for interviews analysed
+    before segments were persisted). Raises TranscriptUnavailable when
+    there is nothing to reuse, and ScoringUnavailable, leaving the stored
+    scores untouched, when the scoring backend failed.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+
+    try:
+        interview = db.query(Interview).filter(Interview.id == interview_id).first()
+        if not interview:
+            raise LookupError(f"Interview {interview_id} not found")
+
+        transcription_model = transcription_model_id(
+            getattr(interview.job_session, "transcription_engine", None),
+            getattr(interview.job_session, "transcription_model_size", None),
+        )
+        transcript = (
+            load_stored_transcript(db, interview.id)
+            or load_aligned_transcript(interview.audio_hash, transcription_model)
+        )
+        if not transcript:
+            raise TranscriptUnavailable(f"No stored transcript for interview {interview_id}")
+
+        job_title, required_qualities = job_requirements(interview.job_session)
+        print(f"[WORKER] Re-scoring interview_id={interview_id} qualities={required_qualities}")
+
+        # An interviewer enrolled since the analysis can change who the candidate is
+        interviewer = match_interviewer(
+            interview.speaker_embeddings,
+            getattr(interview.job_session, "interviewer_embedding", None),
+        )
+        if interviewer is not None or not interview.candidate_speaker:
+            interview.candidate_speaker = identify_candidate_speaker(transcript, interviewer=interviewer)
+
+        result = score_transcript(
+            transcript,
+            job_title,
+            required_qualities,
+            audio_hash=interview.audio_hash,
+            scoring_backend=getattr(interview.job_session, "scoring_backend", None),
+            candidate_speaker=interview.candidate_speaker,
+            transcription_model=transcription_model,
+        )
+
+        if not result["complete"]:
+            raise ScoringUnavailable(f"Scoring of interview {interview_id} failed: {result['feedback']}")
+
+        store_analysis(db, interview, result)
+        interview.status = "completed"
+        db.commit()
+        analysis_progress.publish(interview_id, stage="completed", percent=100.0)
+        return result
+    except Exception:
+        db.rollback()
+        raise
     finally:
-        db.close()
\ No newline at end of file
+        if own_session:
+            db.close()
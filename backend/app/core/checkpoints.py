@@ -0,0 +1,74 @@
+# app/core/checkpoints.py
+
+# Per-interview stage checkpoints (analysis_checkpoints table).
+#
+# The pipeline writes the output of every expensive stage (diarization,
+# transcription, alignment, scores) as soon as it completes, in its own
+# short transaction. When the worker dies mid-analysis, or a deploy stops
+# it, the retried job reads them back and resumes after the last
+# completed stage. Decoded audio needs no row: the decode cache (.npy next
+# to the upload) already survives restarts.
+#
+# Unlike the result cache, checkpoints are never evicted before the
+# analysis completes, and they are dropped once it has.
+
+from typing import Any, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.db.database import SessionLocal
+from app.db.models import AnalysisCheckpoint
+
+
+class CheckpointStore:
+    """
+    Same get / put interface as result_cache.ResultCache, scoped to one
+    interview: `key` is the stage input key and a checkpoint only counts
+    when it matches.
+    """
+
+    def __init__(self, interview_id: int):
+        self.interview_id = interview_id
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        db = SessionLocal()
+        try:
+            row = db.query(AnalysisCheckpoint.input_key, AnalysisCheckpoint.data).filter(
+                AnalysisCheckpoint.interview_id == self.interview_id,
+                AnalysisCheckpoint.stage == stage,
+            ).first()
+        finally:
+            db.close()
+
+        if row is None or row.input_key != key:
+            return None
+        print(f"[CHECKPOINT] Resuming interview {self.interview_id} after {stage}")
+        return row.data
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        db = SessionLocal()
+        try:
+            statement = pg_insert(AnalysisCheckpoint).values(
+                interview_id=self.interview_id, stage=stage, input_key=key, data=value,
+            )
+            db.execute(statement.on_conflict_do_update(
+                constraint="uq_analysis_checkpoints_interview_stage",
+                set_={"input_key": statement.excluded.input_key, "data": statement.excluded.data},
+            ))
+            db.commit()
+        except Exception as exc:
+            # A missing checkpoint only costs recomputation on a retry
+            db.rollback()
+            print(f"[CHECKPOINT] Could not save {stage} of interview {self.interview_id}: {exc}")
+        finally:
+            db.close()
+
+
+def clear_checkpoints(db, interview_id: int) -> int:
+    """
+    Drops the checkpoints of an interview (analysis completed, or new
+    recording). The caller commits.
+    """
+    return db.query(AnalysisCheckpoint).filter(
+        AnalysisCheckpoint.interview_id == interview_id
+    ).delete(synchronize_session=False)
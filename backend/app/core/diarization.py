@@ -2,15 +2,15 @@
 
 import os
 import torch
-import soundfile as sf
-import numpy as np
 from dotenv import load_dotenv
-from pyannote.audio import Pipeline
 import pyannote
 from pyannote.audio.core.task import Specifications
 from pyannote.audio.core.model import Model
 import warnings
 
+from app.core.model_registry import get_diarization_pipeline
+from app.utils.audio import SAMPLE_RATE, load_decoded_audio
+
 warnings.filterwarnings(
     "ignore",
     message="std\\(\\): degrees of freedom is <= 0.*"
@@ -26,29 +26,57 @@ torch.serialization.add_safe_globals([
 
 load_dotenv()
 
-def load_audio(path: str):
-    audio, sr = sf.read(path)
+def load_audio(audio):
+    """
+    Accepts a file path or an already decoded 16 kHz mono float32 array.
+    Paths go through the shared decode cache, so the waveform tensor is a
+    view over the memory-mapped buffer rather than a fresh copy.
+    """
+    if isinstance(audio, str):
+        audio = load_decoded_audio(audio)
+
+    waveform = torch.from_numpy(audio).unsqueeze(0)
 
-    if audio.ndim > 1:
-        audio = audio.mean(axis=1)
+    return {"waveform": waveform, "sample_rate": SAMPLE_RATE}
 
-    if sr != 16000:
-        import librosa
-        audio = librosa.resample(audio, orig_sr=sr, target_sr=16000)
 
-    audio = audio.astype(np.float32)
-    waveform = torch.from_numpy(audio).unsqueeze(0)
+# Rough share of the pipeline run time spent in each pyannote step
+PROGRESS_STEP_WEIGHTS = {
+    "segmentation": 0.25,
+    "speaker_counting": 0.05,
+    "embeddings": 0.65,
+    "discrete_diarization": 0.05,
+}
+
+
+def _progress_hook(progress):
+    """
+    Adapts pyannote's pipeline hook to progress(completed, total).
+    """
+    done = {}
+
+    def hook(step_name, step_artifact, file=None, total=None, completed=None):
+        if total:
+            done[step_name] = completed / total
+        elif step_artifact is not None:
+            done[step_name] = 1.0
+
+        fraction = sum(
+            weight * done.get(step, 0.0)
+            for step, weight in PROGRESS_STEP_WEIGHTS.items()
+        )
+        progress(fraction, 1.0)
 
-    return {"waveform": waveform, "sample_rate": 16000}
+    return hook
 
 
-def run_diarization(audio_path: str):
-    pipeline = Pipeline.from_pretrained(
-        "pyannote/speaker-diarization-3.1",
-        token=os.getenv("HF_TOKEN")
-    )
+def run_diarization(audio, progress=None):
+    pipeline = get_diarization_pipeline()
 
-    audio_dict = load_audio(audio_path)
-    diarization = pipeline(audio_dict)
+    audio_dict = load_audio(audio)
+    if progress is not None:
+        diarization = pipeline(audio_dict, hook=_progress_hook(progress))
+    else:
+        diarization = pipeline(audio_dict)
 
     return diarization
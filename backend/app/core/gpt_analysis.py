@@ -1,18 +1,26 @@
 # backend/app/core/gpt_analysis.py
 
+import asyncio
 import os
 import json
+import random
 import threading
-from typing import Dict, List
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types
 
+from app.config import settings
+
 load_dotenv()
 
 MODEL_NAME = "gemini-2.5-flash"
 
+ERROR_FEEDBACK = "Analysis failed due to an internal error."
+
 DEFAULT_RESULT = {
     "content_relevance": 0,
     "vocal_confidence": 0,
@@ -48,6 +56,13 @@ SYSTEM_INSTRUCTION = (
 _gemini_client = None
 _client_lock = threading.Lock()
 
+# HTTP status codes worth retrying: timeouts, rate limiting, server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class GeminiScoringError(Exception):
+    """Raised by the async scorer once every retry of a call failed."""
+
 
 def get_gemini_client() -> genai.Client:
     global _gemini_client
@@ -59,29 +74,29 @@ def get_gemini_client() -> genai.Client:
                 if not api_key:
                     raise RuntimeError("GOOGLE_API_KEY environment variable is missing")
 
-                _gemini_client = genai.Client(api_key=api_key)
+                # GEMINI_BASE_URL points the client at a local fake server in tests
+                base_url = os.getenv("GEMINI_BASE_URL")
+                http_options = types.HttpOptions(base_url=base_url) if base_url else None
 
-    return _gemini_client
+                _gemini_client = genai.Client(api_key=api_key, http_options=http_options)
 
+    return _gemini_client
 
-def analyze_candidate_with_gemini(
-    transcript: str,
-    job_title: str,
-    required_qualities: List[str],
-) -> Dict[str, float | str]:
 
+def _transcript_text(transcript) -> str:
     if isinstance(transcript, list):
         transcript = " ".join(
             item.get("text", "") if isinstance(item, dict) else str(item)
             for item in transcript
         )
 
-    if not isinstance(transcript, str) or not transcript.strip():
-        return DEFAULT_RESULT
+    if not isinstance(transcript, str):
+        return ""
+    return transcript.strip()
 
-    transcript = transcript.strip()
 
-    user_prompt = f"""
+def build_user_prompt(transcript: str, job_title: str, required_qualities: List[str]) -> str:
+    return f"""
 Job Title:
 {job_title}
 
@@ -101,34 +116,213 @@ Evaluate the candidate and return a JSON object with:
 - short_feedback (2-3 sentences)
 """
 
-    try:
-        client = get_gemini_client()
 
-        response = client.models.generate_content(
-            model=MODEL_NAME,
-            contents=user_prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=SYSTEM_INSTRUCTION,
-                temperature=0.2,
-                response_mime_type="application/json",
-                response_schema=RESPONSE_SCHEMA,
-            )
-        )
+def _generation_config() -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        system_instruction=SYSTEM_INSTRUCTION,
+        temperature=0.2,
+        response_mime_type="application/json",
+        response_schema=RESPONSE_SCHEMA,
+    )
+
+
+def parse_scores(response) -> Dict[str, float | str]:
+    raw_text = getattr(response, "text", None)
+    if not raw_text and response.candidates:
+        raw_text = response.candidates[0].content.parts[0].text
 
-        raw_text = getattr(response, "text", None)
-        if not raw_text and response.candidates:
-            raw_text = response.candidates[0].content.parts[0].text
+    result = json.loads(raw_text)
 
-        result = json.loads(raw_text)
+    for key in ("content_relevance", "vocal_confidence", "clarity_of_speech", "fluency"):
+        result[key] = float(max(0.0, min(100.0, result[key])))
 
-        for key in ("content_relevance", "vocal_confidence", "clarity_of_speech", "fluency"):
-            result[key] = float(max(0.0, min(100.0, result[key])))
+    return result
 
-        return result
 
-    except Exception as exc:
-        print(f"[Gemini Analysis Error] {exc}")
+def analyze_candidate_with_gemini(
+    transcript: str,
+    job_title: str,
+    required_qualities: List[str],
+) -> Dict[str, float | str]:
+    """
+    Scores one transcript through the shared async scorer, i.e. with the
+    same rate limit, timeout and retries as batches. Once every retry
+    failed, returns the zero scores with ERROR_FEEDBACK.
+    """
+
+    transcript = _transcript_text(transcript)
+    if not transcript:
+        return dict(DEFAULT_RESULT)
+
+    result, = score_batch([(transcript, job_title, required_qualities)])
+
+    if isinstance(result, Exception):
+        print(f"[Gemini Analysis Error] {result}")
         return {
             **DEFAULT_RESULT,
-            "short_feedback": "Analysis failed due to an internal error."
-        }
\ No newline at end of file
+            "short_feedback": ERROR_FEEDBACK
+        }
+
+    return result
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, bursts up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError, json.JSONDecodeError)):
+        return True
+
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code in RETRYABLE_STATUS_CODES
+
+    # Transport-level failures from the underlying HTTP client
+    return type(exc).__module__.startswith(("httpx", "aiohttp"))
+
+
+class AsyncGeminiScorer:
+    """
+    Async scoring client for bulk workloads.
+
+    - at most `max_concurrency` requests in flight (semaphore)
+    - at most `requests_per_minute` request starts (token bucket)
+    - per-call timeout, exponential backoff with full jitter on retryable
+      errors (429, 5xx, timeouts, transport errors, malformed JSON)
+
+    Unlike analyze_candidate_with_gemini, failures are raised as
+    GeminiScoringError instead of being turned into zero scores, so the
+    caller can tell a bad candidate from a failed call.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+    ):
+        self.max_concurrency = max_concurrency or settings.GEMINI_MAX_CONCURRENCY
+        self.requests_per_minute = requests_per_minute or settings.GEMINI_REQUESTS_PER_MINUTE
+        self.timeout = timeout or settings.GEMINI_TIMEOUT
+        self.max_retries = settings.GEMINI_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._loop = None
+        self._semaphore = None
+        self._bucket = None
+
+    def _bind_loop(self) -> None:
+        # asyncio primitives belong to one event loop; rebuild them when the
+        # scorer is reused from another asyncio.run()
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            rate = self.requests_per_minute / 60.0
+            self._bucket = TokenBucket(rate=rate, capacity=max(1.0, min(self.max_concurrency, self.requests_per_minute)))
+
+    async def _generate(self, user_prompt: str):
+        client = get_gemini_client()
+        return await asyncio.wait_for(
+            client.aio.models.generate_content(
+                model=MODEL_NAME,
+                contents=user_prompt,
+                config=_generation_config(),
+            ),
+            timeout=self.timeout,
+        )
+
+    async def score(
+        self,
+        transcript,
+        job_title: str,
+        required_qualities: List[str],
+    ) -> Dict[str, float | str]:
+        self._bind_loop()
+
+        transcript = _transcript_text(transcript)
+        if not transcript:
+            return dict(DEFAULT_RESULT)
+
+        user_prompt = build_user_prompt(transcript, job_title, required_qualities)
+
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    await self._bucket.acquire()
+                    response = await self._generate(user_prompt)
+                return parse_scores(response)
+
+            except Exception as exc:
+                if attempt >= self.max_retries or not _is_retryable(exc):
+                    raise GeminiScoringError(f"{type(exc).__name__}: {exc}") from exc
+
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                attempt += 1
+                print(f"[Gemini Analysis Retry] attempt {attempt}/{self.max_retries} in {delay:.1f}s: {exc}")
+                await asyncio.sleep(delay)
+
+    async def score_many(
+        self,
+        items: Iterable[Tuple],
+        return_exceptions: bool = True,
+    ) -> List:
+        """
+        Scores many (transcript, job_title, required_qualities) tuples
+        concurrently, within the limits above. Results keep the input
+        order; with return_exceptions a failed item yields its
+        GeminiScoringError instead of cancelling the batch.
+        """
+        return await asyncio.gather(
+            *(self.score(*item) for item in items),
+            return_exceptions=return_exceptions,
+        )
+
+
+_async_scorer: Optional[AsyncGeminiScorer] = None
+
+
+def get_async_scorer() -> AsyncGeminiScorer:
+    global _async_scorer
+
+    if _async_scorer is None:
+        with _client_lock:
+            if _async_scorer is None:
+                _async_scorer = AsyncGeminiScorer()
+
+    return _async_scorer
+
+
+def score_batch(items: Iterable[Tuple]) -> List:
+    """
+    Blocking entry point for workers: scores a batch with the shared async
+    scorer and returns results / exceptions in input order.
+    """
+    return asyncio.run(get_async_scorer().score_many(list(items)))
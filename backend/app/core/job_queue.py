@@ -0,0 +1,214 @@
+# app/core/job_queue.py
+
+# DB-backed job queue built on the `jobs` table.
+#
+# enqueue()  -> adds a pending job (the caller commits, so the job is
+#               created atomically with whatever triggered it)
+# claim()    -> SELECT ... FOR UPDATE SKIP LOCKED, leases the job to a worker
+# complete() / fail() -> finish the job, fail() retries with backoff;
+#               both are no-ops for a worker that lost its lease
+# extend_lease() -> heartbeat keeping a long job invisible to other workers
+# reap_expired()  -> releases the jobs of workers whose heartbeat stopped
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models import Job
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    interview_id: Optional[int] = None,
+    audio_path: Optional[str] = None,
+    payload: Optional[Dict] = None,
+    priority: int = 0,
+    max_attempts: Optional[int] = None,
+    delay_seconds: int = 0,
+) -> Job:
+    job = Job(
+        kind=kind,
+        interview_id=interview_id,
+        audio_path=audio_path,
+        payload=payload,
+        status=PENDING,
+        priority=priority,
+        attempts=0,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow() + timedelta(seconds=delay_seconds),
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def cancel_pending(db: Session, interview_id: int, kind: Optional[str] = None) -> int:
+    """
+    Drops jobs for an interview that no worker has picked up yet, e.g. when
+    a new recording replaces the old one.
+    """
+    query = db.query(Job).filter(Job.interview_id == interview_id, Job.status == PENDING)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    return query.delete(synchronize_session=False)
+
+
+def claim(db: Session, worker_id: str, kinds=None) -> Optional[Job]:
+    """
+    Leases the highest-priority runnable job to `worker_id`.
+
+    A job is runnable when it is pending and its backoff has elapsed, or
+    when it is running but the lease of the worker holding it expired
+    (worker crashed or was killed).
+    """
+    while True:
+        now = datetime.utcnow()
+
+        query = db.query(Job).filter(
+            or_(
+                and_(Job.status == PENDING, Job.run_after <= now),
+                and_(Job.status == RUNNING, Job.locked_until < now),
+            )
+        )
+        if kinds:
+            query = query.filter(Job.kind.in_(list(kinds)))
+
+        job = (
+            query.order_by(Job.priority.desc(), Job.run_after, Job.id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+
+        if job is None:
+            db.rollback()
+            return None
+
+        if job.status == RUNNING and job.attempts >= job.max_attempts:
+            # Lease expired on the last allowed attempt
+            job.status = FAILED
+            job.last_error = job.last_error or f"Lease expired (held by {job.locked_by})"
+            job.locked_by = None
+            job.locked_until = None
+            job.finished_at = now
+            db.commit()
+            continue
+
+        job.status = RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id
+        job.locked_until = now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT)
+        db.commit()
+        db.refresh(job)
+        return job
+
+
+def extend_lease(db: Session, job_id: int, worker_id: str) -> bool:
+    """
+    Pushes the lease forward. Returns False when the job was taken over by
+    another worker (our lease had already expired).
+    """
+    updated = db.query(Job).filter(
+        Job.id == job_id,
+        Job.status == RUNNING,
+        Job.locked_by == worker_id,
+    ).update(
+        {Job.locked_until: datetime.utcnow() + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT)},
+        synchronize_session=False,
+    )
+    db.commit()
+    return updated == 1
+
+
+def _finish(db: Session, job: Job, worker_id: str, values: Dict) -> bool:
+    # Only the worker holding the lease finishes the job: once the lease
+    # expired, the job was reaped or claimed again and locked_by changed
+    updated = db.query(Job).filter(
+        Job.id == job.id,
+        Job.status == RUNNING,
+        Job.locked_by == worker_id,
+    ).update(
+        {**values, Job.locked_by: None, Job.locked_until: None},
+        synchronize_session=False,
+    )
+    db.commit()
+    return updated == 1
+
+
+def complete(db: Session, job: Job, worker_id: str, result: Optional[Dict] = None) -> bool:
+    """
+    Marks the job completed. Returns False, leaving the job alone, when
+    `worker_id` no longer holds it.
+    """
+    return _finish(db, job, worker_id, {
+        Job.status: COMPLETED,
+        Job.result: result,
+        Job.finished_at: datetime.utcnow(),
+    })
+
+
+def fail(db: Session, job: Job, worker_id: str, error: str, retry: bool = True) -> Optional[bool]:
+    """
+    Records a failed attempt. Returns True when the job was rescheduled,
+    False when it ran out of attempts (or `retry` is off) and is now
+    permanently failed, None when `worker_id` no longer holds the job,
+    which is then left to its new owner.
+    """
+    if retry and job.attempts < job.max_attempts:
+        backoff = settings.JOB_RETRY_BACKOFF * (2 ** (job.attempts - 1))
+        values = {
+            Job.status: PENDING,
+            Job.last_error: error,
+            Job.run_after: datetime.utcnow() + timedelta(seconds=backoff),
+        }
+        return True if _finish(db, job, worker_id, values) else None
+
+    values = {
+        Job.status: FAILED,
+        Job.last_error: error,
+        Job.finished_at: datetime.utcnow(),
+    }
+    return False if _finish(db, job, worker_id, values) else None
+
+
+def reap_expired(db: Session) -> Dict[str, List[Job]]:
+    """
+    Releases running jobs whose lease expired (the worker died or was
+    killed during a deploy): back to pending while attempts remain, failed
+    otherwise. claim() would take them over lazily as well; reaping
+    eagerly lets the caller reset what the jobs were working on.
+    """
+    now = datetime.utcnow()
+    jobs = (
+        db.query(Job)
+        .filter(Job.status == RUNNING, Job.locked_until < now)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    reaped = {"requeued": [], "failed": []}
+    for job in jobs:
+        job.last_error = job.last_error or f"Lease expired (held by {job.locked_by})"
+        job.locked_by = None
+        job.locked_until = None
+
+        if job.attempts < job.max_attempts:
+            job.status = PENDING
+            job.run_after = now
+            reaped["requeued"].append(job)
+        else:
+            job.status = FAILED
+            job.finished_at = now
+            reaped["failed"].append(job)
+
+    db.commit()
+    return reaped
+
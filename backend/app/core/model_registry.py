@@ -0,0 +1,153 @@
+# app/core/model_registry.py
+
+# Process-wide cache of the heavy inference models (pyannote, Whisper).
+# Transcription engines (core.transcription_engines) load through it too.
+# Each worker process loads a model once, on first use or at startup via
+# preload(), and every later interview reuses the warm instance.
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.config import settings
+
+load_dotenv()
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """
+    Resident set size of the current process, or None when the platform
+    exposes neither /proc nor the resource module (e.g. Windows).
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+        # ru_maxrss is reported in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return None
+
+
+def _parameter_bytes(model) -> Optional[int]:
+    parameters = getattr(model, "parameters", None)
+    if not callable(parameters):
+        return None
+    try:
+        return sum(p.numel() * p.element_size() for p in parameters())
+    except Exception:
+        return None
+
+
+class ModelRegistry:
+    """
+    Lazily loads each model once per process and keeps it warm.
+
+    Loaders are keyed by name; the first get() for a key runs the loader
+    under a per-key lock so concurrent interviews never load the same
+    checkpoint twice.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, object] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._registry_lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def get(self, key: str, loader: Callable[[], object]):
+        model = self._models.get(key)
+        if model is not None:
+            self._stats[key]["hits"] += 1
+            return model
+
+        with self._lock_for(key):
+            model = self._models.get(key)
+            if model is not None:
+                self._stats[key]["hits"] += 1
+                return model
+
+            print(f"[MODELS] Loading {key}...")
+            rss_before = _current_rss_bytes()
+            started = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - started
+            rss_after = _current_rss_bytes()
+
+            rss_delta = None
+            if rss_before is not None and rss_after is not None:
+                rss_delta = max(0, rss_after - rss_before)
+
+            self._stats[key] = {
+                "load_seconds": round(load_seconds, 3),
+                "loaded_at": time.time(),
+                "rss_delta_bytes": rss_delta,
+                "parameter_bytes": _parameter_bytes(model),
+                "hits": 0,
+            }
+            self._models[key] = model
+            print(f"[MODELS] Loaded {key} in {load_seconds:.2f}s")
+            return model
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._models
+
+    def evict(self, key: str) -> None:
+        with self._lock_for(key):
+            self._models.pop(key, None)
+            self._stats.pop(key, None)
+
+    def total_load_seconds(self) -> float:
+        return sum(value["load_seconds"] for value in self._stats.values())
+
+    def stats(self) -> Dict:
+        return {
+            "pid": os.getpid(),
+            "rss_bytes": _current_rss_bytes(),
+            "models": {key: dict(value) for key, value in self._stats.items()},
+        }
+
+
+registry = ModelRegistry()
+
+
+def diarization_key(model_name: Optional[str] = None) -> str:
+    return f"diarization:{model_name or settings.DIARIZATION_MODEL}"
+
+
+def get_diarization_pipeline(model_name: Optional[str] = None):
+    model_name = model_name or settings.DIARIZATION_MODEL
+
+    def _load():
+        from pyannote.audio import Pipeline
+
+        return Pipeline.from_pretrained(model_name, token=os.getenv("HF_TOKEN"))
+
+    return registry.get(diarization_key(model_name), _load)
+
+
+def preload_models() -> Dict:
+    """
+    Warm every model used by the analysis pipeline. Called at API / worker
+    startup so the first interview does not pay the loading cost.
+    """
+    # Importing diarization registers the torch safe globals pyannote needs
+    import app.core.diarization  # noqa: F401
+    from app.core.transcription_engines import get_engine
+
+    get_diarization_pipeline()
+    get_engine().model()
+    return registry.stats()
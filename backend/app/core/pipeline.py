@@ -3,12 +3,36 @@
 #audio → diarization → transcription → alignment → GPT → final score
 
 
-from typing import Dict, List
+import time
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import multiprocessing
+import threading
+from typing import Dict, List, Optional
 
+from app.config import settings
 from app.core.diarization import run_diarization
 from app.core.transcription import transcribe_audio
-from app.core.alignement import extract_candidate_speech
-from app.core.gpt_analysis import analyze_candidate_with_gemini
+from app.core.transcription_engines import transcription_model_id
+from app.core.alignement import (
+    extract_candidate_speech,
+    identify_candidate_speaker,
+    match_interviewer,
+    speaker_embeddings,
+    speaker_turns,
+)
+from app.core.prompt_builder import prepare_transcript
+from app.core.scoring import get_scorer
+from app.core.result_cache import (
+    alignment_key,
+    diarization_key,
+    file_sha256,
+    get_result_cache,
+    scores_key,
+    transcription_key,
+)
+from app.core.telemetry import PipelineRun, measure
+from app.utils.audio import audio_duration, load_decoded_audio, probe_duration
 
 
 def compute_final_score(
@@ -29,58 +53,451 @@ def compute_final_score(
     )
 
 
+EXECUTION_MODES = ("sequential", "thread", "process")
+AUDIO_STAGES = ("diarization", "transcription")
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                # spawn: forking a process that already holds torch threads can deadlock
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=2,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
+    return _process_pool
+
+
+def run_audio_stages(
+    audio,
+    mode: Optional[str] = None,
+    stages=AUDIO_STAGES,
+    progress=None,
+    on_segments=None,
+    transcription_engine: Optional[str] = None,
+    model_size: Optional[str] = None,
+    on_result=None,
+):
+    """
+    Runs diarization and transcription on the same decoded waveform.
+
+    sequential: one after the other in the calling thread
+    thread:     side by side in two threads (torch releases the GIL)
+    process:    side by side in a persistent spawn-based process pool,
+                each child keeps its own warm models; pass the audio path
+                so children memory-map the decode cache instead of
+                receiving a pickled copy of the waveform
+
+    `stages` limits the run to a subset (e.g. only the one missing from
+    the result cache); skipped stages come back as None.
+    `transcription_engine` / `model_size` select the Whisper engine and
+    checkpoint (see core.transcription_engines). `on_result(name, result)`
+    is called in the calling thread as soon as each stage finishes, so its
+    output can be checkpointed before the other stage is done.
+
+    `progress` (a progress.ProgressReporter) receives diarization progress
+    from pyannote's hook and transcription progress window by window, and
+    `on_segments` each transcribed window (streaming transcription), except
+    in process mode where callbacks cannot cross the process boundary.
+
+    Returns (diarization, segments, metrics), metrics holding the
+    telemetry.measure() dict of each stage that ran.
+    """
+    mode = mode or settings.PIPELINE_EXECUTION_MODE
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"Unknown pipeline execution mode: {mode}")
+
+    functions = {
+        "diarization": run_diarization,
+        "transcription": partial(transcribe_audio, model_size=model_size, engine=transcription_engine),
+    }
+    if mode != "process":
+        if progress is not None:
+            functions["diarization"] = partial(run_diarization, progress=progress.stage_callback("diarization"))
+        functions["transcription"] = partial(
+            functions["transcription"],
+            progress=progress.stage_callback("transcription") if progress is not None else None,
+            on_segments=on_segments,
+        )
+
+    results = {name: None for name in AUDIO_STAGES}
+    metrics = {}
+
+    if mode == "sequential" or len(stages) < 2:
+        for name in stages:
+            results[name], metrics[name] = measure(functions[name], audio)
+            if progress is not None:
+                progress.update(name, 1.0)
+            if on_result is not None:
+                on_result(name, results[name])
+    else:
+        if mode == "thread":
+            executor = ThreadPoolExecutor(max_workers=2)
+        else:
+            executor = _get_process_pool()
+
+        try:
+            futures = {
+                executor.submit(measure, functions[name], audio): name
+                for name in stages
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                results[name], metrics[name] = future.result()
+                if progress is not None:
+                    progress.update(name, 1.0)
+                if on_result is not None:
+                    on_result(name, results[name])
+        finally:
+            if mode == "thread":
+                executor.shutdown(wait=True)
+
+    return results["diarization"], results["transcription"], metrics
+
+
+def _lookup(stores, stage: str, key: str):
+    # First hit wins: the interview's checkpoints, then the shared result cache
+    for store in stores:
+        value = store.get(stage, key)
+        if value is not None:
+            return value
+    return None
+
+
+def _store(stores, stage: str, key: str, value) -> None:
+    for store in stores:
+        store.put(stage, key, value)
+
+
+def _cacheable_segments(segments: List[Dict]) -> List[Dict]:
+    keep = ("start", "end", "text", "words")
+    return [{key: seg[key] for key in keep if key in seg} for seg in segments]
+
+
 def full_audio_evaluation(
     audio_path: str,
     job_title: str,
     required_qualities: List[str],
+    execution_mode: Optional[str] = None,
+    audio_hash: Optional[str] = None,
+    scoring_backend: Optional[str] = None,
+    transcription_engine: Optional[str] = None,
+    model_size: Optional[str] = None,
+    interviewer_embedding: Optional[List[float]] = None,
+    run: Optional[PipelineRun] = None,
+    progress=None,
+    on_segments=None,
+    score: bool = True,
+    checkpoints=None,
 ) -> Dict:
     """
     Full evaluation pipeline:
-    - diarization
-    - transcription
-    - speaker alignment
-    - GPT analysis
-    - final score computation
+    - audio decoding (once, shared by the next two stages)
+    - diarization + transcription (sequential or concurrent, with the
+      job session's transcription engine and model size)
+    - speaker alignment + candidate identification (voice match against
+      the job session's enrolled interviewer when given, else heuristics)
+    - scoring (Gemini or local backend) + final score (score_transcript)
+
+    With the result cache enabled every expensive stage is looked up by
+    audio content hash first, so a duplicate upload, or re-scoring the same
+    audio against other qualities, skips the stages already computed.
+
+    Every stage is measured (see core.telemetry). Pass `run` to add later
+    stages (e.g. the DB write) to the same trace; otherwise the run is
+    finished here and its metrics returned under "metrics". `progress`
+    (progress.ProgressReporter) is told about every stage as it starts;
+    `on_segments` gets transcribed segments as soon as they are available.
+
+    With score=False the run stops after alignment (batch analysis scores
+    many interviews at once, see core.scheduler); the result then has no
+    score fields.
+
+    `checkpoints` (checkpoints.CheckpointStore of the interview) receives
+    every stage output as it completes and is read first, so a retried
+    analysis resumes after the last completed stage.
     """
     print(f"Starting evaluation for audio: {audio_path}")
-    # 1. Speaker diarization
-    diarization_result = run_diarization(audio_path)
-    print("Diarization completed. started transcription...")
-    # 2. Transcription
-    transcription_result = transcribe_audio(audio_path)
-    print("Transcription completed. started alignment...")
-    # 3. Extract candidate-only speech
-    candidate_text = extract_candidate_speech(
-        diarization=diarization_result,
-        segments=transcription_result,
-    )
-    print("Alignment completed. started Gemini analysis...")
+    own_run = run is None
+    run = run or PipelineRun("full_audio_evaluation", audio_path=audio_path)
+
+    mode = execution_mode or settings.PIPELINE_EXECUTION_MODE
+    transcription_model = transcription_model_id(transcription_engine, model_size)
+    cache = get_result_cache()
+    stores = [store for store in (checkpoints, cache) if store is not None]
+    cached_stages = []
+    audio_seconds = None
+
+    turns = segments = None
+    embeddings = {}
+    if stores:
+        if audio_hash is None:
+            with run.stage("hash"):
+                audio_hash = file_sha256(audio_path)
+        turns = _lookup(stores, "diarization", diarization_key(audio_hash))
+        segments = _lookup(stores, "transcription", transcription_key(audio_hash, transcription_model))
+        embeddings = _lookup(stores, "speaker_embeddings", diarization_key(audio_hash)) or {}
+
+    def stage_done(name, value):
+        nonlocal turns, segments, embeddings
+        if name == "diarization":
+            turns = [list(turn) for turn in speaker_turns(value)]
+            embeddings = speaker_embeddings(value)
+            _store(stores, "diarization", diarization_key(audio_hash), turns)
+            if embeddings:
+                _store(stores, "speaker_embeddings", diarization_key(audio_hash), embeddings)
+        else:
+            segments = _cacheable_segments(value)
+            _store(stores, "transcription", transcription_key(audio_hash, transcription_model), segments)
 
-    # 4. GPT evaluation
-    gemini_scores = analyze_candidate_with_gemini(
-        transcript=candidate_text,
-        job_title=job_title,
-        required_qualities=required_qualities,
+    missing = tuple(
+        name for name, value in (("diarization", turns), ("transcription", segments))
+        if value is None
     )
+    cached_stages.extend(name for name in AUDIO_STAGES if name not in missing)
+    for name in cached_stages:
+        run.cached(name)
 
-    # 5. Final score
+    if missing:
+        # 1. Decode once (cached as a memory-mapped .npy next to the upload)
+        if progress is not None:
+            progress.update("decode")
+        with run.stage("decode") as extra:
+            audio = load_decoded_audio(audio_path)
+            audio_seconds = extra["audio_seconds"] = round(audio_duration(audio), 2)
+
+        # 2. Speaker diarization + transcription
+        if progress is not None:
+            progress.update("decode", 1.0)
+        _, _, stage_metrics = run_audio_stages(
+            audio_path if mode == "process" else audio,
+            mode=mode,
+            stages=missing,
+            progress=progress,
+            on_segments=on_segments,
+            transcription_engine=transcription_engine,
+            model_size=model_size,
+            on_result=stage_done,
+        )
+        for name, metrics in stage_metrics.items():
+            if name == "transcription":
+                run.add(name, metrics, execution_mode=mode, model=transcription_model)
+            else:
+                run.add(name, metrics, execution_mode=mode)
+    else:
+        audio_seconds = probe_duration(audio_path)
+
+    print(f"Diarization and transcription completed {run.timings()}. started alignment...")
+
+    # 3. Speaker-labelled transcript, then which speaker is the candidate
+    if progress is not None:
+        progress.update("alignment")
+    align_key = None
+    aligned = None
+    if checkpoints is not None:
+        align_key = alignment_key(
+            diarization_key(audio_hash),
+            transcription_key(audio_hash, transcription_model),
+            interviewer_embedding,
+        )
+        aligned = checkpoints.get("alignment", align_key)
+
+    if aligned is not None:
+        candidate_text, candidate_speaker, interviewer = (
+            aligned["rows"], aligned["candidate_speaker"], aligned["interviewer"]
+        )
+        run.cached("alignment")
+    else:
+        with run.stage("alignment") as extra:
+            candidate_text = extract_candidate_speech(turns, segments)
+            interviewer = match_interviewer(embeddings, interviewer_embedding)
+            candidate_speaker = identify_candidate_speaker(candidate_text, interviewer=interviewer)
+            extra.update(rows=len(candidate_text), speakers=len({row["speaker"] for row in candidate_text}))
+        if checkpoints is not None:
+            checkpoints.put("alignment", align_key, {
+                "rows": candidate_text,
+                "candidate_speaker": candidate_speaker,
+                "interviewer": interviewer,
+            })
+    print(f"Alignment completed (candidate={candidate_speaker}, interviewer={interviewer}). started scoring...")
+
+    # 4. Scoring + 5. final score
+    scores = {}
+    if score:
+        if progress is not None:
+            progress.update("scoring")
+        with run.stage("scoring") as extra:
+            scores = score_transcript(
+                candidate_text,
+                job_title,
+                required_qualities,
+                audio_hash=audio_hash,
+                scoring_backend=scoring_backend,
+                candidate_speaker=candidate_speaker,
+                transcription_model=transcription_model,
+                checkpoints=checkpoints,
+            )
+            extra.update(backend=scores["scoring_backend"], cached=scores["cached"])
+        scores.pop("scoring_seconds")
+        if scores.pop("cached"):
+            cached_stages.append("scoring")
+
+    result = {
+        **scores,
+        "candidate_transcript": candidate_text,
+        "candidate_speaker": candidate_speaker,
+        "transcription_model": transcription_model,
+        "speaker_embeddings": embeddings,
+        "transcription_segments": segments,
+        "timings": run.timings(),
+        "cached_stages": cached_stages,
+        "audio_hash": audio_hash,
+        "audio_seconds": audio_seconds,
+    }
+    if own_run:
+        result["metrics"] = run.finish(audio_seconds)
+    return result
+
+
+def load_aligned_transcript(
+    audio_hash: Optional[str],
+    transcription_model: Optional[str] = None,
+) -> Optional[List[Dict]]:
+    """
+    Rebuilds the aligned transcript of already analysed audio from the
+    result cache, or returns None when either audio stage is missing.
+    `transcription_model` is a transcription_engines.transcription_model_id().
+    """
+    cache = get_result_cache()
+    if cache is None or not audio_hash:
+        return None
+
+    turns = cache.get("diarization", diarization_key(audio_hash))
+    segments = cache.get("transcription", transcription_key(audio_hash, transcription_model))
+    if turns is None or segments is None:
+        return None
+
+    return extract_candidate_speech(turns, segments)
+
+
+def score_transcript(
+    transcript,
+    job_title: str,
+    required_qualities: List[str],
+    audio_hash: Optional[str] = None,
+    scoring_backend: Optional[str] = None,
+    candidate_speaker: Optional[str] = None,
+    transcription_model: Optional[str] = None,
+    checkpoints=None,
+) -> Dict:
+    """
+    Scoring and final score of an aligned transcript. Shared by the full
+    pipeline and by re-scoring, which skips every audio stage.
+    `scoring_backend` selects the scorer (see app.core.scoring); only the
+    rows of `candidate_speaker` are scored (identified from the rows
+    when None).
+    """
+    started = time.perf_counter()
+    scorer = get_scorer(scoring_backend)
+    stores = [store for store in (checkpoints, get_result_cache()) if store is not None] if audio_hash else []
+
+    raw_scores = None
+    if stores:
+        score_cache_key = scores_key(
+            audio_hash, job_title, required_qualities, scorer.model_name,
+            transcription_model=transcription_model,
+            candidate_speaker=candidate_speaker,
+        )
+        raw_scores = _lookup(stores, "scores", score_cache_key)
+    cached = raw_scores is not None
+
+    if raw_scores is None:
+        # Candidate-only, de-duplicated rows; the interviewer is never scored
+        rows = prepare_transcript(transcript, compact=False, candidate_speaker=candidate_speaker)
+        raw_scores = scorer.score(rows, job_title, required_qualities)
+        if stores and scorer.is_cacheable(raw_scores):
+            _store(stores, "scores", score_cache_key, raw_scores)
+
+    return _score_result(raw_scores, scorer, cached, started)
+
+
+def _score_result(raw_scores: Dict, scorer, cached: bool, started: float) -> Dict:
     final_score = compute_final_score(
-        content=gemini_scores["content_relevance"],
-        confidence=gemini_scores["vocal_confidence"],
-        clarity=gemini_scores["clarity_of_speech"],
-        fluency=gemini_scores["fluency"],
+        content=raw_scores["content_relevance"],
+        confidence=raw_scores["vocal_confidence"],
+        clarity=raw_scores["clarity_of_speech"],
+        fluency=raw_scores["fluency"],
     )
-    print("Final Score:", final_score,"\nscore details:", gemini_scores)
+    print("Final Score:", final_score,"\nscore details:", raw_scores)
     return {
-        "content_relevance": gemini_scores["content_relevance"],
-        "vocal_confidence": gemini_scores["vocal_confidence"],
-        "clarity_of_speech": gemini_scores["clarity_of_speech"],
-        "fluency": gemini_scores["fluency"],
+        "content_relevance": raw_scores["content_relevance"],
+        "vocal_confidence": raw_scores["vocal_confidence"],
+        "clarity_of_speech": raw_scores["clarity_of_speech"],
+        "fluency": raw_scores["fluency"],
         "final_score": final_score,
-        "feedback": gemini_scores["short_feedback"],
-        "candidate_transcript": candidate_text,
+        "feedback": raw_scores["short_feedback"],
+        "scoring_backend": scorer.name,
+        "cached": cached,
+        # False for the fallback of a failed scoring call (or a partial
+        # map-reduce result): not stored over existing scores
+        "complete": scorer.is_cacheable(raw_scores),
+        "scoring_seconds": round(time.perf_counter() - started, 3),
     }
 
+
+def score_transcripts(requests: List[Dict], scoring_backend: Optional[str] = None) -> List[Dict]:
+    """
+    Batch form of score_transcript: each request holds the arguments of
+    one call (transcript, job_title, required_qualities and optionally
+    audio_hash, candidate_speaker, transcription_model). Cache misses are
+    scored together through Scorer.score_many, so the Gemini backend sends
+    them as one rate-limited batch of concurrent calls.
+    """
+    started = time.perf_counter()
+    scorer = get_scorer(scoring_backend)
+    cache = get_result_cache()
+
+    raw = [None] * len(requests)
+    keys = [None] * len(requests)
+    for index, request in enumerate(requests):
+        if cache is not None and request.get("audio_hash"):
+            keys[index] = scores_key(
+                request["audio_hash"], request["job_title"], request["required_qualities"], scorer.model_name,
+                transcription_model=request.get("transcription_model"),
+                candidate_speaker=request.get("candidate_speaker"),
+            )
+            raw[index] = cache.get("scores", keys[index])
+    cached = [value is not None for value in raw]
+
+    missing = [index for index, value in enumerate(raw) if value is None]
+    items = [
+        (
+            prepare_transcript(
+                requests[index]["transcript"], compact=False,
+                candidate_speaker=requests[index].get("candidate_speaker"),
+            ),
+            requests[index]["job_title"],
+            requests[index]["required_qualities"],
+        )
+        for index in missing
+    ]
+    for index, value in zip(missing, scorer.score_many(items) if items else []):
+        raw[index] = value
+        if keys[index] is not None and scorer.is_cacheable(value):
+            cache.put("scores", keys[index], value)
+
+    return [
+        _score_result(value, scorer, was_cached, started)
+        for value, was_cached in zip(raw, cached)
+    ]
+
     def full_audio_evaluation(audio_path: str, job_title: str, required_qualities: list[str]):
         print("[PIPELINE TEST] fake analysis running")
         return {
@@ -0,0 +1,221 @@
+# app/core/progress.py
+
+# Fine-grained analysis progress, pushed instead of polled.
+#
+# Workers write the current stage / percent on the interview row and, in
+# the same transaction, NOTIFY the `interview_progress` channel with a
+# small JSON payload. Each API process holds ONE listening connection and
+# fans notifications out to its SSE subscribers, so the database sees the
+# same load whether one reviewer or fifty watch a batch.
+
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.db.database import SessionLocal
+
+CHANNEL = "interview_progress"
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+# Share of the overall percentage covered by each stage. Diarization and
+# transcription run side by side and split the audio band evenly.
+STAGE_BANDS = {
+    "queued": (0.0, 0.0),
+    "decode": (0.0, 5.0),
+    "audio": (5.0, 80.0),
+    "alignment": (80.0, 85.0),
+    "awaiting_scoring": (85.0, 85.0),  # batch analysis, see core.scheduler
+    "scoring": (85.0, 95.0),
+    "db_write": (95.0, 100.0),
+}
+AUDIO_STAGES = ("diarization", "transcription")
+
+
+def publish(
+    interview_id: int,
+    stage: Optional[str] = None,
+    percent: Optional[float] = None,
+    status: Optional[str] = None,
+    db=None,
+) -> None:
+    """
+    Stores the progress of an interview and notifies listeners. Runs in
+    its own short transaction unless `db` is given (then the caller's
+    commit delivers the notification, together with its other changes).
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+
+    try:
+        # progress_updated_at is naive UTC, compared with datetime.utcnow()
+        # by the worker, whatever the server's time zone
+        row = db.execute(
+            text(
+                "UPDATE interviews SET "
+                "progress_stage = COALESCE(:stage, progress_stage), "
+                "progress_percent = COALESCE(:percent, progress_percent), "
+                "status = COALESCE(:status, status), "
+                "progress_updated_at = timezone('utc', now()) "
+                "WHERE id = :id "
+                "RETURNING job_session_id, status, progress_stage, progress_percent"
+            ),
+            {
+                "id": interview_id,
+                "stage": stage,
+                "percent": None if percent is None else round(float(percent), 1),
+                "status": status,
+            },
+        ).first()
+
+        if row is None:
+            return
+
+        payload = {
+            "interview_id": interview_id,
+            "job_session_id": row.job_session_id,
+            "status": row.status,
+            "stage": row.progress_stage,
+            "percent": row.progress_percent,
+        }
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {
+            "channel": CHANNEL,
+            "payload": json.dumps(payload),
+        })
+
+        if own_session:
+            db.commit()
+    except Exception as exc:
+        # Progress is best effort, it must never fail an analysis
+        print(f"[PROGRESS] publish failed for interview {interview_id}: {exc}")
+        if own_session:
+            db.rollback()
+    finally:
+        if own_session:
+            db.close()
+
+
+class ProgressReporter:
+    """
+    Turns per-stage fractions into one overall percentage for an interview
+    and publishes it, throttled to one update per `min_interval` seconds
+    unless the stage changes. Thread safe: diarization and transcription
+    report from different threads.
+    """
+
+    def __init__(self, interview_id: int, min_interval: Optional[float] = None):
+        self.interview_id = interview_id
+        self.min_interval = settings.PROGRESS_MIN_INTERVAL if min_interval is None else min_interval
+        self._audio = {name: 0.0 for name in AUDIO_STAGES}
+        self._stage = None
+        self._percent = 0.0
+        self._published_at = 0.0
+        self._lock = threading.Lock()
+
+    def _overall(self, stage: str, fraction: float) -> float:
+        if stage in AUDIO_STAGES:
+            self._audio[stage] = max(self._audio[stage], fraction)
+            low, high = STAGE_BANDS["audio"]
+            fraction = sum(self._audio.values()) / len(AUDIO_STAGES)
+        else:
+            low, high = STAGE_BANDS.get(stage, (self._percent, self._percent))
+        return low + (high - low) * min(max(fraction, 0.0), 1.0)
+
+    def update(self, stage: str, fraction: float = 0.0) -> None:
+        with self._lock:
+            # Never move backwards, e.g. when a cached stage is skipped
+            percent = max(self._percent, self._overall(stage, fraction))
+            now = time.monotonic()
+            stage_changed = stage != self._stage
+
+            if not stage_changed and now - self._published_at < self.min_interval:
+                self._percent = percent
+                return
+
+            self._stage, self._percent, self._published_at = stage, percent, now
+
+        publish(self.interview_id, stage=stage, percent=percent)
+
+    def stage_callback(self, stage: str):
+        """
+        Callback for a stage reporting (completed, total) of its work.
+        """
+        def callback(completed, total):
+            if total:
+                self.update(stage, completed / total)
+        return callback
+
+
+# ---------- API side: one LISTEN connection per process ----------
+
+def _listen_dsn() -> str:
+    # psycopg takes plain libpq URLs, without the SQLAlchemy driver suffix
+    url = settings.DATABASE_URL
+    scheme, _, rest = url.partition("://")
+    return f"{scheme.split('+')[0]}://{rest}"
+
+
+class ProgressBroadcaster:
+    """
+    Listens on the notification channel and forwards every payload to the
+    subscriber queues. Started lazily with the first subscriber, stopped
+    with the last; reconnects after connection errors.
+    """
+
+    QUEUE_SIZE = 256
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _dispatch(self, payload: Dict) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # A stalled client only loses intermediate updates; the
+                # latest state is in the database
+                pass
+
+    async def _listen(self) -> None:
+        import psycopg
+
+        while self._subscribers:
+            try:
+                async with await psycopg.AsyncConnection.connect(_listen_dsn(), autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    async for notify in conn.notifies():
+                        try:
+                            self._dispatch(json.loads(notify.payload))
+                        except ValueError:
+                            continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"[PROGRESS] listener error: {exc}, reconnecting")
+                await asyncio.sleep(1.0)
+
+
+broadcaster = ProgressBroadcaster()
+
+
+def format_sse(data: Dict, event: str = "progress") -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
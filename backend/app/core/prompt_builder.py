@@ -0,0 +1,207 @@
+# app/core/prompt_builder.py
+
+# Turns the aligned transcript (every speaker, see extract_candidate_speech)
+# into what the scorer actually sends:
+#
+# 1. keep only the candidate's rows
+# 2. collapse overlapping duplicates (same words emitted twice around a
+#    Whisper segment boundary, or split across two overlapping turns)
+# 3. estimate the token count; only past PROMPT_TOKEN_BUDGET compact
+#    (drop filler words and one-word backchannels such as "yeah", "ok")
+#    and split the transcript into chunks on segment boundaries for
+#    map-reduce scoring. Fillers are evidence of fluency and confidence,
+#    so a transcript that fits is scored verbatim.
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.alignement import candidate_turns, identify_candidate_speaker
+
+# Hesitation markers, English and French interviews
+FILLER_WORDS = {
+    "um", "umm", "uh", "uhm", "erm", "hmm", "ah", "eh",
+    "euh", "heu", "bah", "ben", "bref",
+}
+
+BACKCHANNELS = {
+    "yes", "yeah", "yep", "ok", "okay", "right", "sure", "mhm", "mm",
+    "oui", "ouais", "d'accord", "voila", "voilà", "merci", "thanks",
+}
+
+# Gemini tokenises English / French text at roughly 4 characters per token
+CHARS_PER_TOKEN = 4
+
+_TOKEN_SPLIT_RE = re.compile(r"(\s+)")
+_STRIP_PUNCT = ".,!?;:…\"'"
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def candidate_rows(rows: List[Dict], speaker: Optional[str] = None) -> List[Dict]:
+    return candidate_turns(rows, speaker or identify_candidate_speaker(rows))
+
+
+def _overlap_words(previous: List[str], current: List[str]) -> int:
+    # Longest suffix of previous that is a prefix of current
+    for size in range(min(len(previous), len(current)), 0, -1):
+        if previous[-size:] == current[:size]:
+            return size
+    return 0
+
+
+def collapse_duplicates(rows: List[Dict]) -> List[Dict]:
+    """
+    Merges rows repeating the previous row's text, and trims words a row
+    repeats from the end of the previous one when their spans overlap.
+    """
+    collapsed = []
+    for row in sorted(rows, key=lambda r: (float(r.get("start") or 0), float(r.get("end") or 0))):
+        text = (row.get("text") or "").strip()
+        if not text:
+            continue
+
+        if collapsed:
+            previous = collapsed[-1]
+            overlaps = float(row.get("start") or 0) < float(previous.get("end") or 0)
+
+            if text == previous["text"] and overlaps:
+                previous["end"] = max(float(previous["end"]), float(row.get("end") or 0))
+                continue
+
+            if overlaps:
+                words = text.split()
+                shared = _overlap_words(previous["text"].split(), words)
+                text = " ".join(words[shared:])
+                if not text:
+                    previous["end"] = max(float(previous["end"]), float(row.get("end") or 0))
+                    continue
+
+        collapsed.append({**row, "text": text})
+
+    return collapsed
+
+
+def compact_text(text: str) -> str:
+    kept = []
+    for word in text.split():
+        if word.strip(_STRIP_PUNCT).lower() in FILLER_WORDS:
+            continue
+        kept.append(word)
+    return " ".join(kept)
+
+
+def count_fillers(rows: List[Dict]) -> Tuple[int, int]:
+    """(filler words, words) spoken in the rows."""
+    words = [
+        word.strip(_STRIP_PUNCT).lower()
+        for row in rows
+        for word in (row.get("text") or "").split()
+    ]
+    return sum(1 for word in words if word in FILLER_WORDS), len(words)
+
+
+def compact_rows(rows: List[Dict]) -> List[Dict]:
+    compacted = []
+    for row in rows:
+        text = compact_text(row["text"])
+        words = [w.strip(_STRIP_PUNCT).lower() for w in text.split()]
+        if not words or all(w in BACKCHANNELS for w in words):
+            continue
+        compacted.append({**row, "text": text})
+    return compacted
+
+
+def prepare_transcript(
+    transcript,
+    compact: bool = True,
+    candidate_speaker: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Steps 1-2: candidate-only, de-duplicated (and with compact, filler-free)
+    rows. A plain string transcript becomes a single row. Without an
+    explicit candidate_speaker the alignment heuristics pick one.
+    """
+    if isinstance(transcript, str):
+        rows = [{"text": transcript}] if transcript.strip() else []
+    else:
+        rows = [
+            row if isinstance(row, dict) else {"text": str(row)}
+            for row in transcript or []
+        ]
+
+    rows = collapse_duplicates(candidate_rows(rows, candidate_speaker))
+    return compact_rows(rows) if compact else rows
+
+
+def _split_long_text(text: str, budget: int) -> List[str]:
+    # A single row larger than the budget is cut on whitespace
+    limit = budget * CHARS_PER_TOKEN
+    parts, current = [], ""
+    for piece in _TOKEN_SPLIT_RE.split(text):
+        if current and len(current) + len(piece) > limit:
+            parts.append(current.strip())
+            current = ""
+        current += piece
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def chunk_rows(rows: List[Dict], budget: Optional[int] = None) -> List[str]:
+    """
+    Step 3: the transcript text as one string when it fits in `budget`
+    tokens, otherwise several chunks cut on row boundaries.
+    """
+    budget = budget or settings.PROMPT_TOKEN_BUDGET
+
+    chunks, current, current_tokens = [], [], 0
+    for row in rows:
+        text = row["text"]
+        tokens = estimate_tokens(text) + 1
+
+        if tokens > budget:
+            if current:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_long_text(text, budget))
+            continue
+
+        if current and current_tokens + tokens > budget:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+
+        current.append(text)
+        current_tokens += tokens
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def prompt_chunks(rows: List[Dict], budget: Optional[int] = None) -> List[str]:
+    """
+    Step 3 on prepared rows: verbatim when they fit in `budget`, otherwise
+    compacted and chunked. Every chunk of a compacted transcript starts
+    with the number of fillers removed, so fluency is still judged on them.
+    """
+    budget = budget or settings.PROMPT_TOKEN_BUDGET
+    chunks = chunk_rows(rows, budget)
+    if len(chunks) <= 1:
+        return chunks
+
+    fillers, words = count_fillers(rows)
+    if not fillers:
+        return chunk_rows(compact_rows(rows), budget)
+
+    note = (
+        f"[{fillers} filler words ({fillers / words:.0%} of the candidate's words) "
+        f"were removed from this transcript.]"
+    )
+    return [f"{note} {chunk}" for chunk in chunk_rows(compact_rows(rows), budget - estimate_tokens(note) - 1)]
+
+
+def build_prompt_chunks(transcript, budget: Optional[int] = None) -> List[str]:
+    return prompt_chunks(prepare_transcript(transcript, compact=False), budget)
@@ -0,0 +1,191 @@
+# app/core/result_cache.py
+
+# Content-addressed cache for the expensive pipeline stages.
+#
+# diarization   -> keyed by audio hash + diarization model
+# transcription -> keyed by audio hash + transcription engine and model size
+# scores        -> keyed by audio hash + every model above + scorer model
+#                  + job title + required qualities + candidate speaker
+#
+# Entries are small JSON files under RESULT_CACHE_PATH/<stage>/. Reads
+# bump the file mtime. Writes add to a running size total, measured by
+# one walk of the directory on the first write; once it passes
+# RESULT_CACHE_MAX_BYTES the directory is walked again (other processes
+# write to it too) and the least recently used entries are evicted down
+# to EVICT_TO_RATIO of the limit, so the next walk is many writes away.
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from typing import Any, List, Optional
+
+from app.config import settings
+from app.core.transcription_engines import transcription_model_id
+
+# Bump when the shape of cached values changes
+CACHE_VERSION = 1
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _json_default(value):
+    # numpy scalars from the models serialise as plain numbers
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _key(*parts: Any) -> str:
+    raw = json.dumps([CACHE_VERSION, *parts], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def diarization_key(audio_hash: str) -> str:
+    return _key("diarization", audio_hash, settings.DIARIZATION_MODEL)
+
+
+def transcription_key(audio_hash: str, model: Optional[str] = None) -> str:
+    """`model` is a transcription_engines.transcription_model_id()."""
+    return _key("transcription", audio_hash, model or transcription_model_id())
+
+
+def alignment_key(diarization: str, transcription: str, interviewer_embedding=None) -> str:
+    """Alignment inputs: both audio stage keys + the enrolled interviewer."""
+    return _key("alignment", diarization, transcription, interviewer_embedding)
+
+
+def scores_key(
+    audio_hash: str,
+    job_title: str,
+    required_qualities: List[str],
+    scorer_model: str,
+    transcription_model: Optional[str] = None,
+    candidate_speaker: Optional[str] = None,
+) -> str:
+    return _key(
+        "scores",
+        audio_hash,
+        settings.DIARIZATION_MODEL,
+        transcription_model or transcription_model_id(),
+        scorer_model,
+        (job_title or "").strip(),
+        sorted(q.strip().lower() for q in required_qualities),
+        candidate_speaker,
+    )
+
+
+class ResultCache:
+
+    # Share of max_bytes kept by an eviction
+    EVICT_TO_RATIO = 0.9
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Bytes written under root as far as this process knows, None
+        # until the first walk
+        self._total_bytes: Optional[int] = None
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, stage, f"{key}.json")
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        path = self._path(stage, key)
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                value = json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return value
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(value, handle, ensure_ascii=False, default=_json_default)
+        size = os.path.getsize(tmp_path)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += size - replaced
+                if self._total_bytes <= self.max_bytes:
+                    return
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Walks the cache and, when it is larger than max_bytes, deletes the
+        least recently used entries until it fits in EVICT_TO_RATIO of it.
+        Resets the running size total. Returns the number of removed entries.
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    if not name.endswith(".json"):
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+
+            removed = 0
+            if total > self.max_bytes:
+                target = int(self.max_bytes * self.EVICT_TO_RATIO)
+                entries.sort()
+                for _, size, path in entries:
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    total -= size
+                    removed += 1
+
+            self._total_bytes = total
+            return removed
+
+
+_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Process-wide cache instance, or None when RESULT_CACHE_ENABLED is off.
+    """
+    global _cache
+
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+
+    if _cache is None:
+        _cache = ResultCache(settings.RESULT_CACHE_PATH, settings.RESULT_CACHE_MAX_BYTES)
+    return _cache
@@ -0,0 +1,261 @@
+# app/core/scheduler.py
+
+# Batch analysis of a whole job session.
+#
+# schedule_session() queues one "analyze" job per pending interview, in the
+# requested order (shortest recording first by default, so results start
+# arriving early), with scoring deferred. The worker pool runs them on its
+# warm models, and "score_batch" jobs then score every interview whose
+# audio stages are done in one Scorer.score_many call, i.e. one batch of
+# concurrent, rate-limited Gemini requests, wave after wave until the
+# batch is finished.
+#
+# session_progress() aggregates the progress of a session and estimates
+# the remaining time from the measured real-time factor.
+
+import os
+import statistics
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import job_queue
+from app.core import progress as analysis_progress
+from app.core.analysis_worker import score_interviews
+from app.db.models import Interview, Job
+from app.utils.audio import probe_duration
+
+ORDERS = ("shortest_first", "priority", "fifo")
+
+# Interviews (re)analysed by a batch unless reanalyze is set
+ANALYZABLE_STATUSES = ("uploaded", "failed")
+DONE_STATUSES = ("completed", "ready", "reviewed", "failed")
+
+
+def _audio_seconds(interview: Interview) -> Optional[float]:
+    if interview.audio_seconds is None and interview.audio_path and os.path.exists(interview.audio_path):
+        interview.audio_seconds = probe_duration(interview.audio_path)
+    return interview.audio_seconds
+
+
+def _file_size(interview: Interview) -> int:
+    try:
+        return os.path.getsize(interview.audio_path)
+    except (OSError, TypeError):
+        return 0
+
+
+def order_interviews(
+    interviews: List[Interview],
+    order: str = "shortest_first",
+    interview_ids: Optional[List[int]] = None,
+) -> List[Interview]:
+    """
+    shortest_first: by duration, recordings of unknown duration last (by
+                    file size)
+    priority:       in the order of interview_ids
+    fifo:           in upload order
+    """
+    if order not in ORDERS:
+        raise ValueError(f"Unknown batch order: {order}")
+
+    if order == "priority" and interview_ids:
+        rank = {interview_id: index for index, interview_id in enumerate(interview_ids)}
+        return sorted(interviews, key=lambda interview: rank.get(interview.id, len(rank)))
+
+    if order == "shortest_first":
+        def key(interview):
+            seconds = _audio_seconds(interview)
+            return (seconds is None, seconds or 0.0, _file_size(interview), interview.id)
+        return sorted(interviews, key=key)
+
+    return sorted(interviews, key=lambda interview: (interview.created_at, interview.id))
+
+
+def schedule_session(
+    db: Session,
+    job_session_id: int,
+    order: str = "shortest_first",
+    interview_ids: Optional[List[int]] = None,
+    reanalyze: bool = False,
+    priority: int = 0,
+) -> Dict:
+    """
+    Queues the analysis of the pending interviews of a job session (or of
+    `interview_ids`), plus the first scoring wave. Interviews already being
+    analysed are left alone. Commits.
+    """
+    query = db.query(Interview).filter(Interview.job_session_id == job_session_id)
+    if interview_ids:
+        query = query.filter(Interview.id.in_(interview_ids))
+    if not reanalyze:
+        query = query.filter(Interview.status.in_(ANALYZABLE_STATUSES))
+    interviews = query.all()
+
+    running = {
+        interview_id for (interview_id,) in db.query(Job.interview_id).filter(
+            Job.kind == "analyze",
+            Job.status == job_queue.RUNNING,
+            Job.interview_id.in_([interview.id for interview in interviews]),
+        ).all()
+    } if interviews else set()
+
+    ordered = order_interviews(
+        [interview for interview in interviews if interview.id not in running],
+        order,
+        interview_ids,
+    )
+
+    batch_id = uuid.uuid4().hex[:12]
+    job_ids = []
+    for interview in ordered:
+        # Jobs of equal priority run in insertion order (run_after, id)
+        job_queue.cancel_pending(db, interview.id, kind="analyze")
+        job = job_queue.enqueue(
+            db,
+            "analyze",
+            interview_id=interview.id,
+            audio_path=interview.audio_path,
+            payload={"batch_id": batch_id, "defer_scoring": True},
+            priority=priority,
+        )
+        job_ids.append(job.id)
+        interview.status = "uploaded"
+
+    db.flush()
+    for interview in ordered:
+        analysis_progress.publish(interview.id, stage="queued", percent=0.0, db=db)
+
+    if ordered:
+        _enqueue_score_wave(db, batch_id, [interview.id for interview in ordered])
+    db.commit()
+
+    print(f"[SCHEDULER] Batch {batch_id}: {len(ordered)} interview(s) of job session {job_session_id} ({order})")
+    return {
+        "job_session_id": job_session_id,
+        "batch_id": batch_id,
+        "order": order,
+        "queued": len(ordered),
+        "interview_ids": [interview.id for interview in ordered],
+        "job_ids": job_ids,
+        "audio_seconds": round(sum(interview.audio_seconds or 0.0 for interview in ordered), 2),
+    }
+
+
+def _enqueue_score_wave(db: Session, batch_id: str, interview_ids: List[int], failed_waves: int = 0) -> Job:
+    return job_queue.enqueue(
+        db,
+        "score_batch",
+        payload={"batch_id": batch_id, "interview_ids": interview_ids, "failed_waves": failed_waves},
+        priority=settings.RESCORE_JOB_PRIORITY,
+        delay_seconds=settings.BATCH_SCORE_INTERVAL,
+    )
+
+
+def run_score_wave(db: Session, payload: Dict) -> Dict:
+    """
+    Handler of a "score_batch" job: scores the interviews of the batch
+    whose audio stages are done and, while some are still queued or
+    running or a scoring call failed, schedules the next wave. After
+    BATCH_SCORE_MAX_FAILED_WAVES waves in a row without progress, the
+    interviews still awaiting scoring are marked failed.
+    """
+    interview_ids = payload.get("interview_ids") or []
+
+    # Counted before scoring: an analysis finishing in between is picked
+    # up by the next wave instead of being left behind
+    outstanding = db.query(func.count(Job.id)).filter(
+        Job.kind == "analyze",
+        Job.interview_id.in_(interview_ids),
+        Job.status.in_([job_queue.PENDING, job_queue.RUNNING]),
+    ).scalar() if interview_ids else 0
+
+    scored = score_interviews(interview_ids, db=db)
+
+    # Interviews whose scoring call failed, retried by the next wave
+    unscored = [
+        interview_id for (interview_id,) in db.query(Interview.id).filter(
+            Interview.id.in_(interview_ids),
+            Interview.status == "processing",
+            Interview.progress_stage == "awaiting_scoring",
+        ).all()
+    ] if interview_ids else []
+    failed_waves = 0 if scored or not unscored else payload.get("failed_waves", 0) + 1
+
+    if unscored and not outstanding and failed_waves >= settings.BATCH_SCORE_MAX_FAILED_WAVES:
+        for interview_id in unscored:
+            analysis_progress.publish(interview_id, stage="failed", status="failed", db=db)
+        db.commit()
+        print(f"[SCHEDULER] Batch {payload.get('batch_id')}: scoring failed {failed_waves} times, {len(unscored)} interview(s) failed")
+        unscored = []
+
+    if outstanding or unscored:
+        _enqueue_score_wave(db, payload.get("batch_id"), interview_ids, failed_waves)
+        db.commit()
+
+    print(
+        f"[SCHEDULER] Batch {payload.get('batch_id')}: scored {len(scored)}, {len(unscored)} awaiting a retry, "
+        f"{outstanding} analysis job(s) outstanding"
+    )
+    return {"scored": len(scored), "unscored": len(unscored), "outstanding": outstanding}
+
+
+def _real_time_factor(metrics: List[Dict]) -> float:
+    factors = [
+        m["real_time_factor"] for m in metrics
+        if m and m.get("status") == "ok" and m.get("real_time_factor")
+    ]
+    return statistics.median(factors) if factors else settings.BATCH_DEFAULT_REAL_TIME_FACTOR
+
+
+def session_progress(db: Session, job_session_id: int) -> Dict:
+    """
+    Aggregate progress of a job session: interviews per status, overall
+    percentage weighted by audio duration, and an ETA from the median
+    real-time factor of the session's analyses divided among the workers
+    currently holding a job.
+    """
+    rows = db.query(
+        Interview.status,
+        Interview.progress_stage,
+        Interview.progress_percent,
+        Interview.audio_seconds,
+        Interview.pipeline_metrics,
+    ).filter(Interview.job_session_id == job_session_id).all()
+
+    known = [row.audio_seconds for row in rows if row.audio_seconds]
+    default_seconds = statistics.mean(known) if known else 60.0
+
+    counts: Dict[str, int] = {}
+    total_audio = done_audio = remaining_audio = 0.0
+    for row in rows:
+        key = "awaiting_scoring" if row.progress_stage == "awaiting_scoring" and row.status == "processing" else row.status
+        counts[key] = counts.get(key, 0) + 1
+
+        seconds = row.audio_seconds or default_seconds
+        fraction = 1.0 if row.status in DONE_STATUSES else min(max((row.progress_percent or 0.0) / 100.0, 0.0), 1.0)
+        total_audio += seconds
+        done_audio += seconds * fraction
+        remaining_audio += seconds * (1.0 - fraction)
+
+    rtf = _real_time_factor([row.pipeline_metrics for row in rows])
+    workers = db.query(func.count(func.distinct(Job.locked_by))).filter(
+        Job.status == job_queue.RUNNING,
+        Job.locked_until > datetime.utcnow(),
+    ).scalar() or settings.WORKER_POOL_SIZE
+
+    return {
+        "job_session_id": job_session_id,
+        "total": len(rows),
+        "counts": counts,
+        "finished": sum(1 for row in rows if row.status in DONE_STATUSES),
+        "percent": round(100.0 * done_audio / total_audio, 1) if total_audio else 100.0,
+        "remaining_audio_seconds": round(remaining_audio, 1),
+        "real_time_factor": round(rtf, 4),
+        "workers": workers,
+        "eta_seconds": round(remaining_audio * rtf / max(workers, 1)),
+    }
@@ -0,0 +1,394 @@
+# app/core/scoring.py
+
+# Scoring backends. Every scorer turns an aligned transcript into the four
+# sub-scores + short feedback that compute_final_score consumes:
+#
+# gemini -> LLM evaluation through the Gemini API (network, per-call cost)
+# local  -> CPU-only heuristic scorer, no network: similarity of the
+#           transcript to the required qualities + speech-rate / filler /
+#           pause metrics from the segment timings. Meant for high-volume
+#           first-pass screening and for air-gapped or test environments.
+#
+# The backend is chosen per job session (JobSession.scoring_backend).
+
+import math
+import re
+import unicodedata
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.core.gpt_analysis import (
+    DEFAULT_RESULT,
+    ERROR_FEEDBACK,
+    MODEL_NAME as GEMINI_MODEL_NAME,
+    analyze_candidate_with_gemini,
+    score_batch,
+)
+from app.core.prompt_builder import FILLER_WORDS, estimate_tokens, prompt_chunks
+
+SCORE_KEYS = ("content_relevance", "vocal_confidence", "clarity_of_speech", "fluency")
+
+class Scorer(ABC):
+    """
+    Base class of a scoring backend. `score` receives the candidate-only,
+    de-duplicated rows built by prompt_builder.prepare_transcript.
+
+    `model_name` identifies the scorer (and its version) in result-cache
+    keys, so changing backend never serves scores produced by another one.
+    """
+
+    name = "base"
+    model_name = "base"
+
+    @abstractmethod
+    def score(
+        self,
+        transcript,
+        job_title: str,
+        required_qualities: List[str],
+    ) -> Dict[str, float | str]:
+        ...
+
+    def score_many(self, items: List[tuple]) -> List[Dict[str, float | str]]:
+        """
+        Scores several (transcript, job_title, required_qualities) items,
+        in input order. Backends with a remote API override it to batch calls.
+        """
+        return [self.score(*item) for item in items]
+
+    def is_cacheable(self, result: Dict) -> bool:
+        return True
+
+
+def aggregate_chunk_scores(results: List, weights: List[float]) -> Dict[str, float | str]:
+    """
+    Reduce step of map-reduce scoring: token-weighted mean of every chunk
+    that was scored, feedback of the most representative chunks. Failed
+    chunks (exceptions) are skipped and mark the result as partial.
+    """
+    scored = [
+        (result, weight) for result, weight in zip(results, weights)
+        if isinstance(result, dict)
+    ]
+    if not scored:
+        return {**DEFAULT_RESULT, "short_feedback": ERROR_FEEDBACK}
+
+    total = sum(weight for _, weight in scored) or 1.0
+    aggregated = {
+        key: round(sum(float(result[key]) * weight for result, weight in scored) / total, 2)
+        for key in SCORE_KEYS
+    }
+
+    feedback = []
+    for result, _ in sorted(scored, key=lambda item: item[1], reverse=True)[:2]:
+        sentence = result["short_feedback"].strip().split(". ")[0].rstrip(".")
+        if sentence and sentence not in feedback:
+            feedback.append(sentence)
+    aggregated["short_feedback"] = f"Across {len(results)} parts of the interview: " + ". ".join(feedback) + "."
+
+    if len(scored) < len(results):
+        aggregated["partial"] = True
+    return aggregated
+
+
+class GeminiScorer(Scorer):
+    """
+    Transcripts within PROMPT_TOKEN_BUDGET go out verbatim in one call;
+    longer ones are compacted, chunked and scored chunk by chunk (concurrently, through
+    the async client), then aggregated.
+    """
+
+    name = "gemini"
+    # Prompt revision in the name: transcripts are filtered since v2 (older
+    # cached scores were computed on every speaker) and only compacted
+    # past the token budget since v3
+    model_name = f"{GEMINI_MODEL_NAME}/prompt-v3"
+
+    def score(self, transcript, job_title, required_qualities):
+        chunks = prompt_chunks(transcript)
+
+        if len(chunks) <= 1:
+            return analyze_candidate_with_gemini(
+                transcript=chunks[0] if chunks else "",
+                job_title=job_title,
+                required_qualities=required_qualities,
+            )
+
+        print(f"[Gemini Analysis] transcript over budget, scoring {len(chunks)} chunks")
+        results = score_batch([(chunk, job_title, required_qualities) for chunk in chunks])
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"[Gemini Analysis Error] chunk failed: {result}")
+
+        return aggregate_chunk_scores(results, [estimate_tokens(chunk) for chunk in chunks])
+
+    def score_many(self, items):
+        """
+        Scores every chunk of every transcript in one batch of concurrent
+        calls sharing the async client's rate limit, then regroups them.
+        """
+        plans = [
+            (prompt_chunks(transcript), job_title, required_qualities)
+            for transcript, job_title, required_qualities in items
+        ]
+        calls = [
+            (chunk, job_title, required_qualities)
+            for chunks, job_title, required_qualities in plans
+            for chunk in chunks
+        ]
+        print(f"[Gemini Analysis] scoring {len(items)} transcripts in {len(calls)} calls")
+        results = score_batch(calls) if calls else []
+
+        scored = []
+        position = 0
+        for chunks, _, _ in plans:
+            chunk_results = results[position:position + len(chunks)]
+            position += len(chunks)
+
+            if not chunks:
+                scored.append(dict(DEFAULT_RESULT))
+            elif len(chunks) == 1:
+                result = chunk_results[0]
+                if isinstance(result, Exception):
+                    print(f"[Gemini Analysis Error] {result}")
+                    result = {**DEFAULT_RESULT, "short_feedback": ERROR_FEEDBACK}
+                scored.append(result)
+            else:
+                scored.append(aggregate_chunk_scores(chunk_results, [estimate_tokens(chunk) for chunk in chunks]))
+
+        return scored
+
+    def is_cacheable(self, result):
+        # Never cache the zero-score fallback of a failed Gemini call, nor
+        # scores that miss some chunks
+        return result.get("short_feedback") != ERROR_FEEDBACK and not result.get("partial")
+
+
+# ---------- local scorer ----------
+
+FILLER_PHRASES = ("you know", "i mean", "kind of", "sort of", "en fait", "du coup", "tu vois", "genre")
+HEDGE_PHRASES = (
+    "i think", "i guess", "maybe", "perhaps", "probably", "not sure", "i don't know",
+    "je pense", "peut-être", "peut etre", "je crois", "je ne sais pas", "sais pas",
+)
+
+_WORD_RE = re.compile(r"[\w']+", re.UNICODE)
+
+# Comfortable conversational speech rate, words per minute
+IDEAL_WPM = (110.0, 170.0)
+LONG_PAUSE_SECONDS = 2.0
+
+
+def _normalise(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(_normalise(text))
+
+
+def _embed(text: str, dim: int) -> np.ndarray:
+    """
+    Hashed character-trigram embedding: cheap, dependency free and tolerant
+    to inflections ("communicate" / "communication", "équipe" / "equipes").
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in _words(text):
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            vector[zlib.crc32(padded[i:i + 3].encode("utf-8")) % dim] += 1.0
+
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _segments_of(transcript) -> List[Dict]:
+    if isinstance(transcript, list):
+        return [
+            row if isinstance(row, dict) else {"text": str(row)}
+            for row in transcript
+        ]
+    if isinstance(transcript, str) and transcript.strip():
+        return [{"text": transcript}]
+    return []
+
+
+def _band(value: float, low: float, high: float, falloff: float) -> float:
+    """1.0 inside [low, high], decaying linearly to 0 over `falloff` outside."""
+    if low <= value <= high:
+        return 1.0
+    distance = low - value if value < low else value - high
+    return max(0.0, 1.0 - distance / falloff)
+
+
+def _pct(value: float) -> float:
+    return round(float(max(0.0, min(100.0, value * 100.0))), 2)
+
+
+def speech_metrics(segments: List[Dict]) -> Dict[str, float]:
+    """
+    Delivery metrics of the candidate's speech from segment timings:
+    speech rate, filler / hedge / repetition ratios and long pauses.
+    """
+    text = " ".join(seg.get("text") or "" for seg in segments)
+    normalised = " ".join(_words(text))
+    words = normalised.split()
+    word_count = len(words)
+
+    timed = sorted(
+        (float(seg["start"]), float(seg["end"]))
+        for seg in segments
+        if seg.get("start") is not None and seg.get("end") is not None
+    )
+    speaking_seconds = sum(max(0.0, end - start) for start, end in timed)
+
+    long_pauses = 0
+    for (_, previous_end), (start, _) in zip(timed, timed[1:]):
+        if start - previous_end >= LONG_PAUSE_SECONDS:
+            long_pauses += 1
+
+    padded = f" {normalised} "
+    fillers = sum(1 for word in words if word in FILLER_WORDS)
+    fillers += sum(padded.count(f" {phrase} ") for phrase in FILLER_PHRASES)
+    hedges = sum(padded.count(f" {_normalise(phrase)} ") for phrase in HEDGE_PHRASES)
+    repetitions = sum(1 for a, b in zip(words, words[1:]) if a == b)
+
+    per_word = max(word_count, 1)
+    return {
+        "word_count": word_count,
+        "speaking_seconds": round(speaking_seconds, 2),
+        "words_per_minute": round(word_count / speaking_seconds * 60.0, 1) if speaking_seconds else 0.0,
+        "filler_ratio": round(fillers / per_word, 4),
+        "hedge_ratio": round(hedges / per_word, 4),
+        "repetition_ratio": round(repetitions / per_word, 4),
+        "long_pauses_per_minute": round(long_pauses / speaking_seconds * 60.0, 2) if speaking_seconds else 0.0,
+        "lexical_diversity": round(len(set(words)) / per_word, 4),
+    }
+
+
+class LocalScorer(Scorer):
+    """
+    Offline heuristic scorer.
+
+    content_relevance: for each required quality (the job title when there
+    are none), the best cosine similarity between its embedding and any
+    transcript segment; the mean over qualities, rescaled.
+    fluency / clarity / confidence: speech rate, filler words, repetitions,
+    hedging and long pauses computed from the aligned segments.
+    """
+
+    name = "local"
+    model_name = "local-v1"
+
+    # Cosine similarities of hashed trigram vectors rarely go beyond ~0.5
+    # for a genuinely on-topic answer; map [floor, ceiling] to [0, 1]
+    SIMILARITY_FLOOR = 0.05
+    SIMILARITY_CEILING = 0.45
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim or settings.LOCAL_SCORER_EMBEDDING_DIM
+
+    def relevance(self, segments: List[Dict], job_title: str, required_qualities: List[str]) -> float:
+        texts = [seg.get("text") or "" for seg in segments if (seg.get("text") or "").strip()]
+        targets = [q for q in required_qualities if q.strip()] or ([job_title] if job_title else [])
+        if not texts or not targets:
+            return 0.0
+
+        # Whole answer as an extra row: qualities spread over several turns still match
+        segment_matrix = np.stack([_embed(text, self.dim) for text in texts + [" ".join(texts)]])
+        target_matrix = np.stack([_embed(target, self.dim) for target in targets])
+
+        best = (target_matrix @ segment_matrix.T).max(axis=1)
+        span = self.SIMILARITY_CEILING - self.SIMILARITY_FLOOR
+        return float(np.clip((best - self.SIMILARITY_FLOOR) / span, 0.0, 1.0).mean())
+
+    def score(self, transcript, job_title, required_qualities):
+        segments = _segments_of(transcript)
+        metrics = speech_metrics(segments)
+        if metrics["word_count"] == 0:
+            return dict(DEFAULT_RESULT)
+
+        relevance = self.relevance(segments, job_title, required_qualities)
+        # Very short answers cannot demonstrate much, whatever they contain
+        relevance *= min(1.0, math.sqrt(metrics["word_count"] / 150.0))
+
+        wpm = metrics["words_per_minute"]
+        rate = _band(wpm, *IDEAL_WPM, falloff=80.0) if wpm else 0.5
+
+        fluency = (
+            0.4 * rate
+            + 0.3 * max(0.0, 1.0 - metrics["filler_ratio"] * 10.0)
+            + 0.15 * max(0.0, 1.0 - metrics["repetition_ratio"] * 20.0)
+            + 0.15 * max(0.0, 1.0 - metrics["long_pauses_per_minute"] / 6.0)
+        )
+        clarity = (
+            0.5 * max(0.0, 1.0 - metrics["filler_ratio"] * 8.0)
+            + 0.3 * _band(metrics["lexical_diversity"], 0.35, 0.8, falloff=0.35)
+            + 0.2 * (_band(wpm, 90.0, 180.0, falloff=80.0) if wpm else 0.5)
+        )
+        confidence = (
+            0.5 * max(0.0, 1.0 - metrics["hedge_ratio"] * 25.0)
+            + 0.3 * max(0.0, 1.0 - metrics["long_pauses_per_minute"] / 6.0)
+            + 0.2 * rate
+        )
+
+        feedback = self._feedback(relevance, metrics)
+        return {
+            "content_relevance": _pct(relevance),
+            "vocal_confidence": _pct(confidence),
+            "clarity_of_speech": _pct(clarity),
+            "fluency": _pct(fluency),
+            "short_feedback": feedback,
+            "metrics": metrics,
+        }
+
+    @staticmethod
+    def _feedback(relevance: float, metrics: Dict[str, float]) -> str:
+        notes = []
+        if relevance >= 0.6:
+            notes.append("Answers address most of the required qualities.")
+        elif relevance >= 0.3:
+            notes.append("Answers only partly cover the required qualities.")
+        else:
+            notes.append("Answers show little evidence of the required qualities.")
+
+        wpm = metrics["words_per_minute"]
+        if wpm and wpm < IDEAL_WPM[0]:
+            notes.append(f"Speech is slow ({wpm:.0f} words/min).")
+        elif wpm > IDEAL_WPM[1]:
+            notes.append(f"Speech is fast ({wpm:.0f} words/min).")
+
+        if metrics["filler_ratio"] > 0.05:
+            notes.append("Frequent filler words.")
+        if metrics["hedge_ratio"] > 0.02:
+            notes.append("Many hesitant formulations.")
+
+        notes.append("Automatic first-pass screening (local scorer).")
+        return " ".join(notes)
+
+
+SCORING_BACKENDS = {
+    GeminiScorer.name: GeminiScorer,
+    LocalScorer.name: LocalScorer,
+}
+
+_scorers: Dict[str, Scorer] = {}
+
+
+def get_scorer(backend: Optional[str] = None) -> Scorer:
+    """
+    Shared scorer instance for a backend name (DEFAULT_SCORING_BACKEND when
+    None). Raises ValueError for unknown backends.
+    """
+    backend = backend or settings.DEFAULT_SCORING_BACKEND
+    if backend not in SCORING_BACKENDS:
+        raise ValueError(f"Unknown scoring backend: {backend}")
+
+    if backend not in _scorers:
+        _scorers[backend] = SCORING_BACKENDS[backend]()
+    return _scorers[backend]
@@ -0,0 +1,323 @@
+# app/core/telemetry.py
+
+# Per-stage instrumentation of the analysis pipeline.
+#
+# Every stage (hash, decode, diarization, transcription, alignment,
+# scoring, db_write) is measured with wall time, CPU time, peak RSS and
+# the model loading time it paid, and becomes an OpenTelemetry span under
+# one root span per interview. The same numbers are persisted on the
+# interview (Interview.pipeline_metrics, with real-time factors against
+# the audio duration) and folded into cumulative per-stage totals
+# (PipelineStageMetric) that the API renders at /metrics.
+#
+# Spans are exported over OTLP/HTTP when OTEL_EXPORTER_OTLP_ENDPOINT is
+# set; otherwise they are recorded but not exported.
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+
+from opentelemetry import trace
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import settings
+from app.core.model_registry import registry
+
+# Upper bounds of the stage duration histogram, seconds
+STAGE_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+tracer = trace.get_tracer("vocahire.pipeline")
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def configure_tracing(service_name: str) -> None:
+    """
+    Installs the SDK tracer provider, once per process (API, each worker).
+    """
+    global _configured
+
+    with _configure_lock:
+        if _configured:
+            return
+        _configured = True
+
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        provider = TracerProvider(resource=Resource.create({
+            "service.name": service_name,
+            "service.version": settings.VERSION,
+        }))
+
+        endpoint = settings.OTEL_EXPORTER_OTLP_ENDPOINT
+        if endpoint:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            exporter = OTLPSpanExporter(endpoint=f"{endpoint.rstrip('/')}/v1/traces")
+            provider.add_span_processor(BatchSpanProcessor(exporter))
+
+        trace.set_tracer_provider(provider)
+
+
+# ---------- measurements ----------
+
+def _reset_peak_rss() -> None:
+    # Linux: writing 5 to clear_refs resets VmHWM, so the next read is the
+    # peak of this stage rather than of the whole process lifetime
+    try:
+        with open("/proc/self/clear_refs", "w") as handle:
+            handle.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return None
+
+
+class _Measurement:
+
+    def __init__(self):
+        _reset_peak_rss()
+        self.load_seconds = registry.total_load_seconds()
+        self.start_ns = time.time_ns()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+    def done(self) -> Dict:
+        return {
+            "start_ns": self.start_ns,
+            "end_ns": time.time_ns(),
+            "wall_seconds": round(time.perf_counter() - self.wall, 3),
+            "cpu_seconds": round(time.process_time() - self.cpu, 3),
+            "peak_rss_bytes": _peak_rss_bytes(),
+            "model_load_seconds": round(registry.total_load_seconds() - self.load_seconds, 3),
+            "pid": os.getpid(),
+        }
+
+
+def measure(func, *args):
+    """
+    Runs func(*args) and returns (result, metrics). Module level so it can
+    be shipped to the process pool: CPU time and peak RSS are then those
+    of the child. In thread mode CPU time and peak RSS are process-wide,
+    so concurrent stages include each other's share.
+    """
+    measurement = _Measurement()
+    result = func(*args)
+    return result, measurement.done()
+
+
+def _span_attributes(values: Dict) -> Dict:
+    return {
+        f"vocahire.{key}": value
+        for key, value in values.items()
+        if key not in ("start_ns", "end_ns") and isinstance(value, (str, bool, int, float))
+    }
+
+
+class PipelineRun:
+    """
+    Collects the stage metrics of one analysis and emits them as child
+    spans of a root span.
+    """
+
+    def __init__(self, name: str = "analysis", **attributes):
+        self.stages: Dict[str, Dict] = {}
+        self._finished: Optional[Dict] = None
+        self._started = time.perf_counter()
+        self._span = tracer.start_span(name, attributes=_span_attributes(attributes))
+        self._context = trace.set_span_in_context(self._span)
+
+    def add(self, stage: str, metrics: Dict, **attributes) -> Dict:
+        entry = {**metrics, **attributes}
+        self.stages[stage] = entry
+
+        span = tracer.start_span(
+            stage,
+            context=self._context,
+            start_time=metrics["start_ns"],
+            attributes=_span_attributes(entry),
+        )
+        span.end(end_time=metrics["end_ns"])
+        return entry
+
+    def cached(self, stage: str) -> None:
+        self._span.add_event("cache_hit", {"vocahire.stage": stage})
+        self.stages.setdefault(stage, {"cached": True})
+
+    @contextmanager
+    def stage(self, name: str, **attributes):
+        """
+        Measures the enclosed block as a stage. The yielded dict takes
+        extra attributes discovered inside the block.
+        """
+        extra: Dict = {}
+        measurement = _Measurement()
+        try:
+            yield extra
+        finally:
+            self.add(name, measurement.done(), **attributes, **extra)
+
+    def timings(self) -> Dict[str, float]:
+        return {
+            stage: metrics["wall_seconds"]
+            for stage, metrics in self.stages.items()
+            if "wall_seconds" in metrics
+        }
+
+    def finish(self, audio_seconds: Optional[float] = None, status: str = "ok") -> Dict:
+        """
+        Ends the root span and returns the JSON persisted on the interview.
+        Later calls return the first result.
+        """
+        if self._finished is not None:
+            return self._finished
+
+        stages = {}
+        for stage, metrics in self.stages.items():
+            metrics = {key: value for key, value in metrics.items() if key not in ("start_ns", "end_ns")}
+            if audio_seconds and "wall_seconds" in metrics:
+                metrics["real_time_factor"] = round(metrics["wall_seconds"] / audio_seconds, 4)
+            stages[stage] = metrics
+
+        total_seconds = round(time.perf_counter() - self._started, 3)
+        self._span.set_attribute("vocahire.status", status)
+        self._span.set_attribute("vocahire.total_seconds", total_seconds)
+        if audio_seconds:
+            self._span.set_attribute("vocahire.audio_seconds", audio_seconds)
+            self._span.set_attribute("vocahire.real_time_factor", round(total_seconds / audio_seconds, 4))
+        if status != "ok":
+            self._span.set_status(trace.Status(trace.StatusCode.ERROR, status))
+        self._span.end()
+
+        self._finished = {
+            "status": status,
+            "audio_seconds": round(audio_seconds, 2) if audio_seconds else None,
+            "total_seconds": total_seconds,
+            "real_time_factor": round(total_seconds / audio_seconds, 4) if audio_seconds else None,
+            "stages": stages,
+        }
+        return self._finished
+
+
+# ---------- cross-process totals for /metrics ----------
+
+def record_stage_totals(db, metrics: Dict) -> None:
+    """
+    Adds the stages of one finished run to the per-stage cumulative
+    totals. Rows are locked, so concurrent workers never lose an update.
+    The caller commits.
+    """
+    from app.db.models import PipelineStageMetric
+
+    audio_seconds = metrics.get("audio_seconds") or 0.0
+
+    for stage in sorted(metrics.get("stages", {})):
+        values = metrics["stages"][stage]
+        if "wall_seconds" not in values:
+            continue
+
+        db.execute(
+            pg_insert(PipelineStageMetric)
+            .values(stage=stage, buckets=[0] * len(STAGE_BUCKETS))
+            .on_conflict_do_nothing(index_elements=["stage"])
+        )
+        row = db.query(PipelineStageMetric).filter(
+            PipelineStageMetric.stage == stage
+        ).with_for_update().one()
+
+        wall = values["wall_seconds"]
+        buckets = list(row.buckets or [0] * len(STAGE_BUCKETS))
+        for index, bound in enumerate(STAGE_BUCKETS):
+            if wall <= bound:
+                buckets[index] += 1
+
+        row.count += 1
+        row.wall_seconds_sum += wall
+        row.cpu_seconds_sum += values.get("cpu_seconds") or 0.0
+        row.audio_seconds_sum += audio_seconds
+        row.model_load_seconds_sum += values.get("model_load_seconds") or 0.0
+        row.peak_rss_bytes_max = max(row.peak_rss_bytes_max or 0, values.get("peak_rss_bytes") or 0)
+        row.buckets = buckets
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _metric(lines, name: str, kind: str, help_text: str, samples: Iterable) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for suffix, labels, value in samples:
+        label_text = ",".join(f'{key}="{_label_value(val)}"' for key, val in labels.items())
+        lines.append(f"{name}{suffix}{{{label_text}}} {value}" if label_text else f"{name}{suffix} {value}")
+
+
+def render_prometheus(db) -> str:
+    """
+    Prometheus text exposition (format 0.0.4) of the pipeline stage totals,
+    the job queue and interview statuses, and this process's models.
+    """
+    from app.db.models import Interview, Job, PipelineStageMetric
+
+    lines = []
+    rows = db.query(PipelineStageMetric).order_by(PipelineStageMetric.stage).all()
+
+    histogram = []
+    for row in rows:
+        buckets = row.buckets or [0] * len(STAGE_BUCKETS)
+        for bound, count in zip(STAGE_BUCKETS, buckets):
+            histogram.append(("_bucket", {"stage": row.stage, "le": bound}, count))
+        histogram.append(("_bucket", {"stage": row.stage, "le": "+Inf"}, row.count))
+        histogram.append(("_sum", {"stage": row.stage}, round(row.wall_seconds_sum, 3)))
+        histogram.append(("_count", {"stage": row.stage}, row.count))
+    _metric(lines, "vocahire_pipeline_stage_duration_seconds", "histogram",
+            "Wall time of analysis pipeline stages.", histogram)
+
+    _metric(lines, "vocahire_pipeline_stage_cpu_seconds_total", "counter",
+            "CPU time spent in analysis pipeline stages.",
+            [("", {"stage": row.stage}, round(row.cpu_seconds_sum, 3)) for row in rows])
+    _metric(lines, "vocahire_pipeline_stage_audio_seconds_total", "counter",
+            "Audio processed by analysis pipeline stages (wall / audio = real-time factor).",
+            [("", {"stage": row.stage}, round(row.audio_seconds_sum, 3)) for row in rows])
+    _metric(lines, "vocahire_pipeline_stage_model_load_seconds_total", "counter",
+            "Model loading time paid inside analysis pipeline stages.",
+            [("", {"stage": row.stage}, round(row.model_load_seconds_sum, 3)) for row in rows])
+    _metric(lines, "vocahire_pipeline_stage_peak_rss_bytes", "gauge",
+            "Highest peak resident memory observed during a stage.",
+            [("", {"stage": row.stage}, row.peak_rss_bytes_max or 0) for row in rows])
+
+    jobs = db.query(Job.kind, Job.status, func.count(Job.id)).group_by(Job.kind, Job.status).all()
+    _metric(lines, "vocahire_jobs", "gauge", "Jobs in the analysis queue by kind and status.",
+            [("", {"kind": kind, "status": status}, count) for kind, status, count in jobs])
+
+    interviews = db.query(Interview.status, func.count(Interview.id)).group_by(Interview.status).all()
+    _metric(lines, "vocahire_interviews", "gauge", "Interviews by analysis status.",
+            [("", {"status": status}, count) for status, count in interviews])
+
+    stats = registry.stats()
+    _metric(lines, "vocahire_process_resident_memory_bytes", "gauge", "Resident memory of the API process.",
+            [("", {}, stats["rss_bytes"] or 0)])
+    _metric(lines, "vocahire_model_load_seconds", "gauge", "Load time of models loaded in the API process.",
+            [("", {"model": key}, value["load_seconds"]) for key, value in stats["models"].items()])
+
+    return "\n".join(lines) + "\n"
@@ -1,13 +1,258 @@
 # app/core/transcription.py
 
-import whisper
+# Whisper transcription, whole-file or streamed, on any of the engines of
+# core.transcription_engines.
+#
+# Streaming mode cuts the recording into windows of at most
+# TRANSCRIPTION_WINDOW_SECONDS, each ending in the longest silence found
+# near its end (energy VAD), transcribes the windows in parallel in a
+# spawn-based process pool and yields their segments in order with
+# absolute timestamps. Workers memory-map the decode cache and copy only
+# their window, so peak memory depends on the window length, not on the
+# length of the recording.
 
-def transcribe_audio(audio_path: str, model_size="base"):
-    model = whisper.load_model(model_size)
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
 
-    result = model.transcribe(
-        audio_path,
-        fp16=False
+import numpy as np
+
+from app.config import settings
+from app.core.transcription_engines import get_engine
+from app.utils.audio import SAMPLE_RATE, load_decoded_audio
+
+FRAME_SAMPLES = SAMPLE_RATE * 30 // 1000  # 30 ms VAD frames
+SILENCE_SEARCH_SECONDS = 30.0  # how far back from a window's end to look for a cut
+MIN_SILENCE_SECONDS = 0.3
+
+_window_pool: Optional[ProcessPoolExecutor] = None
+_window_pool_lock = threading.Lock()
+
+# Set in the window pool's own processes, which transcribe one window each
+# and never start a pool of their own
+_in_window_pool = False
+
+
+def _transcribe_array(audio: np.ndarray, model_size=None, engine=None) -> List[dict]:
+    return get_engine(engine).transcribe(audio, model_size)
+
+
+# ---------- voice activity / window planning ----------
+
+def _frame_energy(audio: np.ndarray, start: int, end: int) -> np.ndarray:
+    block = np.asarray(audio[start:end], dtype=np.float32)
+    count = len(block) // FRAME_SAMPLES
+    frames = block[:count * FRAME_SAMPLES].reshape(count, FRAME_SAMPLES)
+    return np.sqrt((frames ** 2).mean(axis=1) + 1e-12)
+
+
+def _silence_threshold(audio: np.ndarray, probes: int = 200) -> float:
+    # Sample one second at evenly spaced offsets rather than scanning the
+    # whole recording; silence sits near the bottom of the energy range
+    second = SAMPLE_RATE
+    offsets = np.linspace(0, max(0, len(audio) - second), num=min(probes, max(1, len(audio) // second)))
+    energies = np.concatenate([_frame_energy(audio, int(o), int(o) + second) for o in offsets])
+    if energies.size == 0:
+        return 0.0
+    return max(float(np.percentile(energies, 10)) * 3.0, 1e-4)
+
+
+def _best_cut(energy: np.ndarray, threshold: float) -> int:
+    """
+    Frame index to cut at: middle of the longest quiet run, or the quietest
+    frame when no run is long enough.
+    """
+    quiet = np.concatenate([[False], energy < threshold, [False]])
+    edges = np.flatnonzero(np.diff(quiet.astype(np.int8)))
+    starts, ends = edges[0::2], edges[1::2]
+
+    if starts.size:
+        lengths = ends - starts
+        longest = int(np.argmax(lengths))
+        if lengths[longest] * FRAME_SAMPLES >= MIN_SILENCE_SECONDS * SAMPLE_RATE:
+            return int((starts[longest] + ends[longest]) // 2)
+
+    return int(np.argmin(energy))
+
+
+def plan_windows(audio: np.ndarray, window_seconds: Optional[float] = None) -> List[Tuple[int, int]]:
+    """
+    Splits `audio` into (start, end) sample ranges of at most window_seconds,
+    cutting inside silences so no word is split across two windows.
+    """
+    window_seconds = window_seconds or settings.TRANSCRIPTION_WINDOW_SECONDS
+    max_samples = int(window_seconds * SAMPLE_RATE)
+    search_samples = int(min(SILENCE_SEARCH_SECONDS, window_seconds / 2) * SAMPLE_RATE)
+    total = len(audio)
+
+    if total <= max_samples:
+        return [(0, total)]
+
+    threshold = _silence_threshold(audio)
+    windows = []
+    start = 0
+    while total - start > max_samples:
+        search_end = start + max_samples
+        search_start = search_end - search_samples
+        energy = _frame_energy(audio, search_start, search_end)
+        cut = search_start + _best_cut(energy, threshold) * FRAME_SAMPLES if energy.size else search_end
+        windows.append((start, cut))
+        start = cut
+
+    windows.append((start, total))
+    return windows
+
+
+# ---------- window transcription ----------
+
+def _shift_segments(segments: List[dict], offset: float) -> List[dict]:
+    shifted = []
+    for seg in segments:
+        seg = {**seg, "start": seg["start"] + offset, "end": seg["end"] + offset}
+        if seg.get("words"):
+            seg["words"] = [
+                {**word, "start": word["start"] + offset, "end": word["end"] + offset}
+                for word in seg["words"]
+            ]
+        shifted.append(seg)
+    return shifted
+
+
+def _transcribe_window(source: str, start: int, end: int, model_size=None, engine=None) -> List[dict]:
+    """
+    Transcribes samples [start, end) of a decode cache (.npy path). Module
+    level so it runs in the window pool; only the window is copied out of
+    the memory map.
+    """
+    audio = np.load(source, mmap_mode="r")
+    window = np.array(audio[start:end], dtype=np.float32)
+    del audio
+
+    segments = _transcribe_array(window, model_size, engine)
+    return _shift_segments(segments, start / SAMPLE_RATE)
+
+
+def _mark_window_pool_process() -> None:
+    global _in_window_pool
+    _in_window_pool = True
+
+
+def _get_window_pool() -> ProcessPoolExecutor:
+    global _window_pool
+
+    if _window_pool is None:
+        with _window_pool_lock:
+            if _window_pool is None:
+                # spawn: forking a process that already holds torch threads can deadlock
+                _window_pool = ProcessPoolExecutor(
+                    max_workers=settings.TRANSCRIPTION_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_mark_window_pool_process,
+                )
+
+    return _window_pool
+
+
+def _cache_source(audio) -> Optional[str]:
+    # load_decoded_audio returns a memory map of the decode cache; its file
+    # is what pool workers map in turn
+    return getattr(audio, "filename", None)
+
+
+def stream_transcription(
+    audio,
+    model_size=None,
+    window_seconds: Optional[float] = None,
+    engine: Optional[str] = None,
+) -> Iterator[Tuple[Tuple[int, int], List[dict]]]:
+    """
+    Yields ((start_sample, end_sample), segments) window by window, in
+    order, as soon as each window and all earlier ones are transcribed.
+
+    Windows run in the process pool when there is more than one worker,
+    the audio is backed by the decode cache and we are not already inside
+    a pool process; otherwise one after the other in this process.
+    """
+    if isinstance(audio, str):
+        audio = load_decoded_audio(audio)
+
+    windows = plan_windows(audio, window_seconds)
+    source = _cache_source(audio)
+    parallel = (
+        settings.TRANSCRIPTION_WORKERS > 1
+        and len(windows) > 1
+        and source is not None
+        # Not parent_process(): analyses run in app.worker's child processes
+        and not _in_window_pool
     )
 
-    return result["segments"]
+    if not parallel:
+        for start, end in windows:
+            window = np.array(audio[start:end], dtype=np.float32)
+            segments = _transcribe_array(window, model_size, engine)
+            del window
+            yield (start, end), _shift_segments(segments, start / SAMPLE_RATE)
+        return
+
+    # At most two windows per worker in flight, so finished windows are not
+    # held in memory far ahead of the one being yielded
+    pool = _get_window_pool()
+    in_flight = settings.TRANSCRIPTION_WORKERS * 2
+    futures = {}
+    next_submit = 0
+
+    for index, window in enumerate(windows):
+        while next_submit < len(windows) and next_submit < index + in_flight:
+            start, end = windows[next_submit]
+            futures[next_submit] = pool.submit(_transcribe_window, source, start, end, model_size, engine)
+            next_submit += 1
+
+        yield window, futures.pop(index).result()
+
+
+def transcribe_audio(
+    audio,
+    model_size=None,
+    engine: Optional[str] = None,
+    streaming: Optional[bool] = None,
+    progress: Optional[Callable[[float, float], None]] = None,
+    on_segments: Optional[Callable[[List[dict]], None]] = None,
+):
+    """
+    `audio` is a file path or a decoded 16 kHz mono float32 array. Paths
+    are read through the shared decode cache instead of letting Whisper
+    shell out to ffmpeg a second time. `engine` and `model_size` pick the
+    inference engine (see core.transcription_engines).
+
+    Recordings longer than TRANSCRIPTION_STREAMING_MIN_SECONDS (or any,
+    with streaming=True) are transcribed window by window; `progress`
+    receives (seconds done, total seconds) and `on_segments` the segments
+    of each window as they arrive.
+    """
+    if isinstance(audio, str):
+        audio = load_decoded_audio(audio)
+
+    duration = len(audio) / SAMPLE_RATE
+    if streaming is None:
+        streaming = duration > settings.TRANSCRIPTION_STREAMING_MIN_SECONDS
+
+    if not streaming:
+        segments = _transcribe_array(audio, model_size, engine)
+        if on_segments is not None:
+            on_segments(segments)
+        return segments
+
+    segments = []
+    for (_, end), window_segments in stream_transcription(audio, model_size, engine=engine):
+        # Segment ids restart at 0 in every window
+        for seg in window_segments:
+            seg["id"] = len(segments)
+            segments.append(seg)
+
+        if on_segments is not None:
+            on_segments(window_segments)
+        if progress is not None:
+            progress(end / SAMPLE_RATE, duration)
+
+    return segments
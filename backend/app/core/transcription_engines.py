@@ -0,0 +1,185 @@
+# app/core/transcription_engines.py
+
+# Speech-to-text inference engines. Every engine loads a Whisper checkpoint
+# of a given size and returns Whisper-style segments (id, start, end, text)
+# for a 16 kHz mono float32 array:
+#
+# whisper        -> openai-whisper in float32 (reference accuracy, slowest
+#                   on CPU)
+# whisper-int8   -> the same model with its Linear layers dynamically
+#                   quantized to int8 by torch (no extra dependency)
+# faster-whisper -> CTranslate2 int8 runtime; optional, only available
+#                   when the faster-whisper package is installed
+#
+# The engine and the model size are chosen per job session
+# (JobSession.transcription_engine / transcription_model_size);
+# app.benchmarks.transcription compares their real-time factor and WER.
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.core.model_registry import registry
+
+
+class TranscriptionEngine(ABC):
+    """
+    Base class of a transcription engine. Models are loaded through the
+    model registry, one warm instance per (engine, size) and process.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def load(self, model_size: str):
+        ...
+
+    @abstractmethod
+    def run(self, model, audio: np.ndarray) -> List[Dict]:
+        ...
+
+    def model_key(self, model_size: Optional[str] = None) -> str:
+        return f"{self.name}:{model_size or settings.WHISPER_MODEL_SIZE}"
+
+    def model(self, model_size: Optional[str] = None):
+        model_size = model_size or settings.WHISPER_MODEL_SIZE
+        return registry.get(self.model_key(model_size), lambda: self.load(model_size))
+
+    def transcribe(self, audio: np.ndarray, model_size: Optional[str] = None) -> List[Dict]:
+        return self.run(self.model(model_size), audio)
+
+
+class WhisperEngine(TranscriptionEngine):
+
+    name = "whisper"
+
+    def load(self, model_size: str):
+        import whisper
+
+        return whisper.load_model(model_size, device="cpu")
+
+    def run(self, model, audio: np.ndarray) -> List[Dict]:
+        result = model.transcribe(
+            audio,
+            fp16=False
+        )
+        return result["segments"]
+
+
+class QuantizedWhisperEngine(WhisperEngine):
+    """
+    openai-whisper with torch dynamic int8 quantization of the Linear
+    layers (attention and MLP projections, most of the compute on CPU).
+    """
+
+    name = "whisper-int8"
+
+    def load(self, model_size: str):
+        import torch
+        from torch.ao.nn.quantized import dynamic as quantized_dynamic
+
+        model = _as_torch_linear(super().load(model_size))
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        quantized = sum(isinstance(module, quantized_dynamic.Linear) for module in model.modules())
+        if not quantized:
+            raise RuntimeError(f"whisper-int8: no Linear layer of the {model_size} model was quantized")
+        print(f"[MODELS] whisper-int8 {model_size}: {quantized} Linear layers quantized to int8")
+        return model
+
+
+def _as_torch_linear(model):
+    """
+    openai-whisper builds its projections from whisper.model.Linear, a
+    subclass of nn.Linear. quantize_dynamic matches modules on their exact
+    type, so they are swapped for plain nn.Linear layers sharing the same
+    weights first (their forward is identical in float32).
+    """
+    import torch
+
+    swaps = [
+        (parent, name, child)
+        for parent in model.modules()
+        for name, child in parent.named_children()
+        if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear
+    ]
+    for parent, name, child in swaps:
+        linear = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+        linear.weight = child.weight
+        linear.bias = child.bias
+        setattr(parent, name, linear)
+    return model
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    """
+    CTranslate2 runtime with int8 weights. Needs the optional
+    faster-whisper package.
+    """
+
+    name = "faster-whisper"
+
+    def load(self, model_size: str):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as exc:
+            raise RuntimeError(
+                "The faster-whisper transcription engine needs the faster-whisper package"
+            ) from exc
+
+        return WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=settings.FASTER_WHISPER_COMPUTE_TYPE,
+            cpu_threads=settings.FASTER_WHISPER_CPU_THREADS,
+        )
+
+    def run(self, model, audio: np.ndarray) -> List[Dict]:
+        segments, _ = model.transcribe(audio, beam_size=5)
+        # `segments` is a generator, decoding happens while iterating
+        return [
+            {
+                "id": index,
+                "start": float(seg.start),
+                "end": float(seg.end),
+                "text": seg.text,
+                "avg_logprob": seg.avg_logprob,
+                "no_speech_prob": seg.no_speech_prob,
+            }
+            for index, seg in enumerate(segments)
+        ]
+
+
+TRANSCRIPTION_ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    QuantizedWhisperEngine.name: QuantizedWhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+_engines: Dict[str, TranscriptionEngine] = {}
+
+
+def get_engine(name: Optional[str] = None) -> TranscriptionEngine:
+    """
+    Shared engine instance for a name (TRANSCRIPTION_ENGINE when None).
+    Raises ValueError for unknown engines.
+    """
+    name = name or settings.TRANSCRIPTION_ENGINE
+    if name not in TRANSCRIPTION_ENGINES:
+        raise ValueError(f"Unknown transcription engine: {name}")
+
+    if name not in _engines:
+        _engines[name] = TRANSCRIPTION_ENGINES[name]()
+    return _engines[name]
+
+
+def transcription_model_id(engine: Optional[str] = None, model_size: Optional[str] = None) -> str:
+    """
+    Identifies an engine + model size in result-cache keys. The default
+    whisper engine keeps the bare size, so existing cache entries stay valid.
+    """
+    engine = engine or settings.TRANSCRIPTION_ENGINE
+    model_size = model_size or settings.WHISPER_MODEL_SIZE
+    return model_size if engine == WhisperEngine.name else f"{engine}/{model_size}"
@@ -0,0 +1,41 @@
+# app/db/loading.py
+
+# Loading profiles: the relationships an endpoint serializes or walks,
+# loaded up front, and every other lazy load refused.
+#
+# The relationships of app.db.models keep the default lazy loading, which
+# the worker and the write routes rely on. The read routes query with a
+# profile from here instead:
+#
+#   selectinload  collections, or a many-to-one across a list of rows:
+#                 one extra `WHERE id IN (...)` query for the whole page
+#   joinedload    many-to-one / one-to-one of a single row: same query
+#   raiseload     anything else raises as soon as it would emit SQL, so a
+#                 relationship added to a response schema without being
+#                 added to the profile fails loudly instead of turning
+#                 into one query per row
+#
+# Query budgets per route are checked by app.benchmarks.query_budget.
+
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from app.db.models import CandidateListItem, Interview
+
+# Only SQL-emitting loads raise: a many-to-one already in the session
+# identity map is still returned
+NO_LAZY_SQL = raiseload("*", sql_only=True)
+
+# Rows serialized without their relationships (job sessions, persons,
+# interviews, segments, training sessions, users)
+PLAIN = (NO_LAZY_SQL,)
+
+# schemas.candidate.CandidateListItem embeds `candidate`
+LIST_ITEMS = (selectinload(CandidateListItem.candidate), NO_LAZY_SQL)
+LIST_ITEM = (joinedload(CandidateListItem.candidate), NO_LAZY_SQL)
+
+# GET /analysis/interview/{id}
+INTERVIEW_WITH_RESULT = (joinedload(Interview.analysis_result), NO_LAZY_SQL)
+
+# Batch scoring: the job session settings and previous result of every
+# interview of the wave. No raiseload, the worker goes on using them.
+INTERVIEWS_TO_SCORE = (selectinload(Interview.job_session), selectinload(Interview.analysis_result))
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Numeric, Boolean, ForeignKey, CheckConstraint, UniqueConstraint, Float, JSON
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Text, Numeric, Boolean, ForeignKey, CheckConstraint, UniqueConstraint, Float, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from sqlalchemy import Column, Integer, String, JSON, DateTime
 from datetime import datetime
 
+# Sort keys of nullable columns (keyset pagination compares row values,
+# where NULL never matches): the same COALESCE is in the indexes
+LIST_ORDER_LAST = 2147483647
+SCORE_MISSING = -1.0
+
 class User(Base):
     __tablename__ = "users"
 
@@ -23,6 +28,11 @@ class User(Base):
     job_sessions = relationship("JobSession", back_populates="owner", cascade="all, delete-orphan")
     training_sessions = relationship("TrainingSession", back_populates="user", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # GET /users/?role=, in id order
+        Index("ix_users_role_id", "role", "id"),
+    )
+
 class JobSession(Base):
     __tablename__ = "job_sessions"
 
@@ -33,11 +43,20 @@ class JobSession(Base):
     job_title = Column(String(255))
     qualities = Column(Text)
     scheduled_date = Column(DateTime)
+    scoring_backend = Column(String(20), nullable=True)  # gemini | local, None = DEFAULT_SCORING_BACKEND
+    transcription_engine = Column(String(20), nullable=True)  # whisper | whisper-int8 | faster-whisper, None = TRANSCRIPTION_ENGINE
+    transcription_model_size = Column(String(20), nullable=True)  # tiny | base | small | ..., None = WHISPER_MODEL_SIZE
+    interviewer_embedding = Column(JSON, nullable=True)  # enrolled interviewer voice, see alignement.match_interviewer
     created_at = Column(DateTime, server_default=func.current_timestamp(), nullable=False)
     updated_at = Column(DateTime, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False)
 
     owner = relationship("User", back_populates="job_sessions")
 
+    __table_args__ = (
+        Index("ix_job_sessions_created", "created_at", "id"),
+        Index("ix_job_sessions_owner_created", "owner_user_id", "created_at", "id"),
+    )
+
     candidates = relationship(
         "CandidateListItem",
         back_populates="job_session",
@@ -86,6 +105,12 @@ class CandidateListItem(Base):
         back_populates="candidate_item",
         uselist=False
     )
+
+    __table_args__ = (
+        Index("ix_candidate_list_items_session_order", job_session_id, func.coalesce(list_order, LIST_ORDER_LAST), id),
+        Index("ix_candidate_list_items_session_score", job_session_id, func.coalesce(score, SCORE_MISSING), id),
+        Index("ix_candidate_list_items_session_status", job_session_id, status),
+    )
     
 class Interview(Base):
     __tablename__ = "interviews"
@@ -106,8 +131,18 @@ class Interview(Base):
     )
 
     audio_path = Column(Text, nullable=False)
+    audio_hash = Column(String(64), nullable=True)  # sha256 of the analysed audio, keys the result cache
+    candidate_speaker = Column(String(50), nullable=True)  # diarization label identified as the candidate
+    speaker_embeddings = Column(JSON, nullable=True)  # {speaker label: voice embedding}
+    pipeline_metrics = Column(JSON, nullable=True)  # per-stage timings of the last analysis, see core.telemetry
+    audio_seconds = Column(Float, nullable=True)  # recording duration, orders batch analysis (core.scheduler)
     status = Column(String(30), nullable=False, default="processing")
 
+    # Live analysis progress, published by the worker (see core.progress)
+    progress_stage = Column(String(30), nullable=True)
+    progress_percent = Column(Float, nullable=True)
+    progress_updated_at = Column(DateTime, nullable=True)
+
     created_at = Column(DateTime, server_default=func.current_timestamp(), nullable=False)
     updated_at = Column(DateTime, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=False)
 
@@ -137,6 +172,11 @@ class Interview(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index("ix_interviews_session_created", "job_session_id", "created_at", "id"),
+        Index("ix_interviews_status_created", "status", "created_at", "id"),
+    )
+
 class TranscriptionSegment(Base):
     __tablename__ = "transcription_segments"
 
@@ -153,6 +193,7 @@ class TranscriptionSegment(Base):
     __table_args__ = (
         CheckConstraint('start_seconds >= 0', name='chk_start_seconds_positive'),
         CheckConstraint('end_seconds > start_seconds', name='chk_end_seconds_gt_start'),
+        Index("ix_transcription_segments_interview_start", "interview_id", "start_seconds", "id"),
     )
 
 class SpeakerSegment(Base):
@@ -172,6 +213,7 @@ class SpeakerSegment(Base):
     __table_args__ = (
         CheckConstraint('start_seconds >= 0', name='chk_speaker_start_positive'),
         CheckConstraint('end_seconds > start_seconds', name='chk_speaker_end_gt_start'),
+        Index("ix_speaker_segments_interview_start", "interview_id", "start_seconds", "id"),
     )
 
 class AnalysisResult(Base):
@@ -210,17 +252,102 @@ class TrainingSession(Base):
     # Relationships
     user = relationship("User", back_populates="training_sessions")
 
+    __table_args__ = (
+        Index("ix_training_sessions_user_created", "user_id", "created_at", "id"),
+    )
+
 
 class Job(Base):
+    """
+    Row in the DB-backed work queue consumed by `python -m app.worker`.
+    A job is claimed with SELECT ... FOR UPDATE SKIP LOCKED and leased to a
+    worker until `locked_until`; an expired lease makes it claimable again.
+    """
 
     __tablename__ = "jobs"
 
     id = Column(Integer, primary_key=True, index=True)
 
-    audio_path = Column(String, nullable=False)
+    kind = Column(String(30), nullable=False, default="analyze")
+
+    interview_id = Column(Integer, ForeignKey("interviews.id", ondelete="CASCADE"), nullable=True)
+
+    audio_path = Column(String, nullable=True)
 
-    status = Column(String, default="pending")
+    payload = Column(JSON, nullable=True)
+
+    status = Column(String(20), nullable=False, default="pending")  # pending | running | completed | failed
+
+    priority = Column(Integer, nullable=False, default=0)  # higher runs first
+
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String(255), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+
+    last_error = Column(Text, nullable=True)
 
     result = Column(JSON, nullable=True)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    interview = relationship("Interview")
+
+    __table_args__ = (
+        Index("ix_jobs_claim", "status", "priority", "run_after"),
+        Index("ix_jobs_interview_id", "interview_id"),
+    )
+
+
+class PipelineStageMetric(Base):
+    """
+    Cumulative totals of one pipeline stage across every worker process,
+    rendered by the API at /metrics (see core.telemetry).
+    """
+
+    __tablename__ = "pipeline_stage_metrics"
+
+    stage = Column(String(50), primary_key=True)
+
+    count = Column(Integer, nullable=False, default=0)
+    wall_seconds_sum = Column(Float, nullable=False, default=0.0)
+    cpu_seconds_sum = Column(Float, nullable=False, default=0.0)
+    audio_seconds_sum = Column(Float, nullable=False, default=0.0)
+    model_load_seconds_sum = Column(Float, nullable=False, default=0.0)
+    peak_rss_bytes_max = Column(BigInteger, nullable=False, default=0)
+
+    # Runs with wall time <= each telemetry.STAGE_BUCKETS bound (cumulative, as Prometheus expects)
+    buckets = Column(JSON, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class AnalysisCheckpoint(Base):
+    """
+    Output of one completed pipeline stage of an interview analysis, so a
+    retried or resumed analysis restarts after the last completed stage
+    (see core.checkpoints). `input_key` identifies the inputs the stage
+    ran on; a checkpoint of other audio or models is ignored.
+    """
+
+    __tablename__ = "analysis_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    interview_id = Column(Integer, ForeignKey("interviews.id", ondelete="CASCADE"), nullable=False)
+
+    stage = Column(String(30), nullable=False)  # diarization | transcription | alignment | scores
+
+    input_key = Column(String(64), nullable=False)
+
+    data = Column(JSON, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("interview_id", "stage", name="uq_analysis_checkpoints_interview_stage"),
+    )
@@ -23,4 +23,8 @@ class AnalysisResult(AnalysisResultBase):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class InterviewerEnrollment(BaseModel):
+    interview_id: int
+    speaker_label: str = Field(..., max_length=50)
@@ -0,0 +1,40 @@
+# app/schemas/dashboard.py
+from pydantic import BaseModel
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+class DashboardSession(BaseModel):
+    id: int
+    title: Optional[str] = None
+    job_title: Optional[str] = None
+    session_type: Optional[str] = None
+    qualities: Optional[str] = None
+    scheduled_date: Optional[date] = None
+    created_at: datetime
+    candidate_count: int = 0
+    analyzed_count: int = 0
+    processing_count: int = 0
+    candidate_statuses: Dict[str, int] = {}  # candidate list item status -> count
+    interview_statuses: Dict[str, int] = {}  # interview status -> count
+    average_score: Optional[float] = None
+    top_score: Optional[float] = None
+    last_activity: datetime
+
+class DashboardCandidate(BaseModel):
+    id: int  # candidate list item id
+    job_session_id: int
+    name: str
+    score: float
+    status: Optional[str] = None
+    session_title: str
+
+class DashboardTotals(BaseModel):
+    sessions: int = 0
+    candidates: int = 0
+    analyzed: int = 0
+    processing: int = 0
+
+class DashboardSummary(BaseModel):
+    sessions: List[DashboardSession]
+    top_candidates: List[DashboardCandidate]
+    totals: DashboardTotals
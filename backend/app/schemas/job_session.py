@@ -1,7 +1,7 @@
 # app/schemas/session.py
 from pydantic import BaseModel, Field
 from datetime import datetime, date
-from typing import Optional
+from typing import List, Literal, Optional
 
 class JobSessionBase(BaseModel):
     session_type: Optional[str] = Field(None, max_length=50)
@@ -9,6 +9,9 @@ class JobSessionBase(BaseModel):
     job_title: Optional[str] = Field(None, max_length=255)
     qualities: Optional[str] = None
     scheduled_date: Optional[date] = None
+    scoring_backend: Optional[Literal["gemini", "local"]] = None
+    transcription_engine: Optional[Literal["whisper", "whisper-int8", "faster-whisper"]] = None
+    transcription_model_size: Optional[Literal["tiny", "base", "small", "medium", "large-v3"]] = None
 
 class JobSessionCreate(JobSessionBase):
     owner_user_id: int
@@ -23,4 +26,11 @@ class JobSession(JobSessionBase):
     updated_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class BatchAnalysisRequest(BaseModel):
+    # priority: run in the order of interview_ids
+    order: Literal["shortest_first", "priority", "fifo"] = "shortest_first"
+    interview_ids: Optional[List[int]] = None
+    reanalyze: bool = False  # also re-run interviews already analysed
+    priority: int = 0  # job queue priority of the batch
@@ -0,0 +1,5 @@
+from pydantic import BaseModel, Field
+
+class ResumableUploadCreate(BaseModel):
+    filename: str = Field(..., max_length=255)
+    size: int = Field(..., gt=0)
@@ -0,0 +1,141 @@
+# app/utils/audio.py
+
+# Shared audio loading for the analysis pipeline. An upload is decoded
+# once to 16 kHz mono float32 and cached next to it as a .npy file; every
+# later stage (and every worker process) memory-maps that file instead of
+# decoding the original again.
+
+import os
+import subprocess
+import uuid
+from typing import Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+CACHE_SUFFIX = ".16k.npy"
+PREVIEW_SUFFIX = ".preview.ogg"
+
+
+def cache_path_for(audio_path: str) -> str:
+    return f"{audio_path}{CACHE_SUFFIX}"
+
+
+def decode_audio(path: str) -> np.ndarray:
+    """
+    Decodes any supported upload to a 16 kHz mono float32 array.
+    """
+    import soundfile as sf
+
+    try:
+        audio, sr = sf.read(path, dtype="float32")
+    except sf.LibsndfileError:
+        # Containers libsndfile cannot read (m4a, webm...) go through ffmpeg
+        from whisper.audio import load_audio as ffmpeg_load_audio
+        return ffmpeg_load_audio(path, sr=SAMPLE_RATE)
+
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+
+    if sr != SAMPLE_RATE:
+        import librosa
+        audio = librosa.resample(audio, orig_sr=sr, target_sr=SAMPLE_RATE)
+
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def _cache_is_fresh(audio_path: str, cache_path: str) -> bool:
+    try:
+        return os.path.getmtime(cache_path) >= os.path.getmtime(audio_path)
+    except OSError:
+        return False
+
+
+def load_decoded_audio(audio_path: str, use_cache: bool = True) -> np.ndarray:
+    """
+    Returns the decoded waveform of `audio_path`.
+
+    With use_cache the array is a copy-on-write memory map of the cached
+    .npy: pages are shared between stages and processes, and callers can
+    still write to it (e.g. in-place normalisation) without touching disk.
+    """
+    if not use_cache:
+        return decode_audio(audio_path)
+
+    cache_path = cache_path_for(audio_path)
+    if not _cache_is_fresh(audio_path, cache_path):
+        audio = decode_audio(audio_path)
+
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as handle:
+            np.save(handle, audio)
+        os.replace(tmp_path, cache_path)
+        del audio
+
+    return np.load(cache_path, mmap_mode="c")
+
+
+def preview_path_for(audio_path: str) -> str:
+    return f"{audio_path}{PREVIEW_SUFFIX}"
+
+
+def compressed_preview(audio_path: str, bitrate: str = "32k") -> str:
+    """
+    Returns the path of a mono Opus/Ogg rendition of audio_path, transcoding
+    it with ffmpeg on first request. Speech at 32 kbit/s is roughly 1/20 of
+    a 16-bit WAV. Raises RuntimeError when ffmpeg is unavailable or fails.
+    """
+    preview_path = preview_path_for(audio_path)
+    if _cache_is_fresh(audio_path, preview_path):
+        return preview_path
+
+    tmp_path = f"{preview_path}.{uuid.uuid4().hex}.tmp.ogg"
+    command = [
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error",
+        "-i", audio_path,
+        "-vn", "-ac", "1", "-c:a", "libopus", "-b:a", bitrate,
+        tmp_path,
+    ]
+    try:
+        subprocess.run(command, check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError) as exc:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise RuntimeError(f"Preview transcoding failed: {exc}") from exc
+
+    os.replace(tmp_path, preview_path)
+    return preview_path
+
+
+def remove_derived_audio(audio_path: str) -> None:
+    """
+    Deletes the decode cache and playback preview derived from an upload.
+    """
+    for path in (cache_path_for(audio_path), preview_path_for(audio_path)):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def audio_duration(audio: np.ndarray) -> float:
+    return len(audio) / SAMPLE_RATE
+
+
+def probe_duration(audio_path: str) -> Optional[float]:
+    """
+    Duration in seconds without decoding: from the decode cache header when
+    it exists, else from the container metadata. None when unknown.
+    """
+    cache_path = cache_path_for(audio_path)
+    if _cache_is_fresh(audio_path, cache_path):
+        return round(audio_duration(np.load(cache_path, mmap_mode="r")), 2)
+
+    try:
+        import soundfile as sf
+        return round(sf.info(audio_path).duration, 2)
+    except Exception:
+        return None
@@ -0,0 +1,57 @@
+# app/utils/query_count.py
+
+# Number of SQL statements issued while serving each request, across the
+# sync and async engines. The count is kept in a context variable set by
+# QueryCountMiddleware: the routes, their dependencies and the threadpool
+# running `def` routes all inherit it.
+#
+# With QUERY_COUNT_HEADER the count is returned in X-Query-Count (used by
+# app.benchmarks.query_budget); requests above QUERY_COUNT_WARN are logged.
+
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+_statements: ContextVar[Optional[List[int]]] = ContextVar("query_count", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class QueryCountMiddleware:
+    """Plain ASGI middleware, so streamed (SSE) responses pass untouched."""
+
+    def __init__(self, app, header: bool = False, warn_above: int = 0):
+        self.app = app
+        self.header = header
+        self.warn_above = warn_above
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = [0]
+        token = _statements.set(counter)
+
+        async def send_with_count(message):
+            # JSON responses are fully computed before their start message
+            if message["type"] == "http.response.start" and self.header:
+                MutableHeaders(scope=message).append(QUERY_COUNT_HEADER, str(counter[0]))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _statements.reset(token)
+            if self.warn_above and counter[0] > self.warn_above:
+                print(f"[QUERIES] {scope['method']} {scope['path']} issued {counter[0]} SQL statements")
@@ -0,0 +1,163 @@
+# app/utils/upload.py
+
+# Upload helpers that never block the event loop: chunks are read from the
+# request / spooled UploadFile and written to disk in the threadpool, the
+# size limit is enforced while streaming, and the SHA-256 used by the
+# result cache is computed on the fly. copy_upload_file is the blocking
+# form for `def` routes, which FastAPI already runs in the threadpool.
+
+import hashlib
+import os
+import uuid
+from typing import AsyncIterator, Tuple
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size is {max_size // (1024 * 1024)}MB",
+    )
+
+
+async def _write_stream(
+    chunks: AsyncIterator[bytes],
+    dest_path: str,
+    max_size: int,
+    append: bool = False,
+    already_written: int = 0,
+) -> Tuple[int, "hashlib._Hash"]:
+    digest = hashlib.sha256()
+    written = 0
+
+    # New files are written under a temporary name and renamed once complete
+    target = dest_path if append else f"{dest_path}.{uuid.uuid4().hex}.tmp"
+    handle = await run_in_threadpool(open, target, "ab" if append else "wb")
+    try:
+        async for chunk in chunks:
+            if not chunk:
+                continue
+            written += len(chunk)
+            if already_written + written > max_size:
+                raise _too_large(max_size)
+            digest.update(chunk)
+            await run_in_threadpool(handle.write, chunk)
+    except BaseException:
+        await run_in_threadpool(handle.close)
+        if append:
+            # Drop the partial chunk so the upload can resume from the last good offset
+            await run_in_threadpool(os.truncate, target, already_written)
+        else:
+            await run_in_threadpool(os.remove, target)
+        raise
+
+    await run_in_threadpool(handle.close)
+    if not append:
+        await run_in_threadpool(os.replace, target, dest_path)
+
+    return written, digest
+
+
+async def _upload_chunks(upload: UploadFile) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await upload.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def save_upload_file(upload: UploadFile, dest_path: str, max_size: int) -> Tuple[int, str]:
+    """
+    Copies an UploadFile to dest_path. Returns (size, sha256 hex digest).
+    Raises 413 as soon as the running size passes max_size.
+    """
+    if upload.size is not None and upload.size > max_size:
+        raise _too_large(max_size)
+
+    size, digest = await _write_stream(_upload_chunks(upload), dest_path, max_size)
+    return size, digest.hexdigest()
+
+
+def copy_upload_file(upload: UploadFile, dest_path: str, max_size: int) -> Tuple[int, str]:
+    """
+    Blocking save_upload_file, for routes that also make blocking database
+    calls. Returns (size, sha256 hex digest).
+    """
+    if upload.size is not None and upload.size > max_size:
+        raise _too_large(max_size)
+
+    digest = hashlib.sha256()
+    written = 0
+    target = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(target, "wb") as handle:
+            for chunk in iter(lambda: upload.file.read(CHUNK_SIZE), b""):
+                written += len(chunk)
+                if written > max_size:
+                    raise _too_large(max_size)
+                digest.update(chunk)
+                handle.write(chunk)
+    except BaseException:
+        os.remove(target)
+        raise
+
+    os.replace(target, dest_path)
+    return written, digest.hexdigest()
+
+
+async def append_request_body(request, dest_path: str, offset: int, max_size: int) -> int:
+    """
+    Streams the raw request body onto the end of dest_path (one chunk of a
+    resumable upload). Returns the number of bytes appended.
+    """
+    written, _ = await _write_stream(
+        request.stream(), dest_path, max_size, append=True, already_written=offset
+    )
+    return written
+
+
+class MaxBodySizeMiddleware:
+    """
+    Rejects request bodies larger than max_size with 413 before the
+    multipart parser spools them: immediately when Content-Length is too
+    big, and mid-stream for chunked bodies without a length.
+    """
+
+    def __init__(self, app, max_size: int):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    too_large = int(value) > self.max_size
+                except ValueError:
+                    too_large = False
+                if too_large:
+                    response = JSONResponse({"detail": _too_large(self.max_size).detail}, status_code=413)
+                    await response(scope, receive, send)
+                    return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    # HTTPException passes through FastAPI's body parsing untouched
+                    raise _too_large(self.max_size)
+            return message
+
+        await self.app(scope, limited_receive, send)
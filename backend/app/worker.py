@@ -0,0 +1,280 @@
+# app/worker.py
+
+# Standalone analysis worker pool, run next to the API:
+#
+#     python -m app.worker --concurrency 4
+#
+# Each pool process keeps its own warm models and pulls jobs from the
+# `jobs` table, so heavy inference never runs inside the uvicorn process.
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import or_
+
+from app.config import settings
+from app.core import job_queue
+from app.core import progress as analysis_progress
+from app.core import scheduler
+from app.core.analysis_worker import TranscriptUnavailable, rescore_interview, run_analysis_pipeline
+from app.core.model_registry import preload_models
+from app.core.telemetry import configure_tracing
+from app.db.database import SessionLocal
+from app.db.models import Interview, Job
+
+
+def _handle_analyze(job):
+    defer_scoring = bool((job.payload or {}).get("defer_scoring"))
+    run_analysis_pipeline(job.interview_id, raise_errors=True, defer_scoring=defer_scoring)
+
+
+def _handle_rescore(job):
+    try:
+        result = rescore_interview(job.interview_id)
+    except TranscriptUnavailable:
+        # Transcript evicted from the cache: fall back to a full analysis,
+        # which still reuses any stage that is cached
+        run_analysis_pipeline(job.interview_id, raise_errors=True, force=True)
+        return {"fallback": "analyze"}
+    return {"final_score": result["final_score"]}
+
+
+def _handle_score_batch(job):
+    db = SessionLocal()
+    try:
+        return scheduler.run_score_wave(db, job.payload or {})
+    finally:
+        db.close()
+
+
+JOB_HANDLERS = {
+    "analyze": _handle_analyze,
+    "rescore": _handle_rescore,
+    "score_batch": _handle_score_batch,
+}
+
+
+class _LeaseKeeper(threading.Thread):
+    """
+    Heartbeat extending the job lease while the handler runs, so a long
+    interview is not handed to another worker mid-analysis.
+    """
+
+    def __init__(self, job_id: int, worker_id: str):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stop_event = threading.Event()
+
+    def run(self):
+        interval = max(1, settings.JOB_VISIBILITY_TIMEOUT // 3)
+        while not self._stop_event.wait(interval):
+            db = SessionLocal()
+            try:
+                if not job_queue.extend_lease(db, self.job_id, self.worker_id):
+                    print(f"[WORKER {self.worker_id}] Lost lease on job {self.job_id}")
+                    return
+            except Exception as exc:
+                print(f"[WORKER {self.worker_id}] Heartbeat error: {exc}")
+            finally:
+                db.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def process_job(db, job, worker_id: str):
+    handler = JOB_HANDLERS.get(job.kind)
+    if handler is None:
+        job_queue.fail(db, job, worker_id, f"No handler for job kind '{job.kind}'", retry=False)
+        return
+
+    print(f"[WORKER {worker_id}] Job {job.id} ({job.kind}) attempt {job.attempts}/{job.max_attempts}")
+
+    keeper = _LeaseKeeper(job.id, worker_id)
+    keeper.start()
+    try:
+        result = handler(job)
+    except Exception as exc:
+        traceback.print_exc()
+        db.rollback()
+        retrying = job_queue.fail(db, job, worker_id, f"{type(exc).__name__}: {exc}")
+
+        if retrying is None:
+            print(f"[WORKER {worker_id}] Lost lease on job {job.id}, failure not recorded")
+        elif retrying and job.interview_id and job.kind == "analyze":
+            # Back to the waiting state until the next attempt picks it up.
+            # A failed rescore leaves the interview and its scores as they were
+            analysis_progress.publish(job.interview_id, stage="queued", percent=0.0, status="uploaded", db=db)
+            db.commit()
+        elif not retrying and job.interview_id:
+            # Last attempt of an analysis (or of a rescore's fallback
+            # analysis): only now is the failure final
+            interview = db.query(Interview).filter(Interview.id == job.interview_id).first()
+            if interview is not None and interview.status == "processing":
+                analysis_progress.publish(job.interview_id, stage="failed", status="failed", db=db)
+                db.commit()
+    else:
+        if not job_queue.complete(db, job, worker_id, result):
+            print(f"[WORKER {worker_id}] Lost lease on job {job.id}, result not recorded")
+    finally:
+        keeper.stop()
+
+
+def reap_stale(db) -> Dict[str, int]:
+    """
+    Recovers from dead workers: jobs whose lease (heartbeat) expired are
+    released, and interviews stuck in "processing" without any live job,
+    e.g. whose last attempt expired, are requeued or marked failed. The
+    requeued analyses resume from their stage checkpoints.
+    """
+    reaped = job_queue.reap_expired(db)
+    for job in reaped["requeued"]:
+        # A requeued rescore leaves its analysed interview as it is
+        if job.interview_id and job.kind == "analyze":
+            analysis_progress.publish(job.interview_id, stage="queued", status="uploaded", db=db)
+    for job in reaped["failed"]:
+        if job.interview_id and job.kind == "analyze":
+            analysis_progress.publish(job.interview_id, stage="failed", status="failed", db=db)
+    db.commit()
+
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT)
+    live_jobs = db.query(Job.id).filter(
+        Job.interview_id == Interview.id,
+        Job.status.in_([job_queue.PENDING, job_queue.RUNNING]),
+    )
+    orphans = db.query(Interview).filter(
+        Interview.status == "processing",
+        # Waiting for a score_batch wave, which is not tied to the interview
+        or_(Interview.progress_stage.is_(None), Interview.progress_stage != "awaiting_scoring"),
+        or_(Interview.progress_updated_at.is_(None), Interview.progress_updated_at < stale_before),
+        ~live_jobs.exists(),
+    ).all()
+
+    requeued = failed = 0
+    for interview in orphans:
+        last_job = db.query(Job).filter(
+            Job.interview_id == interview.id,
+            Job.kind == "analyze",
+        ).order_by(Job.id.desc()).first()
+
+        if last_job is not None and last_job.status == job_queue.FAILED:
+            analysis_progress.publish(interview.id, stage="failed", status="failed", db=db)
+            failed += 1
+        else:
+            job_queue.enqueue(db, "analyze", interview_id=interview.id, audio_path=interview.audio_path)
+            analysis_progress.publish(interview.id, stage="queued", status="uploaded", db=db)
+            requeued += 1
+    db.commit()
+
+    summary = {
+        "jobs_requeued": len(reaped["requeued"]),
+        "jobs_failed": len(reaped["failed"]),
+        "interviews_requeued": requeued,
+        "interviews_failed": failed,
+    }
+    if any(summary.values()):
+        print(f"[WORKER] Reaped stale work: {summary}")
+    return summary
+
+
+def _reap(now_monotonic: float, last_reap: float) -> float:
+    if now_monotonic - last_reap < settings.REAPER_INTERVAL:
+        return last_reap
+
+    db = SessionLocal()
+    try:
+        reap_stale(db)
+    except Exception as exc:
+        db.rollback()
+        print(f"[WORKER] Reaper error: {exc}")
+    finally:
+        db.close()
+    return now_monotonic
+
+
+def worker_loop(worker_id: str, stop_event, preload: bool = True):
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    configure_tracing("vocahire-worker")
+    if preload:
+        preload_models()
+
+    print(f"[WORKER {worker_id}] Ready")
+    db = SessionLocal()
+    try:
+        while not stop_event.is_set():
+            try:
+                job = job_queue.claim(db, worker_id)
+            except Exception as exc:
+                print(f"[WORKER {worker_id}] Claim error: {exc}")
+                db.rollback()
+                stop_event.wait(settings.WORKER_POLL_INTERVAL)
+                continue
+
+            if job is None:
+                stop_event.wait(settings.WORKER_POLL_INTERVAL)
+                continue
+
+            process_job(db, job, worker_id)
+    finally:
+        db.close()
+        print(f"[WORKER {worker_id}] Stopped")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VocaHire analysis worker pool")
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.WORKER_POOL_SIZE,
+        help="number of worker processes (default: WORKER_POOL_SIZE)",
+    )
+    parser.add_argument(
+        "--no-preload", action="store_true",
+        help="load models on first job instead of at startup",
+    )
+    args = parser.parse_args(argv)
+
+    # spawn: each worker builds its own torch state instead of inheriting ours
+    context = multiprocessing.get_context("spawn")
+    stop_event = context.Event()
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def _spawn(index: int):
+        process = context.Process(
+            target=worker_loop,
+            args=(f"{prefix}:{index}", stop_event, not args.no_preload),
+            name=f"vocahire-worker-{index}",
+        )
+        process.start()
+        return process
+
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    processes = {index: _spawn(index) for index in range(args.concurrency)}
+    print(f"[WORKER] Started {args.concurrency} worker process(es)")
+
+    last_reap = float("-inf")
+    while not stop_event.is_set():
+        last_reap = _reap(time.monotonic(), last_reap)
+        for index, process in list(processes.items()):
+            if not process.is_alive() and not stop_event.is_set():
+                print(f"[WORKER] Process {index} exited ({process.exitcode}), restarting")
+                processes[index] = _spawn(index)
+        stop_event.wait(5)
+
+    for process in processes.values():
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""initial schema
+
+Tables as the API used to create them with Base.metadata.create_all() at
+startup. On a database created that way the tables already exist: they
+are kept, the columns added to the models since the table was first
+created (which create_all() never adds) are added, and the nullability
+of the existing columns is brought in line with the models (jobs.audio_path
+was NOT NULL before rescore and score_batch jobs, which have no audio).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NOW = sa.text("CURRENT_TIMESTAMP")
+
+
+def _create_or_complete(name, *elements, backfill=None):
+    """
+    Creates the table, or completes an existing one. `backfill` maps a NOT
+    NULL column to the value given to the existing rows: the server default
+    it is added with (dropped right after), or the value replacing NULLs
+    before an existing column becomes NOT NULL. Returns True when the table
+    already existed.
+    """
+    backfill = backfill or {}
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(name):
+        op.create_table(name, *elements)
+        return False
+
+    existing = {column["name"]: column for column in inspector.get_columns(name)}
+    for element in elements:
+        if not isinstance(element, sa.Column):
+            continue
+
+        if element.name not in existing:
+            if element.name in backfill and not element.nullable and element.server_default is None:
+                op.add_column(name, sa.Column(
+                    element.name, element.type, nullable=False, server_default=backfill[element.name]
+                ))
+                op.alter_column(name, element.name, server_default=None)
+            else:
+                op.add_column(name, element)
+            continue
+
+        current = existing[element.name]
+        if current["nullable"] != element.nullable:
+            if not element.nullable and element.name in backfill:
+                op.execute(
+                    sa.table(name, sa.column(element.name))
+                    .update()
+                    .where(sa.column(element.name).is_(None))
+                    .values({element.name: backfill[element.name]})
+                )
+            op.alter_column(name, element.name, existing_type=current["type"], nullable=element.nullable)
+
+    return True
+
+
+def _index(name, table, columns, unique=False):
+    op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+
+
+def upgrade() -> None:
+    _create_or_complete(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("first_name", sa.String(255), nullable=False),
+        sa.Column("last_name", sa.String(255), nullable=False),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("date_of_birth", sa.DateTime()),
+        sa.Column("registered_at", sa.DateTime(), server_default=NOW),
+        sa.Column("role", sa.String(20), nullable=False),
+        sa.Column("bio", sa.Text()),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+    )
+    _index("ix_users_id", "users", ["id"])
+    _index("ix_users_email", "users", ["email"], unique=True)
+
+    _create_or_complete(
+        "job_sessions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("session_type", sa.String(50)),
+        sa.Column("owner_user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("title", sa.String(255)),
+        sa.Column("job_title", sa.String(255)),
+        sa.Column("qualities", sa.Text()),
+        sa.Column("scheduled_date", sa.DateTime()),
+        sa.Column("scoring_backend", sa.String(20)),
+        sa.Column("transcription_engine", sa.String(20)),
+        sa.Column("transcription_model_size", sa.String(20)),
+        sa.Column("interviewer_embedding", sa.JSON()),
+        sa.Column("created_at", sa.DateTime(), server_default=NOW, nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=NOW, nullable=False),
+    )
+    _index("ix_job_sessions_id", "job_sessions", ["id"])
+
+    _create_or_complete(
+        "candidates",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("first_name", sa.String(255), nullable=False),
+        sa.Column("last_name", sa.String(255), nullable=False),
+        sa.Column("city", sa.String(255)),
+        sa.Column("cin", sa.String(20)),
+        sa.Column("email", sa.String(255)),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("infos", sa.Text()),
+    )
+
+    _create_or_complete(
+        "candidate_list_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_session_id", sa.Integer(), sa.ForeignKey("job_sessions.id", ondelete="CASCADE")),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id")),
+        sa.Column("list_order", sa.Integer()),
+        sa.Column("notes", sa.Text()),
+        sa.Column("score", sa.Float()),
+        sa.Column("status", sa.String(50)),
+    )
+
+    _create_or_complete(
+        "interviews",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_session_id", sa.Integer(), sa.ForeignKey("job_sessions.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("candidate_item_id", sa.Integer(), sa.ForeignKey("candidate_list_items.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("audio_path", sa.Text(), nullable=False),
+        sa.Column("audio_hash", sa.String(64)),
+        sa.Column("candidate_speaker", sa.String(50)),
+        sa.Column("speaker_embeddings", sa.JSON()),
+        sa.Column("pipeline_metrics", sa.JSON()),
+        sa.Column("audio_seconds", sa.Float()),
+        sa.Column("status", sa.String(30), nullable=False),
+        sa.Column("progress_stage", sa.String(30)),
+        sa.Column("progress_percent", sa.Float()),
+        sa.Column("progress_updated_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime(), server_default=NOW, nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=NOW, nullable=False),
+        sa.UniqueConstraint("candidate_item_id"),
+    )
+    _index("ix_interviews_id", "interviews", ["id"])
+
+    _create_or_complete(
+        "transcription_segments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("interview_id", sa.Integer(), sa.ForeignKey("interviews.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("start_seconds", sa.Numeric(10, 3)),
+        sa.Column("end_seconds", sa.Numeric(10, 3)),
+        sa.Column("transcript", sa.Text()),
+        sa.Column("created_at", sa.DateTime(), server_default=NOW, nullable=False),
+        sa.CheckConstraint("start_seconds >= 0", name="chk_start_seconds_positive"),
+        sa.CheckConstraint("end_seconds > start_seconds", name="chk_end_seconds_gt_start"),
+    )
+    _index("ix_transcription_segments_id", "transcription_segments", ["id"])
+
+    _create_or_complete(
+        "speaker_segments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("interview_id", sa.Integer(), sa.ForeignKey("interviews.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("speaker_label", sa.String(100)),
+        sa.Column("start_seconds", sa.Numeric(10, 3)),
+        sa.Column("end_seconds", sa.Numeric(10, 3)),
+        sa.Column("text", sa.Text()),
+        sa.Column("created_at", sa.DateTime(), server_default=NOW, nullable=False),
+        sa.CheckConstraint("start_seconds >= 0", name="chk_speaker_start_positive"),
+        sa.CheckConstraint("end_seconds > start_seconds", name="chk_speaker_end_gt_start"),
+    )
+    _index("ix_speaker_segments_id", "speaker_segments", ["id"])
+
+    _create_or_complete(
+        "analysis_results",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("interview_id", sa.Integer(), sa.ForeignKey("interviews.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("content_relevance", sa.Numeric(5, 2)),
+        sa.Column("vocal_confidence", sa.Numeric(5, 2)),
+        sa.Column("clarity_of_speech", sa.Numeric(5, 2)),
+        sa.Column("fluency", sa.Numeric(5, 2)),
+        sa.Column("feedback", sa.Text()),
+        sa.Column("final_score", sa.Numeric(5, 2)),
+        sa.Column("created_at", sa.DateTime(), server_default=NOW, nullable=False),
+        sa.UniqueConstraint("interview_id"),
+        sa.CheckConstraint("content_relevance BETWEEN 0 AND 100", name="chk_content_relevance_range"),
+        sa.CheckConstraint("vocal_confidence BETWEEN 0 AND 100", name="chk_vocal_confidence_range"),
+        sa.CheckConstraint("clarity_of_speech BETWEEN 0 AND 100", name="chk_clarity_range"),
+        sa.CheckConstraint("fluency BETWEEN 0 AND 100", name="chk_fluency_range"),
+        sa.CheckConstraint("final_score BETWEEN 0 AND 100", name="chk_final_score_range"),
+    )
+    _index("ix_analysis_results_id", "analysis_results", ["id"])
+
+    _create_or_complete(
+        "training_sessions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("audio_path", sa.Text()),
+        sa.Column("difficulty_level", sa.String(50)),
+        sa.Column("created_at", sa.DateTime(), server_default=NOW, nullable=False),
+    )
+    _index("ix_training_sessions_id", "training_sessions", ["id"])
+
+    # Jobs of the baseline schema were audio analyses, all queued
+    jobs_existed = _create_or_complete(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(30), nullable=False),
+        sa.Column("interview_id", sa.Integer(), sa.ForeignKey("interviews.id", ondelete="CASCADE")),
+        sa.Column("audio_path", sa.String()),
+        sa.Column("payload", sa.JSON()),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("run_after", sa.DateTime(), nullable=False),
+        sa.Column("locked_by", sa.String(255)),
+        sa.Column("locked_until", sa.DateTime()),
+        sa.Column("last_error", sa.Text()),
+        sa.Column("result", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+        backfill={
+            "kind": "analyze",
+            "status": "pending",
+            "priority": "0",
+            "attempts": "0",
+            "max_attempts": "3",
+            "run_after": NOW,
+        },
+    )
+    if jobs_existed:
+        # String() in the baseline model
+        op.alter_column("jobs", "status", type_=sa.String(20), existing_nullable=False)
+    _index("ix_jobs_id", "jobs", ["id"])
+
+    _create_or_complete(
+        "pipeline_stage_metrics",
+        sa.Column("stage", sa.String(50), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("wall_seconds_sum", sa.Float(), nullable=False),
+        sa.Column("cpu_seconds_sum", sa.Float(), nullable=False),
+        sa.Column("audio_seconds_sum", sa.Float(), nullable=False),
+        sa.Column("model_load_seconds_sum", sa.Float(), nullable=False),
+        sa.Column("peak_rss_bytes_max", sa.BigInteger(), nullable=False),
+        sa.Column("buckets", sa.JSON()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+
+    _create_or_complete(
+        "analysis_checkpoints",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("interview_id", sa.Integer(), sa.ForeignKey("interviews.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("stage", sa.String(30), nullable=False),
+        sa.Column("input_key", sa.String(64), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.UniqueConstraint("interview_id", "stage", name="uq_analysis_checkpoints_interview_stage"),
+    )
+    _index("ix_analysis_checkpoints_id", "analysis_checkpoints", ["id"])
+
+
+def downgrade() -> None:
+    for name in (
+        "analysis_checkpoints",
+        "pipeline_stage_metrics",
+        "jobs",
+        "training_sessions",
+        "analysis_results",
+        "speaker_segments",
+        "transcription_segments",
+        "interviews",
+        "candidate_list_items",
+        "candidates",
+        "job_sessions",
+        "users",
+    ):
+        op.drop_table(name)
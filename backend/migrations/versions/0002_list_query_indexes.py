@@ -0,0 +1,63 @@
+"""indexes of the list / filter queries
+
+Foreign keys used as filters had no index, so every list of a job
+session, an interview's segments or a user's training sessions read the
+whole table. Each index below matches the WHERE + ORDER BY of a route
+(keyset pagination, see app.utils.pagination): the equality filter first,
+then the sort keys ending with id, so a page is one index range scan.
+The nullable sort keys are indexed on the same COALESCE as the queries.
+
+Built CONCURRENTLY, outside the migration transaction, so the tables stay
+writable while a large production database is indexed.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same values as app.db.models.LIST_ORDER_LAST / SCORE_MISSING
+INDEXES = [
+    # GET /job-sessions/ (all, or owner_user_id=), newest / oldest
+    ("ix_job_sessions_created", "job_sessions", ["created_at", "id"]),
+    ("ix_job_sessions_owner_created", "job_sessions", ["owner_user_id", "created_at", "id"]),
+    # GET /candidates/job-session/{id}, sort=order | score, status=
+    ("ix_candidate_list_items_session_order", "candidate_list_items",
+     ["job_session_id", sa.text("COALESCE(list_order, 2147483647)"), "id"]),
+    ("ix_candidate_list_items_session_score", "candidate_list_items",
+     ["job_session_id", sa.text("COALESCE(score, -1.0)"), "id"]),
+    ("ix_candidate_list_items_session_status", "candidate_list_items", ["job_session_id", "status"]),
+    # GET /interviews/ by job_session_id= or status=, and the batch scheduler
+    ("ix_interviews_session_created", "interviews", ["job_session_id", "created_at", "id"]),
+    ("ix_interviews_status_created", "interviews", ["status", "created_at", "id"]),
+    # GET /interviews/{id}/transcription-segments | speaker-segments
+    ("ix_transcription_segments_interview_start", "transcription_segments", ["interview_id", "start_seconds", "id"]),
+    ("ix_speaker_segments_interview_start", "speaker_segments", ["interview_id", "start_seconds", "id"]),
+    # GET /users/ by role=
+    ("ix_users_role_id", "users", ["role", "id"]),
+    # GET /training/ by user_id=
+    ("ix_training_sessions_user_created", "training_sessions", ["user_id", "created_at", "id"]),
+    # Job queue claim and per-interview lookups
+    ("ix_jobs_claim", "jobs", ["status", "priority", "run_after"]),
+    ("ix_jobs_interview_id", "jobs", ["interview_id"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
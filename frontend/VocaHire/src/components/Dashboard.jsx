@@ -28,7 +28,9 @@ export default function Dashboard({ sessions, setSessions, setActiveSessionId, s
     setError(null);
     
     try {
-      const response = await fetch(`http://localhost:5000/base-v1/job-sessions/?owner_id=${user_id}`, {
+      // One request for every session with its counts (the candidates of a
+      // session are loaded by SessionView when it is opened)
+      const response = await fetch(`http://localhost:5000/base-v1/dashboard/summary?owner_id=${user_id}&top=0`, {
         method: 'GET',
         headers: {
           'Content-Type': 'application/json',
@@ -42,53 +44,21 @@ export default function Dashboard({ sessions, setSessions, setActiveSessionId, s
       }
 
       const data = await response.json();
-      
+
       // Transform the data to match your component's expected format
-      // Fetch candidates for each session and add them
-      const transformedSessions = await Promise.all(
-        data.map(async session => {
-          let candidates = [];
-          try {
-        const response_results = await fetch(`http://localhost:5000/base-v1/candidates/?job_session_id=${session.id}`, {
-          method: 'GET',
-          headers: {
-            'Accept': 'application/json',
-            'Content-Type': 'application/json',
-          },
-          mode: 'cors',
-        });
-        if (response_results.ok) {
-          const results = await response_results.json();
-          candidates = results.map(c => ({
-            id: c.id.toString(),
-            first_name: c.candidate?.first_name || '',
-            last_name: c.candidate?.last_name || '',
-            cin: c.candidate?.cin || '',
-            email: c.candidate?.email || '',
-            phone: c.candidate?.phone || '',
-            city: c.candidate?.city || '',
-            name: `${c.candidate?.first_name || ''} ${c.candidate?.last_name || ''}`.trim() || c.candidate_name,
-            analyzed: c.score !== null,
-            audioFile: null,
-            results: results,
-            status: c.status,
-          }));
-        }
-          } catch (err) {
-        // If candidate fetch fails, just leave candidates empty
-        candidates = [];
-          }
-          return {
+      const transformedSessions = data.sessions.map(session => ({
         id: session.id,
         jobTitle: session.job_title || session.title || 'Untitled Session',
-        candidates,
+        candidateCount: session.candidate_count,
+        analyzedCount: session.analyzed_count,
+        averageScore: session.average_score,
+        topScore: session.top_score,
+        lastActivity: session.last_activity,
         date: session.scheduled_date || formatDate(session.created_at),
         created_at: session.created_at,
         session_type: session.session_type,
         qualities: session.qualities,
-          };
-        })
-      );
+      }));
       
       // Update sessions in parent component
       // You'll need to pass a setSessions prop from parent
@@ -142,8 +112,10 @@ export default function Dashboard({ sessions, setSessions, setActiveSessionId, s
   // Helper to safely parse qualities
   const getCandidatesCount = (session) => {
     try {
-      
-      return session.candidates?.length || 0;
+      // Loaded candidates once the session was opened, else the summary count
+      return Array.isArray(session.candidates)
+        ? session.candidates.length
+        : session.candidateCount || 0;
     } catch {
       return 0;
     }
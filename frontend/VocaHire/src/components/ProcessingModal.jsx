@@ -1,47 +1,18 @@
-import React, { useState, useEffect } from 'react';
+import React from 'react';
 import { Loader2, CheckCircle2 } from 'lucide-react';
 import ResultDisplay from './ResultDisplay';
+import { stageToStepIndex } from '../helpers/analysisEvents';
 
 export default function ProcessingModal({ isOpen, onClose, t, candidate }) {
-  const [stepIndex, setStepIndex] = useState(0);
-  const [progress, setProgress] = useState(0);
-
-  useEffect(() => {
-    if (!isOpen || candidate?.analyzed) return;
-
-    const progressTimer = setInterval(() => {
-      setProgress((prev) => {
-        if (prev >= 92) return prev;
-        return prev + 4;
-      });
-    }, 1200);
-
-    const stepTimer = setInterval(() => {
-      setStepIndex((prev) => {
-        if (!t?.steps?.length) return prev;
-        return Math.min(prev + 1, t.steps.length - 1);
-      });
-    }, 2500);
-
-    return () => {
-      clearInterval(progressTimer);
-      clearInterval(stepTimer);
-    };
-  }, [isOpen, candidate, t]);
-
-  useEffect(() => {
-    if (candidate?.analyzed) {
-      setProgress(100);
-      if (t?.steps?.length) {
-        setStepIndex(t.steps.length - 1);
-      }
-    }
-  }, [candidate, t]);
+  // Live progress pushed by the API (see helpers/analysisEvents.js)
+  const isFinished = !!candidate?.analyzed;
+  const progress = isFinished ? 100 : candidate?.progress?.percent ?? 0;
+  const stepIndex = isFinished
+    ? Math.max((t?.steps?.length || 1) - 1, 0)
+    : stageToStepIndex(candidate?.progress?.stage);
 
   if (!isOpen) return null;
 
-  const isFinished = !!candidate?.analyzed;
-
   return (
     <div className="fixed inset-0 z-[100] flex items-center justify-center p-4">
       <div
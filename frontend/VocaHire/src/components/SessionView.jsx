@@ -13,6 +13,7 @@ import {
   Loader,
   Loader2
 } from 'lucide-react';
+import { waitForInterviewResult } from '../helpers/analysisEvents';
 
 const API_BASE = 'http://localhost:5000/base-v1';
 
@@ -367,61 +368,59 @@ export default function SessionView({
     return response.json();
   };
 
-  const pollInterviewResult = async (candidate, interviewId) => {
-    const maxAttempts = 60;
+  const waitForInterviewAnalysis = async (candidate, interviewId) => {
+    // Progress is pushed over SSE instead of polling the analysis endpoint
+    await waitForInterviewResult(interviewId, (event) => {
+      setCurrentCandidate((prev) =>
+        prev && String(prev.id) === String(candidate.id)
+          ? { ...prev, progress: { stage: event.stage, percent: event.percent } }
+          : prev
+      );
+    });
 
-    for (let attempt = 0; attempt < maxAttempts; attempt += 1) {
-      await new Promise((resolve) => setTimeout(resolve, 3000));
+    const response = await fetch(`${API_BASE}/analysis/interview/${interviewId}`);
 
-      const response = await fetch(`${API_BASE}/analysis/interview/${interviewId}`);
+    if (!response.ok) {
+      throw new Error('Failed to fetch analysis results');
+    }
 
-      if (!response.ok) {
-        continue;
-      }
+    const data = await response.json();
 
-      const data = await response.json();
-
-      if (data.status === 'completed') {
-        await updateCandidateAnalysis(candidate.id, data);
-
-        const updatedCandidate = {
-          ...candidate,
-          analyzed: true,
-          status: 'analyzed',
-          totalScore: data.final_score,
-          results: {
-            content_relevance: data.content_relevance,
-            vocal_confidence: data.vocal_confidence,
-            clarity_of_speech: data.clarity_of_speech,
-            fluency: data.fluency,
-            final_score: data.final_score,
-            short_feedback: data.feedback
-          },
-          interview_id: interviewId
-        };
+    if (data.status === 'failed') {
+      throw new Error(data.message || 'Analysis failed');
+    }
 
-        setSessions((prev) =>
-          prev.map((s) => {
-            if (String(s.id) !== String(activeSessionId)) return s;
-            return {
-              ...s,
-              candidates: (s.candidates || []).map((c) =>
-                String(c.id) === String(candidate.id) ? updatedCandidate : c
-              )
-            };
-          })
-        );
-
-        setCurrentCandidate(updatedCandidate);
-        return;
-      }
+    await updateCandidateAnalysis(candidate.id, data);
+
+    const updatedCandidate = {
+      ...candidate,
+      analyzed: true,
+      status: 'analyzed',
+      totalScore: data.final_score,
+      results: {
+        content_relevance: data.content_relevance,
+        vocal_confidence: data.vocal_confidence,
+        clarity_of_speech: data.clarity_of_speech,
+        fluency: data.fluency,
+        final_score: data.final_score,
+        short_feedback: data.feedback
+      },
+      interview_id: interviewId
+    };
 
-      if (data.status === 'failed') {
-        throw new Error(data.message || 'Analysis failed');
-      }
-    }
+    setSessions((prev) =>
+      prev.map((s) => {
+        if (String(s.id) !== String(activeSessionId)) return s;
+        return {
+          ...s,
+          candidates: (s.candidates || []).map((c) =>
+            String(c.id) === String(candidate.id) ? updatedCandidate : c
+          )
+        };
+      })
+    );
 
-    throw new Error('Analysis timeout');
+    setCurrentCandidate(updatedCandidate);
   };
 
   const triggerAnalysis = async (candidate) => {
@@ -465,7 +464,7 @@ export default function SessionView({
       setIsProcessing(true);
 
       await uploadAudioForCandidate(candidate, interviewId);
-      await pollInterviewResult(candidate, interviewId);
+      await waitForInterviewAnalysis(candidate, interviewId);
     } catch (err) {
       console.error('Error in analysis:', err);
       setError(err.message || 'Failed to analyze audio');
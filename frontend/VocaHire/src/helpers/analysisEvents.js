@@ -0,0 +1,81 @@
+// helpers/analysisEvents.js
+
+/**
+ * Live analysis progress pushed by the API over Server-Sent Events,
+ * replacing the old polling loops.
+ *
+ * Each event: { interview_id, job_session_id, status, stage, percent }
+ */
+
+const API_BASE = 'http://localhost:5000/base-v1';
+
+// Worker stage -> index in translations `steps`
+// (upload, audio extraction, AI analysis, scoring, finalizing)
+const STAGE_STEP = {
+  queued: 0,
+  decode: 1,
+  diarization: 2,
+  transcription: 2,
+  alignment: 2,
+  awaiting_scoring: 3,
+  scoring: 3,
+  db_write: 4,
+  completed: 4
+};
+
+export const stageToStepIndex = (stage) => STAGE_STEP[stage] ?? 0;
+
+const subscribe = (url, onEvent, onError) => {
+  const source = new EventSource(url);
+
+  source.addEventListener('progress', (event) => {
+    try {
+      onEvent(JSON.parse(event.data));
+    } catch (err) {
+      console.error('Invalid progress event:', err);
+    }
+  });
+
+  source.onerror = (err) => {
+    // The browser reconnects on its own; CLOSED means it gave up
+    if (source.readyState === EventSource.CLOSED && onError) {
+      onError(err);
+    }
+  };
+
+  return () => source.close();
+};
+
+export const subscribeInterviewProgress = (interviewId, onEvent, onError) =>
+  subscribe(`${API_BASE}/analysis/interview/${interviewId}/events`, onEvent, onError);
+
+export const subscribeSessionProgress = (jobSessionId, onEvent, onError) =>
+  subscribe(`${API_BASE}/analysis/job-session/${jobSessionId}/events`, onEvent, onError);
+
+/**
+ * Resolves once the interview analysis completes, rejects when it fails.
+ * `onProgress` receives every intermediate event.
+ */
+export const waitForInterviewResult = (interviewId, onProgress) =>
+  new Promise((resolve, reject) => {
+    let unsubscribe = () => {};
+
+    unsubscribe = subscribeInterviewProgress(
+      interviewId,
+      (event) => {
+        if (onProgress) onProgress(event);
+
+        if (event.status === 'completed') {
+          unsubscribe();
+          resolve(event);
+        } else if (event.status === 'failed') {
+          unsubscribe();
+          reject(new Error('Analysis failed'));
+        }
+      },
+      () => {
+        unsubscribe();
+        reject(new Error('Lost connection to the analysis progress stream'));
+      }
+    );
+  });
@@ -120,8 +120,9 @@ export default function Home({ t, lang, setActivePage, setIsModalOpen }) {
     setError('');
 
     try {
-      const sessionsResponse = await fetch(
-        `${API_BASE}/job-sessions/?owner_id=${ownerId}`,
+      // Sessions, counts and top candidates in one request
+      const summaryResponse = await fetch(
+        `${API_BASE}/dashboard/summary?owner_id=${ownerId}&top=5`,
         {
           method: 'GET',
           headers: {
@@ -130,134 +131,43 @@ export default function Home({ t, lang, setActivePage, setIsModalOpen }) {
         }
       );
 
-      if (!sessionsResponse.ok) {
+      if (!summaryResponse.ok) {
         throw new Error('Failed to fetch job sessions');
       }
 
-      const sessions = await sessionsResponse.json();
-
-      const sessionBundles = await Promise.all(
-        sessions.map(async (session) => {
-          const [candidatesResponse, interviewsResponse] = await Promise.all([
-            fetch(`${API_BASE}/candidates/?job_session_id=${session.id}`, {
-              method: 'GET',
-              headers: { Accept: 'application/json' },
-            }),
-            fetch(`${API_BASE}/interviews/?job_session_id=${session.id}`, {
-              method: 'GET',
-              headers: { Accept: 'application/json' },
-            }),
-          ]);
-
-          const candidates = candidatesResponse.ok
-            ? await candidatesResponse.json()
-            : [];
-
-          const interviews = interviewsResponse.ok
-            ? await interviewsResponse.json()
-            : [];
-
-          return { session, candidates, interviews };
-        })
-      );
-
-      let totalCandidates = 0;
-      let analyzedCount = 0;
-      let processingCount = 0;
+      const summary = await summaryResponse.json();
+      const sessions = summary.sessions;
 
-      const topCandidates = [];
-
-      for (const bundle of sessionBundles) {
-        const interviewsByCandidateItemId = new Map();
-
-        for (const interview of bundle.interviews) {
-          interviewsByCandidateItemId.set(
-            String(interview.candidate_item_id),
-            interview
-          );
-        }
-
-        for (const item of bundle.candidates) {
-          totalCandidates += 1;
-
-          const interview = interviewsByCandidateItemId.get(String(item.id));
-          const candidateName =
-            `${item.candidate?.first_name || ''} ${item.candidate?.last_name || ''}`.trim() ||
-            'Unnamed candidate';
-
-          const scoreValue =
-            item.score !== null && item.score !== undefined
-              ? Number(item.score)
-              : null;
-
-          const interviewStatus = interview?.status || '';
-          const itemStatus = item.status || '';
-
-          const isAnalyzed =
-            itemStatus === 'analyzed' ||
-            interviewStatus === 'completed' ||
-            scoreValue !== null;
-
-          const isProcessing =
-            interviewStatus === 'uploaded' ||
-            interviewStatus === 'processing' ||
-            itemStatus === 'pending';
-
-          if (isAnalyzed) analyzedCount += 1;
-          if (isProcessing) processingCount += 1;
-
-          if (scoreValue !== null && !Number.isNaN(scoreValue)) {
-            topCandidates.push({
-              id: item.id,
-              name: candidateName,
-              score: scoreValue,
-              status: itemStatus,
-              sessionTitle:
-                bundle.session.job_title ||
-                bundle.session.title ||
-                'Untitled Session',
-            });
-          }
-        }
-      }
-
-      const recentSessions = [...sessionBundles]
+      const recentSessions = [...sessions]
         .sort((a, b) => {
-          const dateA = new Date(
-            a.session.scheduled_date || a.session.created_at || 0
-          ).getTime();
-          const dateB = new Date(
-            b.session.scheduled_date || b.session.created_at || 0
-          ).getTime();
+          const dateA = new Date(a.scheduled_date || a.created_at || 0).getTime();
+          const dateB = new Date(b.scheduled_date || b.created_at || 0).getTime();
           return dateB - dateA;
         })
         .slice(0, 5)
-        .map((bundle) => ({
-          id: bundle.session.id,
-          jobTitle:
-            bundle.session.job_title ||
-            bundle.session.title ||
-            'Untitled Session',
-          date: bundle.session.scheduled_date || bundle.session.created_at,
-          candidateCount: bundle.candidates.length,
-          analyzedCount: bundle.candidates.filter(
-            (c) => c.status === 'analyzed' || c.score !== null
-          ).length,
-          session_type: bundle.session.session_type || 'standard',
+        .map((session) => ({
+          id: session.id,
+          jobTitle: session.job_title || session.title || 'Untitled Session',
+          date: session.scheduled_date || session.created_at,
+          candidateCount: session.candidate_count,
+          analyzedCount: session.analyzed_count,
+          session_type: session.session_type || 'standard',
         }));
 
-      const sortedTopCandidates = [...topCandidates]
-        .sort((a, b) => Number(b.score || 0) - Number(a.score || 0))
-        .slice(0, 5);
-
       setHomeData({
         sessions,
         recentSessions,
-        topCandidates: sortedTopCandidates,
-        totalSessions: sessions.length,
-        totalCandidates,
-        analyzedCount,
-        processingCount,
+        topCandidates: summary.top_candidates.map((candidate) => ({
+          id: candidate.id,
+          name: candidate.name,
+          score: candidate.score,
+          status: candidate.status || '',
+          sessionTitle: candidate.session_title,
+        })),
+        totalSessions: summary.totals.sessions,
+        totalCandidates: summary.totals.candidates,
+        analyzedCount: summary.totals.analyzed,
+        processingCount: summary.totals.processing,
       });
     } catch (err) {
       console.error('Error fetching home data:', err);